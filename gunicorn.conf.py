@@ -0,0 +1,59 @@
+"""
+Gunicorn configuration, picked up automatically when gunicorn starts in the
+project root:
+
+    gunicorn
+
+The app is loaded once in the master (preload_app) and warmed up there, so
+workers fork with the URLconf and compiled templates already in memory and
+share them copy-on-write. The master also primes the caches; with several
+workers that is the shared cache they all read. Database connections are
+closed before forking and each worker opens its own.
+
+One worker is started unless WEB_CONCURRENCY asks for more. With more than
+one worker the default cache must be shared between them (CACHE_BACKEND);
+gunicorn refuses to start on a per-process LocMemCache, which would let
+workers serve data another worker has already changed.
+
+With GUNICORN_THREADS above 1 each worker serves requests from a thread
+pool, and identical cache misses in a worker are coalesced into one query
+(see hostels.caching).
+"""
+import os
+
+wsgi_app = 'hostel_management.wsgi:application'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# More workers need a shared CACHE_BACKEND, see above
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+preload_app = True
+
+
+def on_starting(server):
+    from django.core.exceptions import ImproperlyConfigured
+    from hostels.caching import check_shared_cache
+
+    try:
+        check_shared_cache(server.cfg.workers)
+    except ImproperlyConfigured as e:
+        # gunicorn reports RuntimeErrors and exits
+        raise RuntimeError(str(e))
+
+
+def when_ready(server):
+    from django.db import connections
+    from hostels.warmup import warm_up
+
+    for name, seconds, result in warm_up(['imports', 'templates', 'caches']):
+        server.log.info("Warm-up %s: %s in %.0f ms", name, result, seconds * 1000)
+
+    # Sockets must not be shared between the master and the workers
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from hostels.warmup import warm_up
+
+    for name, seconds, result in warm_up(['connections']):
+        worker.log.info("Warm-up %s: %s in %.0f ms", name, result, seconds * 1000)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,12 +47,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'hostels.ratelimit.RateLimitMiddleware',
+    'hostels.middleware.SlowQueryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'hostels.routers.ReportingPinMiddleware',
+    'hostels.middleware.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -85,6 +90,134 @@ DATABASES = {
     }
 }
 
+# Optional read replica for reporting views (allocation overview, request
+# lists, exports). Locally this is a SQLite copy refreshed with
+# `python manage.py refresh_reporting_db`.
+REPORTING_DB_NAME = config('REPORTING_DB_NAME', default='')
+
+if REPORTING_DB_NAME:
+    DATABASES['reporting'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPORTING_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Reporting reads fall back to the primary once the replica is older than this (seconds)
+REPORTING_MAX_STALENESS = config('REPORTING_MAX_STALENESS', default=300, cast=int)
+
+DATABASE_ROUTERS = ['hostels.routers.ReportingRouter']
+
+
+# Cache
+# Local in-process cache by default, which only suits a single process
+# (runserver, tests). Caches are invalidated by the process that changes the
+# data, so with several gunicorn workers CACHE_BACKEND/CACHE_LOCATION must
+# point at a shared cache, e.g. django.core.cache.backends.db.DatabaseCache
+# with CACHE_LOCATION=hostel_cache after `python manage.py createcachetable`,
+# or Redis; gunicorn refuses to start otherwise (hostels.caching.check_shared_cache).
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='hostel-management'),
+    }
+}
+
+TOPOLOGY_CACHE_TIMEOUT = 60  # hostels, floors and rooms; also invalidated on edit
+AVAILABILITY_CACHE_TIMEOUT = 30  # free rooms and bed totals; invalidated on allocation changes
+HEATMAP_CACHE_TIMEOUT = 300  # occupancy grid; patched in place in the shared cache on allocation changes
+
+
+# Sessions
+# db:             every request reads the django_session table
+# cached_db:      reads are served from the cache, writes go through to the table
+# signed_cookies: session data lives in a signed cookie, no server-side storage
+# cache:          cache only; sessions are lost when the cache is cleared
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'django.contrib.sessions.backends.cache',
+}
+
+SESSION_MODE = config('SESSION_MODE', default='cached_db')
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f"SESSION_MODE must be one of {', '.join(SESSION_ENGINES)}, got {SESSION_MODE!r}")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+
+# Rate limiting (hostels.ratelimit)
+# Token buckets per route and client key ('ip', 'matric' or 'session'):
+# each limit is (rate, per seconds, burst). Buckets are kept in process
+# memory, or in the RATE_LIMIT_CACHE cache with RATE_LIMIT_BACKEND=cache.
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='memory')
+RATE_LIMIT_CACHE = config('RATE_LIMIT_CACHE', default='default')
+RATE_LIMIT_MAX_KEYS = 10000  # memory backend; least recently used buckets are dropped
+# Behind Render's proxy the client address is the first X-Forwarded-For entry;
+# Render sets RENDER=true, elsewhere set RATE_LIMIT_TRUST_FORWARDED behind a proxy
+RATE_LIMIT_TRUST_FORWARDED = config(
+    'RATE_LIMIT_TRUST_FORWARDED', default=config('RENDER', default=False, cast=bool), cast=bool
+)
+RATE_LIMITS = {
+    'login': {
+        'path': '/accounts/login/',
+        'methods': ['POST'],
+        'limits': {'ip': (30, 60, 10), 'matric': (5, 60, 5)},
+    },
+    'rooms': {
+        'path': '/api/rooms/',
+        'methods': ['GET'],
+        'limits': {'ip': (120, 60, 20), 'session': (30, 60, 10)},
+    },
+}
+
+
+# Background jobs (python manage.py run_jobs)
+JOB_CONCURRENCY = config('JOB_CONCURRENCY', default=2, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=30, cast=int)  # seconds, doubled per attempt
+JOB_RETRY_MAX_DELAY = 3600
+JOB_LOCK_TIMEOUT = 600  # requeue running jobs not heard from in this many seconds
+
+
+# Email and notifications
+# Console backend locally; use locmem, filebased or smtp in other environments
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='hostels@trinity.edu')
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=200, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_CLAIM_TIMEOUT = 300  # seconds before rows claimed by a dead dispatcher are retried
+
+
+# Allocation ledger: replay writes a checkpoint every N events, and the
+# ledger_checkpoint job takes one every LEDGER_CHECKPOINT_INTERVAL seconds
+LEDGER_CHECKPOINT_EVERY = config('LEDGER_CHECKPOINT_EVERY', default=1000, cast=int)
+LEDGER_CHECKPOINT_INTERVAL = config('LEDGER_CHECKPOINT_INTERVAL', default=3600, cast=int)
+
+
+# Request archival (python manage.py archive_requests)
+# Closed requests untouched for ARCHIVE_REQUESTS_AFTER_DAYS move to the archive table in batches
+ARCHIVE_REQUESTS_AFTER_DAYS = config('ARCHIVE_REQUESTS_AFTER_DAYS', default=90, cast=int)
+ARCHIVE_BATCH_SIZE = config('ARCHIVE_BATCH_SIZE', default=500, cast=int)
+
+
+# Request profiling (python manage.py profile_report)
+# Profiles a random PROFILING_SAMPLE_RATE of requests, plus staff requests
+# sending the PROFILING_HEADER header; dumps go to PROFILING_DIR/<view>/
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_HEADER = 'X-Profile'
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_KEEP = 50  # dumps kept per view
+
+# Slow-query log (python manage.py slow_query_report)
+# Statements slower than the threshold are appended to SLOW_QUERY_LOG as JSON lines
+SLOW_QUERY_ENABLED = config('SLOW_QUERY_ENABLED', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+SLOW_QUERY_LOG = config('SLOW_QUERY_LOG', default=str(BASE_DIR / 'logs' / 'slow_queries.jsonl'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,7 +256,18 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Hashed file names get far-future immutable Cache-Control from WhiteNoise
+    'staticfiles': {
+        'BACKEND': 'hostels.storage.StaticFilesStorage',
+    },
+}
+
+# Anonymous home page: browsers and proxies may reuse it for this many seconds
+HOME_PAGE_MAX_AGE = config('HOME_PAGE_MAX_AGE', default=300, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -17,16 +17,17 @@ Including another URLconf
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import path, include
-from django.views.generic import TemplateView
 from hostels.forms_auth import MatricNumberAuthenticationForm
+from hostels import views as hostel_views
 
 urlpatterns = [
+    # Custom admin pages (admin/requests/, admin/allocations/, ...) must resolve before the admin site
+    path('', include('hostels.urls')),
     path('admin/', admin.site.urls),
     path('accounts/login/', auth_views.LoginView.as_view(
         template_name='login.html',
         authentication_form=MatricNumberAuthenticationForm
     ), name='login'),
     path('accounts/logout/', auth_views.LogoutView.as_view(next_page='home'), name='logout'),
-    path('', TemplateView.as_view(template_name='home.html'), name='home'),
-    path('', include('hostels.urls')),
+    path('', hostel_views.home, name='home'),
 ]
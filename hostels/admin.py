@@ -1,14 +1,53 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
-    StudentProfile, Hostel, Floor, Room, HostelRequest, Allocation
+    AcademicSession, StudentProfile, Hostel, Floor, Room, HostelRequest, ArchivedHostelRequest, Allocation, Job,
+    Notification, AllocationEvent
 )
+from . import jobs
+from . import ledger
+from .services import reject_pending_requests, assign_room, release_allocation, activate_session
+
+
+@admin.register(AcademicSession)
+class AcademicSessionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'start_date', 'end_date', 'is_current')
+    readonly_fields = ('is_current', 'created_at')
+    actions = ['make_current']
+    
+    def make_current(self, request, queryset):
+        """Admin action to start a session"""
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one session.")
+            return
+        
+        session = queryset.get()
+        activate_session(session)
+        self.message_user(request, f"{session.name} is now the current session.")
+    
+    make_current.short_description = "Make the selected session current"
+
+
+class StudentSearchMixin:
+    """
+    Search students through the indexed StudentSearchToken table (every word
+    of search_name) instead of icontains over the names and matric number.
+    """
+    student_search_path = ''
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(StudentProfile.search_filter(search_term, self.student_search_path)), False
 
 
 @admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
+class StudentProfileAdmin(StudentSearchMixin, admin.ModelAdmin):
     list_display = ('user', 'matric_no', 'gender', 'level', 'created_at')
     list_filter = ('gender', 'level', 'created_at')
-    search_fields = ('user__first_name', 'user__last_name', 'matric_no')
+    search_fields = ('search_name',)
+    list_select_related = ('user',)
+    ordering = ('matric_no',)
     readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
@@ -54,14 +93,16 @@ class RoomAdmin(admin.ModelAdmin):
 
 
 @admin.register(HostelRequest)
-class HostelRequestAdmin(admin.ModelAdmin):
-    list_display = ('student', 'hostel', 'preferred_capacity', 'status', 'created_at')
-    list_filter = ('status', 'hostel', 'created_at', 'preferred_capacity')
-    search_fields = ('student__user__first_name', 'student__user__last_name', 'student__matric_no')
+class HostelRequestAdmin(StudentSearchMixin, admin.ModelAdmin):
+    list_display = ('student', 'session', 'hostel', 'preferred_capacity', 'status', 'created_at')
+    list_filter = ('session', 'status', 'hostel', 'created_at', 'preferred_capacity')
+    search_fields = ('student__search_name',)
+    student_search_path = 'student__'
+    autocomplete_fields = ('student',)
     readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
-        ('Student & Hostel', {'fields': ('student', 'hostel')}),
+        ('Student & Hostel', {'fields': ('student', 'session', 'hostel')}),
         ('Request Details', {'fields': ('preferred_capacity', 'note')}),
         ('Status', {'fields': ('status',)}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
@@ -70,54 +111,154 @@ class HostelRequestAdmin(admin.ModelAdmin):
     actions = ['approve_requests', 'reject_requests']
     
     def approve_requests(self, request, queryset):
-        """Admin action to approve requests"""
-        for hostel_request in queryset.filter(status='PENDING'):
-            # Find available room
-            from django.db.models import F
-            available_room = Room.objects.filter(
-                floor__hostel=hostel_request.hostel,
-                capacity=hostel_request.preferred_capacity,
-                current_occupancy__lt=F('capacity')
-            ).first()
-            
-            if not available_room:
-                available_room = Room.objects.filter(
-                    floor__hostel=hostel_request.hostel,
-                    current_occupancy__lt=F('capacity')
-                ).first()
-            
-            if available_room:
-                allocation, created = Allocation.objects.get_or_create(
-                    student=hostel_request.student,
-                    defaults={'room': available_room}
-                )
-                
-                if created:
-                    available_room.current_occupancy += 1
-                    available_room.save()
-                
-                hostel_request.status = 'APPROVED'
-                hostel_request.save()
+        """Admin action to approve requests in a background job"""
+        request_ids = list(queryset.filter(status='PENDING').values_list('pk', flat=True))
+        if not request_ids:
+            self.message_user(request, "No pending requests selected.")
+            return
+        
+        job = jobs.enqueue('approve_requests', request_ids=request_ids)
+        self.message_user(request, f"Queued approval of {len(request_ids)} request(s) as job #{job.pk}.")
     
     approve_requests.short_description = "Approve selected requests and allocate rooms"
     
     def reject_requests(self, request, queryset):
         """Admin action to reject requests"""
-        count = queryset.filter(status='PENDING').update(status='REJECTED')
+        count = reject_pending_requests(queryset)
         self.message_user(request, f"{count} request(s) rejected.")
     
     reject_requests.short_description = "Reject selected requests"
 
 
 @admin.register(Allocation)
-class AllocationAdmin(admin.ModelAdmin):
-    list_display = ('student', 'room', 'date_allocated')
-    list_filter = ('room__floor__hostel', 'date_allocated')
-    search_fields = ('student__user__first_name', 'student__user__last_name', 'student__matric_no')
+class AllocationAdmin(StudentSearchMixin, admin.ModelAdmin):
+    list_display = ('student', 'session', 'room', 'date_allocated')
+    list_filter = ('session', 'room__floor__hostel', 'date_allocated')
+    search_fields = ('student__search_name',)
+    student_search_path = 'student__'
+    autocomplete_fields = ('student',)
     readonly_fields = ('date_allocated',)
     
     fieldsets = (
-        ('Student', {'fields': ('student',)}),
+        ('Student', {'fields': ('student', 'session')}),
         ('Room Assignment', {'fields': ('room',)}),
         ('Additional Info', {'fields': ('notes', 'date_allocated')}),
     )
+    
+    def save_model(self, request, obj, form, change):
+        """Route room changes through assign_room so occupancy and the ledger stay in step"""
+        if change and 'room' not in form.changed_data:
+            super().save_model(request, obj, form, change)
+            return
+        
+        allocation = assign_room(obj.student_id, obj.room, session_id=obj.session_id)
+        Allocation.objects.filter(pk=allocation.pk).update(notes=obj.notes)
+        obj.pk = allocation.pk
+        obj.date_allocated = allocation.date_allocated
+    
+    def delete_model(self, request, obj):
+        release_allocation(obj)
+    
+    def delete_queryset(self, request, queryset):
+        with ledger.batch():
+            for allocation in queryset:
+                release_allocation(allocation)
+
+
+@admin.register(ArchivedHostelRequest)
+class ArchivedHostelRequestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'student', 'session', 'hostel', 'preferred_capacity', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'session', 'hostel', 'archived_at')
+    search_fields = ('=id', 'student__matric_no')
+    list_select_related = ('student__user', 'session', 'hostel')
+    date_hierarchy = 'created_at'
+    
+    # Archived requests are kept as they were for audits
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AllocationEvent)
+class AllocationEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'student', 'room', 'from_room', 'request_id', 'created_at')
+    list_filter = ('kind', 'created_at')
+    search_fields = ('student__matric_no',)
+    list_select_related = ('student__user', 'room__floor__hostel', 'from_room__floor__hostel')
+    
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Notification)
+class NotificationAdmin(StudentSearchMixin, admin.ModelAdmin):
+    list_display = ('student', 'kind', 'subject', 'created_at', 'emailed_at', 'read_at')
+    list_filter = ('kind', 'created_at', 'emailed_at')
+    search_fields = ('student__search_name',)
+    student_search_path = 'student__'
+    list_select_related = ('student__user',)
+    readonly_fields = (
+        'student', 'kind', 'subject', 'body', 'created_at', 'emailed_at', 'email_attempts', 'claimed_at', 'claimed_by',
+        'read_at'
+    )
+    
+    def has_add_permission(self, request):
+        # Notifications are written by the approval workflow
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'progress', 'attempts', 'message', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'message')
+    readonly_fields = (
+        'name', 'kwargs', 'status', 'attempts', 'progress', 'message', 'result', 'error',
+        'locked_by', 'started_at', 'finished_at', 'created_at', 'updated_at'
+    )
+    
+    fieldsets = (
+        ('Job', {'fields': ('name', 'kwargs', 'status', 'progress', 'message')}),
+        ('Scheduling', {'fields': ('run_at', 'attempts', 'max_attempts', 'locked_by')}),
+        ('Outcome', {'fields': ('result', 'error')}),
+        ('Timestamps', {'fields': ('started_at', 'finished_at', 'created_at', 'updated_at')}),
+    )
+    
+    actions = ['retry_jobs', 'cancel_jobs']
+    
+    def has_add_permission(self, request):
+        # Jobs are queued by the application, not created by hand
+        return False
+    
+    def progress(self, obj):
+        if obj.progress_total:
+            return f"{obj.progress_done}/{obj.progress_total} ({obj.progress_percentage()}%)"
+        return f"{obj.progress_percentage()}%"
+    
+    def retry_jobs(self, request, queryset):
+        """Admin action to run failed or cancelled jobs again"""
+        count = queryset.filter(status__in=['FAILED', 'CANCELLED']).update(
+            status='QUEUED', attempts=0, run_at=timezone.now(), error=''
+        )
+        self.message_user(request, f"{count} job(s) requeued.")
+    
+    retry_jobs.short_description = "Retry selected jobs"
+    
+    def cancel_jobs(self, request, queryset):
+        """Admin action to cancel queued jobs"""
+        count = queryset.filter(status='QUEUED').update(status='CANCELLED')
+        self.message_user(request, f"{count} job(s) cancelled.")
+    
+    cancel_jobs.short_description = "Cancel selected queued jobs"
@@ -0,0 +1,337 @@
+"""
+Read-only JSON API for integrations.
+
+Every endpoint is a single .values() query per page: clients choose the
+columns they need with ?fields=, narrow rows with whitelisted filters and
+page through results with an opaque keyset cursor.
+"""
+import base64
+import binascii
+import functools
+import json
+from datetime import datetime, time
+
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from .models import Hostel, Floor, Room, HostelRequest, ArchivedHostelRequest, Allocation
+from .routers import use_reporting_db
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class ApiError(Exception):
+    """Client error reported as a JSON 400 response"""
+
+
+def _integer(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(f"Expected an integer, got {value!r}")
+
+
+def _datetime(value):
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is not None:
+                parsed = datetime.combine(date, time.min)
+    except ValueError:
+        # Well formatted but impossible, such as 2026-02-30
+        raise ApiError(f"{value!r} is not a valid date")
+    if parsed is None:
+        raise ApiError(f"Expected an ISO 8601 date or datetime, got {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _choice(choices):
+    values = {value for value, label in choices}
+
+    def parse(value):
+        if value not in values:
+            raise ApiError(f"Expected one of {', '.join(sorted(values))}, got {value!r}")
+        return value
+    return parse
+
+
+def _boolean(value):
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ApiError(f"Expected a boolean, got {value!r}")
+
+
+def _session(value):
+    """'current', 'all' or a session id; 'all' parses to None"""
+    if value == 'all':
+        return None
+    if value == 'current':
+        return value
+    return _integer(value)
+
+
+def _in_session(queryset, session):
+    if session is None:
+        return queryset
+    if session == 'current':
+        # Joined rather than looked up first, so the page stays one query
+        return queryset.filter(session__is_current=True)
+    return queryset.filter(session_id=session)
+
+
+class Resource:
+    """
+    A list endpoint over one model.
+
+    `fields` maps public names to ORM paths, `filters` maps query parameters
+    to (lookup, parser) pairs, where lookup is an ORM lookup or a callable
+    taking (queryset, value). `default_params` supplies filter values for
+    parameters the client leaves out.
+    """
+
+    def __init__(self, queryset, fields, filters, default_fields=None, default_params=None):
+        self.queryset = queryset
+        self.fields = fields
+        self.filters = filters
+        self.default_fields = default_fields or list(fields)
+        self.default_params = default_params or {}
+
+    def selected_fields(self, params):
+        requested = params.get('fields')
+        if not requested:
+            return self.default_fields
+
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+        # The cursor is built from the id
+        return ['id'] + [name for name in names if name != 'id']
+
+    def filtered(self, params):
+        queryset = self.queryset
+        for param, (lookup, parse) in self.filters.items():
+            raw = params.get(param, self.default_params.get(param))
+            if raw is None:
+                continue
+            value = parse(raw)
+            if callable(lookup):
+                queryset = lookup(queryset, value)
+            else:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+    def page(self, params):
+        """Return (rows, next_cursor) for the request parameters"""
+        names = self.selected_fields(params)
+        limit = min(_integer(params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ApiError("limit must be positive")
+
+        queryset = self.filtered(params)
+        cursor = params.get('cursor')
+        if cursor:
+            queryset = queryset.filter(pk__gt=decode_cursor(cursor))
+
+        paths = [self.fields[name] for name in names]
+        rows = list(queryset.order_by('pk').values(*paths)[:limit + 1])
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['id'])
+
+        results = [{name: row[path] for name, path in zip(names, paths)} for row in rows]
+        return results, next_cursor
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(json.dumps({'after': last_id}).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))['after'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ApiError("Invalid cursor")
+
+
+def api_staff_required(view_func):
+    """Like user_passes_test(is_admin), but answers with JSON instead of a login redirect"""
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        if not request.user.is_staff:
+            return JsonResponse({'error': 'Staff access required'}, status=403)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def resource_view(resource):
+    """Build a GET list view for a resource"""
+    @require_GET
+    @api_staff_required
+    @gzip_page
+    @use_reporting_db
+    def view(request):
+        try:
+            results, next_cursor = resource.page(request.GET)
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        next_url = None
+        if next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+        return JsonResponse({'results': results, 'next_cursor': next_cursor, 'next': next_url})
+    return view
+
+
+hostels_resource = Resource(
+    queryset=Hostel.objects.annotate(
+        available_beds=Coalesce(
+            Sum(F('floors__rooms__capacity') - F('floors__rooms__current_occupancy')), 0
+        )
+    ),
+    fields={
+        'id': 'id',
+        'name': 'name',
+        'gender': 'gender',
+        'description': 'description',
+        'available_beds': 'available_beds',
+    },
+    filters={
+        'gender': ('gender', _choice(Hostel.GENDER_CHOICES)),
+    },
+)
+
+rooms_resource = Resource(
+    queryset=Room.objects.all(),
+    fields={
+        'id': 'id',
+        'hostel_id': 'floor__hostel_id',
+        'hostel': 'floor__hostel__name',
+        'floor': 'floor__floor_type',
+        'room_number': 'room_number',
+        'capacity': 'capacity',
+        'current_occupancy': 'current_occupancy',
+    },
+    filters={
+        'hostel_id': ('floor__hostel_id', _integer),
+        'floor': ('floor__floor_type', _choice(Floor.FLOOR_CHOICES)),
+        'capacity': ('capacity', _integer),
+        'available': (
+            lambda queryset, available: queryset.filter(current_occupancy__lt=F('capacity'))
+            if available else queryset.filter(current_occupancy__gte=F('capacity')),
+            _boolean,
+        ),
+    },
+)
+
+requests_resource = Resource(
+    queryset=HostelRequest.objects.all(),
+    fields={
+        'id': 'id',
+        'student_id': 'student_id',
+        'matric_no': 'student__matric_no',
+        'session_id': 'session_id',
+        'session': 'session__name',
+        'hostel_id': 'hostel_id',
+        'hostel': 'hostel__name',
+        'preferred_capacity': 'preferred_capacity',
+        'preferred_room_id': 'preferred_room_id',
+        'status': 'status',
+        'note': 'note',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    },
+    filters={
+        'session': (_in_session, _session),
+        'status': ('status', _choice(HostelRequest.STATUS_CHOICES)),
+        'hostel_id': ('hostel_id', _integer),
+        'student_id': ('student_id', _integer),
+        'matric_no': ('student__matric_no', str),
+        'created_after': ('created_at__gte', _datetime),
+        'created_before': ('created_at__lt', _datetime),
+    },
+    default_params={'session': 'current'},
+)
+
+archived_requests_resource = Resource(
+    queryset=ArchivedHostelRequest.objects.all(),
+    fields={
+        'id': 'id',
+        'student_id': 'student_id',
+        'matric_no': 'student__matric_no',
+        'session_id': 'session_id',
+        'session': 'session__name',
+        'hostel_id': 'hostel_id',
+        'hostel': 'hostel__name',
+        'preferred_capacity': 'preferred_capacity',
+        'preferred_room_id': 'preferred_room_id',
+        'status': 'status',
+        'note': 'note',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'archived_at': 'archived_at',
+    },
+    filters={
+        'session': (_in_session, _session),
+        'status': ('status', _choice(HostelRequest.STATUS_CHOICES)),
+        'hostel_id': ('hostel_id', _integer),
+        'student_id': ('student_id', _integer),
+        'matric_no': ('student__matric_no', str),
+        'created_after': ('created_at__gte', _datetime),
+        'created_before': ('created_at__lt', _datetime),
+    },
+)
+
+allocations_resource = Resource(
+    queryset=Allocation.objects.all(),
+    fields={
+        'id': 'id',
+        'student_id': 'student_id',
+        'matric_no': 'student__matric_no',
+        'session_id': 'session_id',
+        'session': 'session__name',
+        'room_id': 'room_id',
+        'room_number': 'room__room_number',
+        'floor': 'room__floor__floor_type',
+        'hostel_id': 'room__floor__hostel_id',
+        'hostel': 'room__floor__hostel__name',
+        'date_allocated': 'date_allocated',
+        'notes': 'notes',
+    },
+    filters={
+        'session': (_in_session, _session),
+        'hostel_id': ('room__floor__hostel_id', _integer),
+        'room_id': ('room_id', _integer),
+        'student_id': ('student_id', _integer),
+        'matric_no': ('student__matric_no', str),
+        'allocated_after': ('date_allocated__gte', _datetime),
+        'allocated_before': ('date_allocated__lt', _datetime),
+    },
+    default_params={'session': 'current'},
+)
+
+hostels_list = resource_view(hostels_resource)
+rooms_list = resource_view(rooms_resource)
+requests_list = resource_view(requests_resource)
+archived_requests_list = resource_view(archived_requests_resource)
+allocations_list = resource_view(allocations_resource)
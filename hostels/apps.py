@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class HostelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hostels'
+
+    def ready(self):
+        # Register background jobs and cache invalidation signals
+        from . import tasks  # noqa: F401
+        from . import caching  # noqa: F401
@@ -0,0 +1,100 @@
+"""
+Archival of closed hostel requests.
+
+Rejected requests, of any session, and pending requests of sessions other
+than the current one (which are never decided once their session is over)
+are moved to ArchivedHostelRequest once they have not changed for a while,
+so the live table that admin_requests and the active-request checks scan
+only holds requests that still matter. Approved requests stay live as the
+record behind an allocation, and pending ones of the current session can
+still be decided. Rows move in small
+batches, each in its own short transaction; an interrupted run loses at
+most the batch in flight and the next run picks up where it stopped.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedHostelRequest, HostelRequest, current_session_id
+
+ARCHIVED_FIELDS = [
+    'id', 'student_id', 'session_id', 'hostel_id', 'preferred_capacity', 'preferred_room_id',
+    'status', 'note', 'created_at', 'updated_at',
+]
+CLOSED_STATUSES = ['REJECTED']
+
+
+class ArchiveError(Exception):
+    """Raised when a batch's archive copies do not match the requests about to be deleted"""
+
+
+def closed_requests(cutoff):
+    """Requests that can no longer change and were last updated before cutoff"""
+    closed = Q(status__in=CLOSED_STATUSES)
+    session_id = current_session_id()
+    if session_id is not None:
+        # Pending requests left over from earlier sessions
+        closed |= Q(status='PENDING') & ~Q(session_id=session_id)
+    return HostelRequest.objects.filter(closed, updated_at__lt=cutoff)
+
+
+def default_cutoff():
+    return timezone.now() - timedelta(days=settings.ARCHIVE_REQUESTS_AFTER_DAYS)
+
+
+def archive_closed_requests(cutoff=None, batch_size=None, max_batches=None, pause=0, dry_run=False):
+    """
+    Move closed requests older than cutoff to the archive table.
+
+    Each batch is selected, copied and deleted in one transaction; batches
+    walk the primary key so no row is scanned twice. Copies are inserted
+    with ignore_conflicts, so re-running after a crash never duplicates
+    rows. Before deleting, the archive is checked to hold a copy of every
+    row in the batch; a copy skipped because a different request already
+    took its id raises ArchiveError and rolls the batch back. Returns
+    {'candidates', 'archived', 'batches', 'remaining'}.
+    """
+    cutoff = cutoff or default_cutoff()
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    candidates = closed_requests(cutoff)
+
+    summary = {'candidates': candidates.count(), 'archived': 0, 'batches': 0, 'remaining': 0}
+    if dry_run:
+        summary['remaining'] = summary['candidates']
+        return summary
+
+    last_id = 0
+    while max_batches is None or summary['batches'] < max_batches:
+        with transaction.atomic():
+            rows = list(
+                candidates.filter(pk__gt=last_id).order_by('pk').select_for_update().values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+
+            ArchivedHostelRequest.objects.bulk_create(
+                [ArchivedHostelRequest(**row) for row in rows], ignore_conflicts=True
+            )
+            ids = [row['id'] for row in rows]
+            copies = set(ArchivedHostelRequest.objects.filter(pk__in=ids).values_list('id', 'student_id', 'created_at'))
+            missing = [row['id'] for row in rows if (row['id'], row['student_id'], row['created_at']) not in copies]
+            if missing:
+                raise ArchiveError(
+                    f"{len(missing)} of {len(rows)} requests have no archive copy (ids {missing[:10]}); "
+                    f"nothing in the batch was deleted"
+                )
+            HostelRequest.objects.filter(pk__in=ids).delete()
+
+        last_id = ids[-1]
+        summary['archived'] += len(ids)
+        summary['batches'] += 1
+        if pause:
+            # Give other writers a turn between batches
+            time.sleep(pause)
+
+    summary['remaining'] = candidates.count()
+    return summary
@@ -0,0 +1,311 @@
+"""
+Cached hostel topology and availability.
+
+The topology (hostels, floors and rooms with their capacities) rarely
+changes, so it is cached for TOPOLOGY_CACHE_TIMEOUT and dropped whenever an
+admin edits it. Availability figures are cached briefly and invalidated
+whenever occupancy changes by bumping a version number that is part of
+every availability key. The occupancy heatmap is a packed grid that is
+updated in place for the rooms that changed.
+
+Invalidation happens in the process that made the change, so every process
+serving requests must share one cache: check_shared_cache() refuses a
+process-local cache (LocMemCache) when there is more than one, and
+gunicorn.conf.py runs it before starting workers.
+
+On a cache miss, concurrent identical lookups in one process are coalesced:
+one thread runs the query and the others wait for its result, so a burst of
+students opening the same hostel costs one query per worker, not one each.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Hostel, Floor, Room
+
+TOPOLOGY_KEY = 'hostels:topology'
+AVAILABILITY_VERSION_KEY = 'hostels:availability-version'
+HEATMAP_KEY = 'hostels:heatmap'
+HEATMAP_LOCK_KEY = 'hostels:heatmap-lock'
+HEATMAP_DIRTY_KEY = 'hostels:heatmap-dirty'
+HEATMAP_LOCK_TIMEOUT = 10  # seconds; outlives any patch, frees the lock if a worker dies mid-patch
+
+# Backends whose entries live in one process's memory
+PROCESS_LOCAL_BACKENDS = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+def check_shared_cache(processes):
+    """Raise ImproperlyConfigured if several processes would each get their own default cache"""
+    backend = settings.CACHES['default']['BACKEND']
+    if processes > 1 and backend in PROCESS_LOCAL_BACKENDS:
+        raise ImproperlyConfigured(
+            f"{processes} processes cannot share the {backend.rsplit('.', 1)[-1]} cache: changes made in "
+            f"one would never invalidate the others. Set CACHE_BACKEND to a shared cache (Redis, or "
+            f"django.core.cache.backends.db.DatabaseCache after `python manage.py createcachetable`), "
+            f"or run a single worker."
+        )
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time; concurrent callers share its result"""
+
+    class Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, compute):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = self.Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+_flight = SingleFlight()
+
+
+def cached(key, compute, timeout):
+    """Get key from the cache, computing and storing it once per process on a miss"""
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    def fill():
+        # A flight that just landed may have stored it already
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, timeout)
+        return value
+    return _flight.do(key, fill)
+
+
+def hostel_topology():
+    """
+    Get every hostel with its floors and rooms:
+    [{id, name, gender, floors: [{id, floor_type, rooms: [{id, room_number, capacity}]}]}]
+    """
+    return cached(TOPOLOGY_KEY, build_topology, settings.TOPOLOGY_CACHE_TIMEOUT)
+
+
+def build_topology():
+    hostels = {
+        hostel['id']: dict(hostel, floors=[])
+        for hostel in Hostel.objects.order_by('name').values('id', 'name', 'gender')
+    }
+    floors = {}
+    rooms = Room.objects.order_by('floor__floor_type', 'room_number').values(
+        'id', 'room_number', 'capacity', 'floor_id', 'floor__floor_type', 'floor__hostel_id'
+    )
+    for room in rooms:
+        floor = floors.get(room['floor_id'])
+        if floor is None:
+            floor = floors[room['floor_id']] = {
+                'id': room['floor_id'], 'floor_type': room['floor__floor_type'], 'rooms': []
+            }
+            hostels[room['floor__hostel_id']]['floors'].append(floor)
+        floor['rooms'].append({'id': room['id'], 'room_number': room['room_number'], 'capacity': room['capacity']})
+    return list(hostels.values())
+
+
+def availability_version():
+    version = cache.get(AVAILABILITY_VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost key never reuses an old version
+        cache.add(AVAILABILITY_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(AVAILABILITY_VERSION_KEY)
+    return version
+
+
+def invalidate_availability():
+    try:
+        cache.incr(AVAILABILITY_VERSION_KEY)
+    except ValueError:
+        availability_version()
+
+
+def occupancy_changed(room_ids=None):
+    """
+    Invalidate cached availability once the current transaction commits.
+
+    With room_ids, the heatmap cells for those rooms are refreshed in place;
+    without, the heatmap is rebuilt on next use.
+    """
+    transaction.on_commit(invalidate_availability)
+    if room_ids:
+        room_ids = {room_id for room_id in room_ids if room_id is not None}
+        transaction.on_commit(lambda: update_heatmap(room_ids))
+    else:
+        transaction.on_commit(lambda: cache.delete(HEATMAP_KEY))
+
+
+def available_rooms(hostel_id, capacity):
+    """Rooms in a hostel with the given capacity and a free bed"""
+    key = f'hostels:available-rooms:{availability_version()}:{hostel_id}:{capacity}'
+    return cached(key, lambda: build_available_rooms(hostel_id, capacity), settings.AVAILABILITY_CACHE_TIMEOUT)
+
+
+def build_available_rooms(hostel_id, capacity):
+    return list(
+        Room.objects.filter(
+            floor__hostel_id=hostel_id,
+            capacity=capacity,
+            current_occupancy__lt=F('capacity'),
+        ).order_by('floor__floor_type', 'room_number').values(
+            'id', 'room_number', 'floor__floor_type', 'capacity', 'current_occupancy'
+        )
+    )
+
+
+def hostel_stats():
+    """Bed totals per hostel: [{hostel, total_capacity, occupied, available, percentage}]"""
+    key = f'hostels:stats:{availability_version()}'
+    return cached(key, build_hostel_stats, settings.AVAILABILITY_CACHE_TIMEOUT)
+
+
+def build_hostel_stats():
+    stats = []
+    for hostel in Hostel.objects.order_by('name').values('id', 'name', 'gender').annotate(
+        total_capacity=Coalesce(Sum('floors__rooms__capacity'), 0),
+        occupied=Coalesce(Sum('floors__rooms__current_occupancy'), 0),
+    ):
+        total_capacity = hostel.pop('total_capacity')
+        occupied = hostel.pop('occupied')
+        stats.append({
+            'hostel': hostel,
+            'total_capacity': total_capacity,
+            'occupied': occupied,
+            'available': total_capacity - occupied,
+            'percentage': int((occupied / total_capacity * 100) if total_capacity > 0 else 0),
+        })
+    return stats
+
+
+def occupancy_heatmap():
+    """
+    Get the occupancy grid of every hostel:
+    {version, hostels: [{id, name, gender, floors: [{floor, rooms, capacity, occupancy}]}], index}
+
+    Each floor holds parallel lists of room numbers, capacities and
+    occupied beds; index maps a room id to its (hostel, floor, room) position.
+    """
+    return cached(HEATMAP_KEY, build_heatmap, settings.HEATMAP_CACHE_TIMEOUT)
+
+
+def build_heatmap():
+    floor_order = {floor_type: position for position, (floor_type, label) in enumerate(Floor.FLOOR_CHOICES)}
+    rooms = sorted(
+        Room.objects.values_list(
+            'id', 'room_number', 'capacity', 'current_occupancy',
+            'floor__floor_type', 'floor__hostel_id', 'floor__hostel__name', 'floor__hostel__gender',
+        ),
+        key=lambda room: (room[6], room[5], floor_order.get(room[4], len(floor_order)), room[1]),
+    )
+
+    hostels = []
+    index = {}
+    for room_id, room_number, capacity, occupancy, floor_type, hostel_id, name, gender in rooms:
+        if not hostels or hostels[-1]['id'] != hostel_id:
+            hostels.append({'id': hostel_id, 'name': name, 'gender': gender, 'floors': []})
+        floors = hostels[-1]['floors']
+        if not floors or floors[-1]['floor'] != floor_type:
+            floors.append({'floor': floor_type, 'rooms': [], 'capacity': [], 'occupancy': []})
+        floor = floors[-1]
+
+        index[room_id] = (len(hostels) - 1, len(floors) - 1, len(floor['rooms']))
+        floor['rooms'].append(room_number)
+        floor['capacity'].append(capacity)
+        floor['occupancy'].append(occupancy)
+
+    # Versions start from the clock so a rebuilt grid never reuses an old ETag
+    return {'version': int(time.time() * 1000), 'hostels': hostels, 'index': index}
+
+
+def update_heatmap(room_ids):
+    """
+    Refresh the cached heatmap cells of some rooms with one query.
+
+    The grid lives in the shared cache, so workers patching it at the same
+    time could overwrite each other's cells. One patch runs at a time under
+    HEATMAP_LOCK_KEY; a worker that finds it taken marks the grid dirty and
+    drops it instead, and the lock holder drops its own result too if the
+    grid was marked dirty meanwhile. Either way the next read rebuilds it.
+    """
+    if not cache.add(HEATMAP_LOCK_KEY, True, HEATMAP_LOCK_TIMEOUT):
+        cache.set(HEATMAP_DIRTY_KEY, True, settings.HEATMAP_CACHE_TIMEOUT)
+        cache.delete(HEATMAP_KEY)
+        return
+
+    try:
+        heatmap = cache.get(HEATMAP_KEY)
+        if heatmap is None:
+            return
+
+        for room_id, occupancy in Room.objects.filter(pk__in=room_ids).values_list('pk', 'current_occupancy'):
+            position = heatmap['index'].get(room_id)
+            if position is None:
+                # A room the grid does not know about; rebuild on next use
+                cache.delete(HEATMAP_KEY)
+                return
+            hostel, floor, room = position
+            heatmap['hostels'][hostel]['floors'][floor]['occupancy'][room] = occupancy
+
+        heatmap['version'] += 1
+        cache.set(HEATMAP_KEY, heatmap, settings.HEATMAP_CACHE_TIMEOUT)
+    finally:
+        cache.delete(HEATMAP_LOCK_KEY)
+        if cache.get(HEATMAP_DIRTY_KEY):
+            cache.delete_many([HEATMAP_DIRTY_KEY, HEATMAP_KEY])
+
+
+def prime():
+    """Fill the topology and availability caches; returns the number of entries primed"""
+    topology = hostel_topology()
+    hostel_stats()
+    occupancy_heatmap()
+    primed = 3
+    for hostel in topology:
+        capacities = {room['capacity'] for floor in hostel['floors'] for room in floor['rooms']}
+        for capacity in capacities:
+            available_rooms(hostel['id'], capacity)
+            primed += 1
+    return primed
+
+
+@receiver([post_save, post_delete], sender=Hostel)
+@receiver([post_save, post_delete], sender=Floor)
+@receiver([post_save, post_delete], sender=Room)
+def topology_changed(sender, **kwargs):
+    transaction.on_commit(lambda: cache.delete_many([TOPOLOGY_KEY, HEATMAP_KEY]))
+    occupancy_changed()
@@ -0,0 +1,158 @@
+"""
+Capacity planning: will the room mix fit the next intake?
+
+simulate() runs many randomized allocation rounds at once with NumPy. In
+each round every incoming student picks a hostel of their gender and a room
+capacity from the preference distribution of their level, and is placed the
+way approve_hostel_request places them: in a room of the preferred capacity
+if one has a free bed, otherwise in any free bed of the same hostel, taken
+in room order.
+
+NumPy is only needed here, so it is imported on first use.
+"""
+from collections import OrderedDict
+
+from django.db.models import Count, F, Sum
+
+from .models import HostelRequest, Room
+
+CAPACITIES = [value for value, label in HostelRequest.CAPACITY_CHOICES]
+
+
+def load_topology(from_current=False):
+    """
+    Free beds per hostel and capacity class, with classes in room order:
+    OrderedDict{hostel_id: {name, gender, classes: OrderedDict{capacity: {rooms, beds}}}}
+
+    Beds are all beds, or with from_current the beds not occupied today.
+    """
+    hostels = OrderedDict()
+    rooms = Room.objects.order_by(
+        'floor__hostel__name', 'floor__floor_type', 'room_number'
+    ).values_list('floor__hostel_id', 'floor__hostel__name', 'floor__hostel__gender', 'capacity')
+    # Classes are ordered by their first room, the order overflow placements follow
+    for hostel_id, name, gender, capacity in rooms:
+        hostel = hostels.setdefault(hostel_id, {'name': name, 'gender': gender, 'classes': OrderedDict()})
+        hostel['classes'].setdefault(capacity, {'rooms': 0, 'beds': 0})
+
+    free = F('capacity') - F('current_occupancy') if from_current else F('capacity')
+    for row in Room.objects.values('floor__hostel_id', 'capacity').annotate(rooms=Count('pk'), beds=Sum(free)):
+        hostels[row['floor__hostel_id']]['classes'][row['capacity']].update(rooms=row['rooms'], beds=row['beds'])
+    return hostels
+
+
+def simulate(topology, intake, preferences, rounds=1000, hostel_choice='uniform', spread=0.0, seed=None):
+    """
+    Simulate the intake against the topology.
+
+    intake maps (gender, level) to a number of students; preferences maps a
+    level (or None for the default) to {capacity: weight}. hostel_choice is
+    'uniform' (students pick any hostel of their gender equally often) or
+    'beds' (in proportion to hostel size). spread is the relative standard
+    deviation of each intake figure between rounds.
+
+    Returns {'rounds', 'students', 'placed', 'placement_rate', 'hostels':
+    [{id, name, gender, beds, demand, placed, unplaced, unplaced_risk,
+    classes: [{capacity, rooms, beds, demand, preferred, absorbed, unused,
+    shortfall}]}], 'unhoused': {gender: students}}, with every figure a
+    mean over the rounds; placement rate also has p5 and p95.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    hostel_ids = list(topology)
+
+    # Demand per round for every (hostel, preferred capacity) cell
+    demand = {hostel_id: np.zeros((rounds, len(CAPACITIES)), dtype=np.int64) for hostel_id in hostel_ids}
+    students = np.zeros(rounds, dtype=np.int64)
+    unhoused = {}
+    for (gender, level), count in intake.items():
+        sizes = np.full(rounds, count, dtype=np.int64)
+        if spread:
+            sizes = np.maximum(np.rint(rng.normal(count, count * spread, rounds)), 0).astype(np.int64)
+        students += sizes
+
+        choices = [hostel_id for hostel_id in hostel_ids if topology[hostel_id]['gender'] == gender]
+        if not choices:
+            unhoused[gender] = unhoused.get(gender, 0) + float(sizes.mean())
+            continue
+        if hostel_choice == 'beds':
+            weights = np.array([sum(c['beds'] for c in topology[h]['classes'].values()) for h in choices], float)
+            if not weights.sum():
+                weights = np.ones(len(choices))
+        else:
+            weights = np.ones(len(choices))
+        hostel_p = weights / weights.sum()
+
+        pref = preferences.get(level) or preferences.get(None) or {capacity: 1 for capacity in CAPACITIES}
+        capacity_p = np.array([pref.get(capacity, 0) for capacity in CAPACITIES], float)
+        capacity_p /= capacity_p.sum()
+
+        cells = rng.multinomial(sizes, np.outer(hostel_p, capacity_p).ravel(), size=rounds)
+        cells = cells.reshape(rounds, len(choices), len(CAPACITIES))
+        for position, hostel_id in enumerate(choices):
+            demand[hostel_id] += cells[:, position, :]
+
+    placed_total = np.zeros(rounds, dtype=np.int64)
+    hostels = []
+    for hostel_id in hostel_ids:
+        hostel = topology[hostel_id]
+        classes = list(hostel['classes'])
+        beds = np.array([hostel['classes'][capacity]['beds'] for capacity in classes], dtype=np.int64)
+
+        # Demand per room class (rounds x classes); preferences for capacities
+        # the hostel has no rooms of can only be met by overflow
+        wanted = np.zeros((rounds, len(classes)), dtype=np.int64)
+        for i, capacity in enumerate(classes):
+            if capacity in CAPACITIES:
+                wanted[:, i] = demand[hostel_id][:, CAPACITIES.index(capacity)]
+        total_demand = demand[hostel_id].sum(axis=1)
+
+        preferred = np.minimum(wanted, beds)
+        left = beds - preferred
+        overflow = total_demand - preferred.sum(axis=1)
+        # Overflow takes the remaining beds class by class in room order
+        before = np.cumsum(left, axis=1) - left
+        absorbed = np.clip(overflow[:, None] - before, 0, left)
+        unused = left - absorbed
+        placed = preferred.sum(axis=1) + absorbed.sum(axis=1)
+        unplaced = total_demand - placed
+        placed_total += placed
+
+        hostels.append({
+            'id': hostel_id,
+            'name': hostel['name'],
+            'gender': hostel['gender'],
+            'beds': int(beds.sum()),
+            'demand': float(total_demand.mean()),
+            'placed': float(placed.mean()),
+            'unplaced': float(unplaced.mean()),
+            'unplaced_risk': float((unplaced > 0).mean()),
+            'classes': [
+                {
+                    'capacity': capacity,
+                    'rooms': hostel['classes'][capacity]['rooms'],
+                    'beds': int(beds[i]),
+                    'demand': float(wanted[:, i].mean()),
+                    'preferred': float(preferred[:, i].mean()),
+                    'absorbed': float(absorbed[:, i].mean()),
+                    'unused': float(unused[:, i].mean()),
+                    'shortfall': float((wanted[:, i] - preferred[:, i]).mean()),
+                }
+                for i, capacity in enumerate(classes)
+            ],
+        })
+
+    rate = np.divide(placed_total, students, out=np.ones(rounds), where=students > 0)
+    return {
+        'rounds': rounds,
+        'students': float(students.mean()),
+        'placed': float(placed_total.mean()),
+        'placement_rate': {
+            'mean': float(rate.mean()),
+            'p5': float(np.percentile(rate, 5)),
+            'p95': float(np.percentile(rate, 95)),
+        },
+        'hostels': hostels,
+        'unhoused': unhoused,
+    }
@@ -0,0 +1,183 @@
+"""
+Database-backed background job queue.
+
+Jobs are rows in the Job table. Functions registered with @register can be
+enqueued by name and are executed by the run_jobs management command, so
+long admin operations never run inside a request.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register(name):
+    """Register a function as a job; it is called as func(context, **kwargs)"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def registered_jobs():
+    """Get the names of all registered jobs"""
+    return sorted(_registry)
+
+
+def enqueue(name, max_attempts=3, run_at=None, **kwargs):
+    """Queue a registered job; kwargs must be JSON serializable"""
+    if name not in _registry:
+        raise KeyError(f"Unknown job: {name}")
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+class JobContext:
+    """Handle passed to running jobs for progress reporting"""
+
+    # Seconds between progress writes, so tight loops don't hammer the table
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, job):
+        self.job = job
+        self._last_write = 0.0
+
+    def progress(self, done, total=None, message=None, force=False):
+        """Record progress; writes are throttled unless force is set"""
+        self.job.progress_done = done
+        if total is not None:
+            self.job.progress_total = total
+        if message is not None:
+            self.job.message = message[:255]
+
+        now = time.monotonic()
+        if force or now - self._last_write >= self.PROGRESS_INTERVAL:
+            self._last_write = now
+            Job.objects.filter(pk=self.job.pk).update(
+                progress_done=self.job.progress_done,
+                progress_total=self.job.progress_total,
+                message=self.job.message,
+                updated_at=timezone.now(),
+            )
+
+
+def retry_delay(attempts):
+    """Exponential backoff for a job that has failed `attempts` times"""
+    return timedelta(seconds=min(
+        settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    ))
+
+
+def requeue_stale_jobs():
+    """
+    Requeue jobs whose worker died while running them.
+
+    The lost run counts as an attempt, so a job that keeps killing its
+    worker fails for good after max_attempts instead of being requeued
+    forever. Returns (requeued, failed).
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status='RUNNING', updated_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED',
+        locked_by='',
+        message='Worker stopped responding; no attempts left',
+        finished_at=now,
+        updated_at=now,
+    )
+    requeued = stale.update(
+        status='QUEUED',
+        locked_by='',
+        message='Worker stopped responding; requeued',
+        run_at=now,
+        updated_at=now,
+    )
+    return requeued, failed
+
+
+def claim_next_job(worker_id):
+    """
+    Atomically claim the next due job.
+
+    The claim is a conditional UPDATE, so two workers racing for the same
+    row cannot both win it.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status='QUEUED', run_at__lte=now
+    ).order_by('run_at', 'pk').values_list('pk', flat=True)[:10]
+
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status='QUEUED').update(
+            status='RUNNING',
+            locked_by=worker_id,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome, scheduling a retry on failure"""
+    func = _registry.get(job.name)
+
+    try:
+        if func is None:
+            raise KeyError(f"Unknown job: {job.name}")
+        result = func(JobContext(job), **job.kwargs)
+    except Exception as e:
+        logger.exception("Job %s failed (attempt %s/%s)", job.pk, job.attempts, job.max_attempts)
+        job.error = traceback.format_exc()
+        job.message = str(e)[:255]
+        job.locked_by = ''
+        if job.attempts < job.max_attempts:
+            job.status = 'QUEUED'
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = 'FAILED'
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'run_at', 'error', 'message', 'locked_by', 'finished_at', 'updated_at'])
+        return False
+
+    job.status = 'SUCCEEDED'
+    job.result = result
+    job.error = ''
+    job.locked_by = ''
+    job.finished_at = timezone.now()
+    if job.progress_total:
+        job.progress_done = job.progress_total
+    job.save(update_fields=['status', 'result', 'error', 'locked_by', 'finished_at', 'progress_done', 'updated_at'])
+    return True
+
+
+def work(worker_id):
+    """Claim and run one job; returns False when nothing was due"""
+    close_old_connections()
+    try:
+        job = claim_next_job(worker_id)
+        if job is None:
+            return False
+        run_job(job)
+        return True
+    finally:
+        close_old_connections()
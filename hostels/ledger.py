@@ -0,0 +1,251 @@
+"""
+Append-only allocation ledger.
+
+Every allocation change is recorded as an AllocationEvent. Replaying the
+events in order rebuilds Allocation rows and Room.current_occupancy, and
+periodic LedgerCheckpoint snapshots let point-in-time queries start from
+the nearest snapshot instead of the beginning of the log. Events and
+checkpoints belong to an academic session; every function works on one
+session, the current one by default.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching
+from .jobs import enqueue
+from .models import AllocationEvent, LedgerCheckpoint, Allocation, Job, Room, StudentProfile, current_session_id
+
+_local = threading.local()
+
+
+@contextmanager
+def batch():
+    """
+    Collect events recorded inside the block and write them with one bulk_create.
+
+    The block runs in a transaction and the events are flushed before it
+    commits, so they are stored atomically with the changes they describe.
+    Nested batches join the outermost one.
+    """
+    if getattr(_local, 'events', None) is not None:
+        yield _local.events
+        return
+
+    _local.events = []
+    try:
+        with transaction.atomic():
+            yield _local.events
+            AllocationEvent.objects.bulk_create(_local.events, batch_size=500)
+    finally:
+        _local.events = None
+
+
+def record(kind, student_id, room_id=None, from_room_id=None, request_id=None, note='', session_id=None):
+    """Record an event in the current batch, or write it straight away outside one"""
+    event = AllocationEvent(
+        kind=kind,
+        student_id=student_id,
+        room_id=room_id,
+        from_room_id=from_room_id,
+        session_id=session_id or current_session_id(),
+        request_id=request_id,
+        note=note[:255],
+        created_at=timezone.now(),
+    )
+    events = getattr(_local, 'events', None)
+    if events is None:
+        event.save()
+    else:
+        events.append(event)
+    return event
+
+
+def apply_event(allocations, kind, student_id, room_id):
+    """Apply one event to a {student_id: room_id} state"""
+    if kind in ('ALLOCATE', 'MOVE'):
+        allocations[student_id] = room_id
+    elif kind == 'RELEASE':
+        allocations.pop(student_id, None)
+    # APPROVE and REJECT are informational
+
+
+def _event_stream(queryset):
+    return queryset.order_by('pk').values_list(
+        'pk', 'kind', 'student_id', 'room_id', 'created_at'
+    ).iterator(chunk_size=2000)
+
+
+def _load_checkpoint(checkpoint):
+    if checkpoint is None:
+        return {}, 0
+    allocations = {int(student_id): room_id for student_id, room_id in checkpoint.allocations.items()}
+    return allocations, checkpoint.last_event_id
+
+
+def state_at(when=None, session_id=None):
+    """
+    Rebuild {student_id: room_id} as of `when` (default: now).
+
+    Starts from the latest checkpoint at or before `when` and streams only
+    the events recorded after it.
+    """
+    session_id = session_id or current_session_id()
+    checkpoints = LedgerCheckpoint.objects.filter(session_id=session_id).order_by('-last_event_id')
+    events = AllocationEvent.objects.filter(session_id=session_id)
+    if when is not None:
+        checkpoints = checkpoints.filter(taken_at__lte=when)
+        events = events.filter(created_at__lte=when)
+
+    allocations, last_event_id = _load_checkpoint(checkpoints.first())
+    for pk, kind, student_id, room_id, created_at in _event_stream(events.filter(pk__gt=last_event_id)):
+        apply_event(allocations, kind, student_id, room_id)
+
+    return allocations
+
+
+def occupancy_at(when=None, hostel=None, session_id=None):
+    """Get {room_id: occupied beds} as of `when`, optionally for one hostel"""
+    occupancy = Counter(state_at(when, session_id).values())
+    if hostel is not None:
+        room_ids = set(Room.objects.filter(floor__hostel=hostel).values_list('pk', flat=True))
+        occupancy = Counter({room_id: count for room_id, count in occupancy.items() if room_id in room_ids})
+    return occupancy
+
+
+def take_checkpoint(session_id=None):
+    """Snapshot the state after the latest event; returns the checkpoint or None if up to date"""
+    session_id = session_id or current_session_id()
+    events = AllocationEvent.objects.filter(session_id=session_id)
+    latest = events.order_by('-pk').values_list('pk', 'created_at').first()
+    if latest is None:
+        return None
+
+    previous = LedgerCheckpoint.objects.filter(session_id=session_id).order_by('-last_event_id').first()
+    if previous is not None and previous.last_event_id >= latest[0]:
+        return None
+
+    allocations, last_event_id = _load_checkpoint(previous)
+    for pk, kind, student_id, room_id, created_at in _event_stream(
+        events.filter(pk__gt=last_event_id, pk__lte=latest[0])
+    ):
+        apply_event(allocations, kind, student_id, room_id)
+
+    return LedgerCheckpoint.objects.create(
+        session_id=session_id, last_event_id=latest[0], taken_at=latest[1], allocations=allocations
+    )
+
+
+def schedule_checkpoint(delay=None):
+    """
+    Queue a ledger_checkpoint job in `delay` seconds (default: LEDGER_CHECKPOINT_INTERVAL).
+
+    The job schedules its next run itself, and workers call this on start
+    so the chain resumes after a job ran out of attempts.
+    """
+    if delay is None:
+        delay = settings.LEDGER_CHECKPOINT_INTERVAL
+    if not Job.objects.filter(name='ledger_checkpoint', status='QUEUED').exists():
+        enqueue('ledger_checkpoint', run_at=timezone.now() + timedelta(seconds=delay))
+
+
+def replay(checkpoint_every=None, dry_run=False, session_id=None):
+    """
+    Rebuild a session's Allocation rows from the ledger.
+
+    Events are streamed once in order, writing a checkpoint every
+    `checkpoint_every` events where none exists yet. Room.current_occupancy
+    is only rebuilt for the current session. Returns a summary of the
+    changes applied (or that would be applied with dry_run).
+    """
+    checkpoint_every = checkpoint_every or settings.LEDGER_CHECKPOINT_EVERY
+    is_current = session_id is None or session_id == current_session_id()
+    session_id = session_id or current_session_id()
+    existing_checkpoints = set(LedgerCheckpoint.objects.values_list('last_event_id', flat=True))
+
+    allocations = {}
+    allocated_at = {}
+    new_checkpoints = []
+    for count, (pk, kind, student_id, room_id, created_at) in enumerate(
+        _event_stream(AllocationEvent.objects.filter(session_id=session_id)), 1
+    ):
+        apply_event(allocations, kind, student_id, room_id)
+        if kind == 'ALLOCATE':
+            allocated_at[student_id] = created_at
+        if count % checkpoint_every == 0 and pk not in existing_checkpoints:
+            new_checkpoints.append(LedgerCheckpoint(
+                session_id=session_id, last_event_id=pk, taken_at=created_at, allocations=dict(allocations)
+            ))
+
+    # Ignore history for students or rooms that no longer exist
+    room_ids = set(Room.objects.values_list('pk', flat=True))
+    student_ids = set(StudentProfile.objects.values_list('pk', flat=True))
+    allocations = {
+        student_id: room_id for student_id, room_id in allocations.items()
+        if student_id in student_ids and room_id in room_ids
+    }
+
+    session_allocations = Allocation.objects.filter(session_id=session_id)
+    current = dict(session_allocations.values_list('student_id', 'room_id'))
+    to_delete = [student_id for student_id in current if student_id not in allocations]
+    to_move = {
+        student_id: room_id for student_id, room_id in allocations.items()
+        if student_id in current and current[student_id] != room_id
+    }
+    to_create = [student_id for student_id in allocations if student_id not in current]
+
+    occupancy = Counter(allocations.values())
+    rooms = []
+    if is_current:
+        rooms = [
+            room for room in Room.objects.only('pk', 'current_occupancy')
+            if room.current_occupancy != occupancy.get(room.pk, 0)
+        ]
+
+    summary = {
+        'allocations': len(allocations),
+        'created': len(to_create),
+        'moved': len(to_move),
+        'deleted': len(to_delete),
+        'rooms_fixed': len(rooms),
+        'checkpoints': len(new_checkpoints),
+    }
+    if dry_run:
+        return summary
+
+    with transaction.atomic():
+        session_allocations.filter(student_id__in=to_delete).delete()
+
+        moved = list(session_allocations.filter(student_id__in=list(to_move)))
+        for allocation in moved:
+            allocation.room_id = to_move[allocation.student_id]
+        Allocation.objects.bulk_update(moved, ['room'], batch_size=500)
+
+        created = Allocation.objects.bulk_create(
+            [
+                Allocation(student_id=student_id, session_id=session_id, room_id=allocations[student_id])
+                for student_id in to_create
+            ],
+            batch_size=500,
+        )
+        # date_allocated is auto_now_add, so restore the ledger time afterwards
+        for allocation in created:
+            if allocation.student_id in allocated_at:
+                allocation.date_allocated = allocated_at[allocation.student_id]
+        Allocation.objects.bulk_update(
+            [allocation for allocation in created if allocation.pk], ['date_allocated'], batch_size=500
+        )
+
+        for room in rooms:
+            room.current_occupancy = occupancy.get(room.pk, 0)
+        Room.objects.bulk_update(rooms, ['current_occupancy'], batch_size=500)
+        caching.occupancy_changed([room.pk for room in rooms])
+
+        LedgerCheckpoint.objects.bulk_create(new_checkpoints)
+
+    return summary
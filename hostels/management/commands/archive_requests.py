@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from hostels.archive import ArchiveError, archive_closed_requests
+
+
+class Command(BaseCommand):
+    help = (
+        'Move rejected hostel requests, and pending ones of earlier sessions, to the archive table '
+        'in small batches (safe to interrupt and re-run)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=settings.ARCHIVE_REQUESTS_AFTER_DAYS,
+            help='Archive closed requests last updated more than N days ago (default: ARCHIVE_REQUESTS_AFTER_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help='Requests moved per transaction (default: ARCHIVE_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after N batches; run again to continue'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the requests that would be archived without moving them'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        try:
+            summary = archive_closed_requests(
+                cutoff=cutoff,
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+        except ArchiveError as e:
+            raise CommandError(str(e))
+
+        heading = 'Request Archival (dry run)' if options['dry_run'] else 'Request Archival Complete!'
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(heading))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(f'\n📊 Closed requests last updated before {cutoff:%Y-%m-%d}: {summary["candidates"]}')
+        self.stdout.write(f'   Archived: {summary["archived"]} in {summary["batches"]} batches')
+        if summary['remaining']:
+            self.stdout.write(self.style.WARNING(f'⚠️  Still to archive: {summary["remaining"]} (run again to continue)\n'))
+        else:
+            self.stdout.write('')
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from hostels.models import StudentProfile
+
+
+class Command(BaseCommand):
+    help = 'Benchmark student dashboard requests/sec under each session storage mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Number of dashboard requests per mode (default: 500)'
+        )
+        parser.add_argument(
+            '--matric',
+            type=str,
+            help='Matric number of the student to log in as (default: first student)'
+        )
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=sorted(settings.SESSION_ENGINES),
+            default=['db', 'cached_db', 'signed_cookies'],
+            help='Session modes to benchmark'
+        )
+
+    def handle(self, *args, **options):
+        students = StudentProfile.objects.select_related('user')
+        if options['matric']:
+            students = students.filter(matric_no=options['matric'])
+        student = students.first()
+        if student is None:
+            raise CommandError('No student found. Create one with create_test_users first.')
+
+        total = options['requests']
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS('Session Storage Benchmark - Student Dashboard'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(f'\n👤 Student: {student.matric_no}, {total} requests per mode\n')
+        self.stdout.write(f'{"Mode":<16}{"req/s":>10}{"ms/req":>10}{"session queries/req":>22}')
+
+        for mode in options['modes']:
+            with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                requests_per_sec, ms_per_request, session_queries = self.run_mode(student.user, total)
+
+            self.stdout.write(
+                f'{mode:<16}{requests_per_sec:>10.1f}{ms_per_request:>10.2f}{session_queries:>22.2f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n✨ Benchmark complete!\n'))
+
+    def run_mode(self, user, total):
+        """Time dashboard requests for a fresh logged-in client"""
+        client = Client()
+        client.force_login(user)
+        # Warm up middleware, templates and the session cache
+        client.get('/student/dashboard/', secure=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(total):
+                response = client.get('/student/dashboard/', secure=True)
+                if response.status_code != 200:
+                    raise CommandError(f'Dashboard returned HTTP {response.status_code}')
+            elapsed = time.perf_counter() - start
+
+        session_queries = sum(1 for query in queries if 'django_session' in query['sql'])
+        return total / elapsed, elapsed * 1000 / total, session_queries / total
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from hostels.models import StudentProfile
+from hostels.roster import sync_roster
 import csv
 import os
 
@@ -43,6 +44,21 @@ class Command(BaseCommand):
             action='store_true',
             help='Create admin/superuser'
         )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='With --csv: make the database match the roster (create and update students)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='With --sync: print the diff without applying it'
+        )
+        parser.add_argument(
+            '--deactivate-missing',
+            action='store_true',
+            help='With --sync: also deactivate students who are not on the roster (use only with the full roster)'
+        )
 
     def extract_surname(self, full_name):
         """Extract surname and capitalize it for password"""
@@ -142,6 +158,23 @@ class Command(BaseCommand):
         
         return created_count
 
+    def new_account(self, row):
+        """Username, email and password for a student created by --sync"""
+        username = row['matric_no'].lower()
+        return username, f'{username}@trinity.edu', self.extract_surname(row['full_name'])
+
+    def handle_sync(self, csv_path, dry_run, deactivate_missing):
+        """Apply the roster diff in batches and print it"""
+        if not os.path.exists(csv_path):
+            self.stdout.write(self.style.ERROR(f'❌ File not found: {csv_path}'))
+            return
+        
+        heading = 'Roster diff (dry run)' if dry_run else 'Syncing roster'
+        self.stdout.write(f'\n📂 {heading}: {csv_path}\n')
+        lines = sync_roster(csv_path, self.new_account, deactivate_missing=deactivate_missing, dry_run=dry_run)
+        for line in lines:
+            self.stdout.write(line)
+
     def handle_single_student(self, full_name, matric_no, gender, level):
         """Handle creating a single student"""
         self.stdout.write(f'\n👤 Creating single student...')
@@ -169,8 +202,16 @@ class Command(BaseCommand):
 
         created_count = 0
 
+        # Make the database match the roster
+        if options['sync']:
+            if not options['csv']:
+                self.stdout.write(self.style.ERROR('❌ --sync needs --csv'))
+                return
+            self.handle_sync(options['csv'], options['dry_run'], options['deactivate_missing'])
+            return
+
         # Handle CSV file
-        if options['csv']:
+        elif options['csv']:
             created_count = self.handle_csv(options['csv'])
 
         # Handle single student
@@ -191,6 +232,8 @@ class Command(BaseCommand):
             self.stdout.write('     python manage.py create_students_custom --csv students.csv')
             self.stdout.write('\n  3. With admin:')
             self.stdout.write('     python manage.py create_students_custom --admin --csv students.csv')
+            self.stdout.write('\n  4. Sync the roster (preview first):')
+            self.stdout.write('     python manage.py create_students_custom --csv students.csv --sync --dry-run')
             return
 
         # Summary
@@ -1,6 +1,15 @@
-from django.core.management.base import BaseCommand
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from hostels.models import StudentProfile
+from django.db import transaction
+from django.db.models import F
+from hostels import caching
+from hostels.models import (
+    StudentProfile, StudentSearchToken, Hostel, Room, HostelRequest, Allocation, AllocationEvent, current_session_id
+)
 
 
 class Command(BaseCommand):
@@ -24,6 +33,31 @@ class Command(BaseCommand):
             default='studentpass123',
             help='Password for created accounts'
         )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Bulk-insert accounts in batches, hashing the password once per batch (for load tests)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='With --fast: accounts per batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--seed-requests',
+            type=int,
+            default=0,
+            metavar='PERCENT',
+            help='With --fast: give this percentage of new students a pending hostel request'
+        )
+        parser.add_argument(
+            '--seed-allocations',
+            type=int,
+            default=0,
+            metavar='PERCENT',
+            help='With --fast: allocate this percentage of new students a free bed (approved request)'
+        )
 
     def handle(self, *args, **options):
         count = options['count']
@@ -47,6 +81,11 @@ class Command(BaseCommand):
                 )
                 self.stdout.write(self.style.SUCCESS('✅ Admin created: admin / admin123456'))
 
+        if options['fast']:
+            created_count = self.create_students_fast(count, password, options)
+            self.print_credentials(created_count, password)
+            return
+
         # Create students
         self.stdout.write(f'\n👥 Creating {count} test students...')
         genders = ['M', 'F']
@@ -85,7 +124,10 @@ class Command(BaseCommand):
                     self.style.ERROR(f'❌ Error creating {username}: {str(e)}')
                 )
 
-        # Summary
+        self.print_credentials(created_count, password)
+
+    def print_credentials(self, created_count, password):
+        """Summary"""
         self.stdout.write('\n' + self.style.SUCCESS('=' * 60))
         self.stdout.write(self.style.SUCCESS('✅ User Creation Complete!'))
         self.stdout.write(self.style.SUCCESS('=' * 60))
@@ -99,3 +141,190 @@ class Command(BaseCommand):
         self.stdout.write('   Student Login: /accounts/login/')
         
         self.stdout.write(self.style.SUCCESS('\n✨ Ready to use!\n'))
+
+    def create_students_fast(self, count, password, options):
+        """
+        Create students with bulk_create in batches.
+
+        The password is hashed once per batch with a fresh salt, instead of
+        a full PBKDF2 run per account. Accounts that already exist are
+        skipped. Returns the number of students created.
+        """
+        batch_size = options['batch_size']
+        seed_requests = options['seed_requests']
+        seed_allocations = options['seed_allocations']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        if not (0 <= seed_requests <= 100 and 0 <= seed_allocations <= 100 and seed_requests + seed_allocations <= 100):
+            raise CommandError('--seed-requests and --seed-allocations are percentages adding up to at most 100')
+
+        seeder = None
+        if seed_requests or seed_allocations:
+            session_id = current_session_id()
+            if session_id is None:
+                raise CommandError('Seeding requests needs a current academic session (see start_session)')
+            seeder = Seeder(session_id, seed_requests, seed_allocations)
+
+        self.stdout.write(f'\n⚡ Creating {count} test students in batches of {batch_size}...')
+        genders = ['M', 'F']
+        levels = ['100', '200', '300', '400']
+        created_count = 0
+        skipped_count = 0
+        start = time.perf_counter()
+
+        for first in range(1, count + 1, batch_size):
+            numbers = range(first, min(first + batch_size, count + 1))
+            usernames = [f'stu{i:03d}' for i in numbers]
+            taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+            taken_matrics = set(StudentProfile.objects.filter(
+                matric_no__in=[f'STU{i:03d}' for i in numbers]
+            ).values_list('matric_no', flat=True))
+            numbers = [i for i in numbers if f'stu{i:03d}' not in taken and f'STU{i:03d}' not in taken_matrics]
+            skipped_count += len(usernames) - len(numbers)
+            if not numbers:
+                continue
+
+            # One hash, with its own salt, for every account in the batch
+            password_hash = make_password(password)
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f'stu{i:03d}', email=f'stu{i:03d}@trinity.edu', password=password_hash)
+                    for i in numbers
+                ])
+                if users[0].pk is None:
+                    # Backends that cannot return ids from bulk inserts
+                    ids = dict(User.objects.filter(
+                        username__in=[user.username for user in users]
+                    ).values_list('username', 'pk'))
+                    for user in users:
+                        user.pk = ids[user.username]
+
+                students = StudentProfile.objects.bulk_create([
+                    StudentProfile(
+                        user_id=user.pk,
+                        matric_no=f'STU{i:03d}',
+                        gender=genders[i % 2],
+                        level=levels[i % 4],
+                        search_name=StudentProfile.build_search_name(f'STU{i:03d}', '', ''),
+                    )
+                    for i, user in zip(numbers, users)
+                ])
+                StudentSearchToken.index(
+                    StudentProfile.objects.filter(matric_no__in=[student.matric_no for student in students])
+                )
+                if seeder is not None:
+                    if students[0].pk is None:
+                        ids = dict(StudentProfile.objects.filter(
+                            matric_no__in=[student.matric_no for student in students]
+                        ).values_list('matric_no', 'pk'))
+                        for student in students:
+                            student.pk = ids[student.matric_no]
+                    seeder.seed(zip(numbers, students))
+
+            created_count += len(users)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'   {created_count} created ({created_count / elapsed:.0f} accounts/s)')
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 {created_count} students in {elapsed:.1f}s ({created_count / elapsed if elapsed else 0:.0f} accounts/s)'
+        ))
+        if skipped_count:
+            self.stdout.write(self.style.WARNING(f'⚠️  {skipped_count} existing account(s) skipped'))
+        if seeder is not None:
+            self.stdout.write(f'   Pending requests: {seeder.requested}')
+            self.stdout.write(f'   Allocations: {seeder.allocated}')
+            if seeder.out_of_beds:
+                self.stdout.write(self.style.WARNING(f'⚠️  {seeder.out_of_beds} student(s) not allocated: no free beds'))
+        return created_count
+
+
+class Seeder:
+    """
+    Bulk-seed hostel requests and allocations for newly created students.
+
+    Student i is allocated when i % 100 falls below the allocation
+    percentage and gets a pending request when it falls in the next
+    request-percentage band. Allocations fill free beds of the student's
+    gender in hostel order and are written to the ledger like any other.
+    """
+
+    def __init__(self, session_id, request_percent, allocation_percent):
+        self.session_id = session_id
+        self.request_percent = request_percent
+        self.allocation_percent = allocation_percent
+        self.requested = 0
+        self.allocated = 0
+        self.out_of_beds = 0
+
+        self.hostels = {}
+        for hostel_id, gender in Hostel.objects.order_by('name').values_list('id', 'gender'):
+            self.hostels.setdefault(gender, hostel_id)
+
+        self.free_beds = defaultdict(list)
+        rooms = Room.objects.filter(current_occupancy__lt=F('capacity')).order_by(
+            'floor__hostel__name', 'floor__floor_type', 'room_number'
+        ).values_list('id', 'capacity', 'current_occupancy', 'floor__hostel_id', 'floor__hostel__gender')
+        for room_id, capacity, occupancy, hostel_id, gender in rooms:
+            self.free_beds[gender].extend([(room_id, capacity, hostel_id)] * (capacity - occupancy))
+        for beds in self.free_beds.values():
+            # Pop from the end
+            beds.reverse()
+
+    def seed(self, numbered_students):
+        capacities = [value for value, label in HostelRequest.CAPACITY_CHOICES]
+        pending = []
+        approved = []
+        for i, student in numbered_students:
+            band = i % 100
+            if band < self.allocation_percent:
+                if not self.free_beds[student.gender]:
+                    self.out_of_beds += 1
+                    continue
+                room_id, capacity, hostel_id = self.free_beds[student.gender].pop()
+                approved.append((student, room_id, HostelRequest(
+                    student=student, session_id=self.session_id, hostel_id=hostel_id,
+                    preferred_capacity=capacity if capacity in capacities else capacities[0], status='APPROVED',
+                )))
+            elif band < self.allocation_percent + self.request_percent and student.gender in self.hostels:
+                pending.append(HostelRequest(
+                    student=student, session_id=self.session_id, hostel_id=self.hostels[student.gender],
+                    preferred_capacity=capacities[i % len(capacities)],
+                ))
+
+        HostelRequest.objects.bulk_create(pending)
+        self.requested += len(pending)
+        if not approved:
+            return
+
+        requests = HostelRequest.objects.bulk_create([hostel_request for student, room_id, hostel_request in approved])
+        if requests[0].pk is None:
+            ids = dict(HostelRequest.objects.filter(
+                session_id=self.session_id, student__in=[student for student, room_id, request in approved]
+            ).values_list('student_id', 'pk'))
+            for hostel_request in requests:
+                hostel_request.pk = ids[hostel_request.student_id]
+
+        Allocation.objects.bulk_create([
+            Allocation(student=student, session_id=self.session_id, room_id=room_id)
+            for student, room_id, hostel_request in approved
+        ])
+        # The same events approve_hostel_request records, so ledger replays keep the seed
+        events = []
+        for student, room_id, hostel_request in approved:
+            for kind in ('ALLOCATE', 'APPROVE'):
+                events.append(AllocationEvent(
+                    kind=kind, student_id=student.pk, room_id=room_id,
+                    session_id=self.session_id, request_id=hostel_request.pk,
+                ))
+        AllocationEvent.objects.bulk_create(events)
+
+        # One UPDATE per distinct number of beds taken in a room
+        taken = Counter(room_id for student, room_id, hostel_request in approved)
+        by_count = defaultdict(list)
+        for room_id, beds in taken.items():
+            by_count[beds].append(room_id)
+        for beds, room_ids in by_count.items():
+            Room.objects.filter(pk__in=room_ids).update(current_occupancy=F('current_occupancy') + beds)
+        caching.occupancy_changed(list(taken))
+        self.allocated += len(approved)
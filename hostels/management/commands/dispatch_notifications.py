@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from hostels.notifications import dispatch_outbox
+
+
+class Command(BaseCommand):
+    help = 'Email pending student notifications from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Notifications per email connection (default: NOTIFICATION_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--every',
+            type=int,
+            help='Keep running and drain the outbox every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            dispatched = dispatch_outbox(batch_size=options['batch_size'])
+            if dispatched:
+                self.stdout.write(self.style.SUCCESS(f'✅ Dispatched {dispatched} notification(s)'))
+
+            if not options['every']:
+                break
+            time.sleep(options['every'])
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from hostels import ledger
+from hostels.models import Hostel, Room
+
+
+class Command(BaseCommand):
+    help = 'Show room occupancy at a point in time, rebuilt from the allocation ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--at',
+            type=str,
+            help='Point in time, e.g. "2026-10-19 10:00" (default: now, in TIME_ZONE)'
+        )
+        parser.add_argument(
+            '--hostel',
+            type=str,
+            help='Hostel name (default: all hostels)'
+        )
+
+    def handle(self, *args, **options):
+        when = None
+        if options['at']:
+            try:
+                when = datetime.fromisoformat(options['at'])
+            except ValueError:
+                raise CommandError(f'Invalid --at value: {options["at"]}')
+            if timezone.is_naive(when):
+                when = timezone.make_aware(when)
+
+        hostel = None
+        if options['hostel']:
+            hostel = Hostel.objects.filter(name__iexact=options['hostel']).first()
+            if hostel is None:
+                raise CommandError(f'Hostel not found: {options["hostel"]}')
+
+        occupancy = ledger.occupancy_at(when, hostel=hostel)
+
+        rooms = Room.objects.select_related('floor__hostel').order_by(
+            'floor__hostel__name', 'floor__floor_type', 'room_number'
+        )
+        if hostel is not None:
+            rooms = rooms.filter(floor__hostel=hostel)
+
+        label = when.strftime('%Y-%m-%d %H:%M %Z') if when else 'now'
+        self.stdout.write(self.style.SUCCESS(f'\n🏠 Occupancy at {label}\n'))
+
+        totals = {}
+        for room in rooms:
+            occupied = occupancy.get(room.pk, 0)
+            name = room.floor.hostel.name
+            used, capacity = totals.get(name, (0, 0))
+            totals[name] = (used + occupied, capacity + room.capacity)
+            self.stdout.write(f'   {name:<10} {room.floor.floor_type} {room.room_number:<8} {occupied}/{room.capacity}')
+
+        self.stdout.write('')
+        for name, (used, capacity) in totals.items():
+            self.stdout.write(self.style.SUCCESS(f'📊 {name}: {used}/{capacity} beds occupied'))
@@ -0,0 +1,248 @@
+import http.cookiejar
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+HOSTEL_SELECT_RE = re.compile(r'<select[^>]*id="id_hostel"[^>]*>(.*?)</select>', re.S)
+OPTION_VALUE_RE = re.compile(r'<option value="(\d+)"')
+
+STEPS = ['login_page', 'login', 'request_page', 'rooms_api', 'submit']
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects to the caller instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Stats:
+    """Thread-safe latency and error collection per step"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {step: [] for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self.already_requested = 0
+        self.throttled = 0
+
+    def add(self, step, seconds, ok, status=None):
+        with self.lock:
+            self.latencies[step].append(seconds)
+            if not ok:
+                self.errors[step] += 1
+            if status == 429:
+                self.throttled += 1
+
+    def skip(self):
+        with self.lock:
+            self.already_requested += 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay the allocation-day rush (login, request page, room polling, submit) '
+        'against a running server with generated student accounts. Every virtual student '
+        'comes from this machine\'s IP, so start the server with RATE_LIMIT_ENABLED=False, or '
+        'with RATE_LIMIT_TRUST_FORWARDED=True and pass --forwarded-for'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            default='http://127.0.0.1:8000',
+            help='Server to load (default: http://127.0.0.1:8000; plain HTTP needs DEBUG=True, otherwise cookies are HTTPS-only)'
+        )
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=100,
+            help='Number of virtual students, using accounts STU001.. from create_test_users (default: 100)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=20,
+            help='Students active at the same time (default: 20)'
+        )
+        parser.add_argument(
+            '--polls',
+            type=int,
+            default=3,
+            help='Rooms API polls per student before submitting (default: 3)'
+        )
+        parser.add_argument(
+            '--password',
+            type=str,
+            default='studentpass123',
+            help='Password of the generated accounts'
+        )
+        parser.add_argument(
+            '--create-accounts',
+            action='store_true',
+            help='Run create_test_users --fast for the needed accounts first (same database as the server)'
+        )
+        parser.add_argument(
+            '--forwarded-for',
+            action='store_true',
+            help='Send a distinct X-Forwarded-For address per student, so a server with '
+                 'RATE_LIMIT_TRUST_FORWARDED=True rate limits each one separately'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30.0,
+            help='Per-request timeout in seconds (default: 30)'
+        )
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.password = options['password']
+        self.polls = options['polls']
+        self.timeout = options['timeout']
+        self.forwarded_for = options['forwarded_for']
+        self.stats = Stats()
+
+        if options['create_accounts']:
+            call_command(
+                'create_test_users', count=options['students'], password=self.password, fast=True, stdout=self.stdout
+            )
+
+        try:
+            urllib.request.urlopen(f'{self.base_url}/accounts/login/', timeout=self.timeout)
+        except (urllib.error.URLError, OSError) as e:
+            raise CommandError(f'Cannot reach {self.base_url}: {e}')
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('Allocation-Day Rush Load Test'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(
+            f'\n🎯 {self.base_url}: {options["students"]} students, '
+            f'concurrency {options["concurrency"]}, {self.polls} room polls each\n'
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(self.run_student, range(1, options['students'] + 1)))
+        elapsed = time.perf_counter() - start
+
+        self.report(elapsed)
+
+    def request(self, opener, step, path, data=None, expect=(200,)):
+        """Time one request; returns the body (or '' on failure)"""
+        url = f'{self.base_url}{path}'
+        body = None
+        if data is not None:
+            body = urllib.parse.urlencode(data).encode()
+
+        request = urllib.request.Request(url, data=body, headers={'Referer': url})
+        start = time.perf_counter()
+        try:
+            with opener.open(request, timeout=self.timeout) as response:
+                status = response.status
+                content = response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            # Unfollowed redirects and error statuses both land here
+            status = e.code
+            content = ''
+        except (urllib.error.URLError, OSError):
+            status = None
+            content = ''
+
+        self.stats.add(step, time.perf_counter() - start, status in expect, status)
+        return content
+
+    def run_student(self, number):
+        matric_no = f'STU{number:03d}'
+        cookies = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies), NoRedirect)
+        if self.forwarded_for:
+            opener.addheaders.append(('X-Forwarded-For', f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'))
+
+        page = self.request(opener, 'login_page', '/accounts/login/')
+        token = CSRF_TOKEN_RE.search(page)
+        if not token:
+            return
+
+        self.request(opener, 'login', '/accounts/login/', {
+            'csrfmiddlewaretoken': token.group(1),
+            'username': matric_no,
+            'password': self.password,
+        }, expect=(302,))
+
+        # Students with an active request are redirected to their dashboard
+        page = self.request(opener, 'request_page', '/student/request-hostel/', expect=(200, 302))
+        token = CSRF_TOKEN_RE.search(page)
+        hostels = HOSTEL_SELECT_RE.search(page)
+        hostel_ids = OPTION_VALUE_RE.findall(hostels.group(1)) if hostels else []
+        if not token or not hostel_ids:
+            self.stats.skip()
+            return
+
+        hostel_id = random.choice(hostel_ids)
+        capacity = random.choice([2, 4, 6])
+        for _ in range(self.polls):
+            self.request(opener, 'rooms_api', f'/api/rooms/?hostel_id={hostel_id}&capacity={capacity}')
+
+        self.request(opener, 'submit', '/student/request-hostel/', {
+            'csrfmiddlewaretoken': token.group(1),
+            'hostel': hostel_id,
+            'preferred_capacity': capacity,
+            'note': 'Load test',
+        }, expect=(302,))
+
+    def report(self, elapsed):
+        self.stdout.write(
+            f'{"Step":<14}{"count":>7}{"errors":>8}{"err %":>7}{"req/s":>9}'
+            f'{"p50 ms":>9}{"p90 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}'
+        )
+
+        total = 0
+        total_errors = 0
+        for step in STEPS:
+            latencies = sorted(self.stats.latencies[step])
+            count = len(latencies)
+            errors = self.stats.errors[step]
+            total += count
+            total_errors += errors
+            if not count:
+                continue
+            self.stdout.write(
+                f'{step:<14}{count:>7}{errors:>8}{errors / count * 100:>6.1f}%{count / elapsed:>9.1f}'
+                f'{percentile(latencies, 0.50) * 1000:>9.1f}{percentile(latencies, 0.90) * 1000:>9.1f}'
+                f'{percentile(latencies, 0.95) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}'
+                f'{latencies[-1] * 1000:>9.1f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), '
+            f'{total_errors} errors ({(total_errors / total * 100) if total else 0:.1f}%)'
+        ))
+        if self.stats.throttled:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {self.stats.throttled} request(s) were rate limited (429); start the server with '
+                f'RATE_LIMIT_ENABLED=False, or with RATE_LIMIT_TRUST_FORWARDED=True and pass --forwarded-for'
+            ))
+        if self.stats.already_requested:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {self.stats.already_requested} student(s) did not submit '
+                f'(active request already exists or the request page failed)\n'
+            ))
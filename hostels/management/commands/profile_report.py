@@ -0,0 +1,101 @@
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Aggregate request profiles written by ProfilingMiddleware into the hottest functions per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            type=str,
+            default=None,
+            help='Profile directory (default: PROFILING_DIR)'
+        )
+        parser.add_argument(
+            '--view',
+            type=str,
+            help='Only report views whose name contains this text'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Functions to show per view (default: 15)'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=['cumulative', 'tottime', 'calls'],
+            default='cumulative',
+            help='Ranking column (default: cumulative)'
+        )
+        parser.add_argument(
+            '--app-only',
+            action='store_true',
+            help='Only show functions defined in this project (not Django or the standard library)'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        if not os.path.isdir(directory):
+            raise CommandError(f'No profiles found in {directory}')
+
+        views = sorted(
+            name for name in os.listdir(directory)
+            if os.path.isdir(os.path.join(directory, name))
+            and (not options['view'] or options['view'] in name)
+        )
+
+        self.stdout.write(self.style.SUCCESS('=' * 90))
+        self.stdout.write(self.style.SUCCESS(f'Request Profiles ({directory})'))
+        self.stdout.write(self.style.SUCCESS('=' * 90))
+
+        if not views:
+            self.stdout.write(self.style.WARNING('\n⚠️  No matching profiles'))
+            return
+
+        for view in views:
+            view_dir = os.path.join(directory, view)
+            dumps = [os.path.join(view_dir, name) for name in sorted(os.listdir(view_dir)) if name.endswith('.prof')]
+            if not dumps:
+                continue
+
+            stats = pstats.Stats(dumps[0], stream=self.stdout)
+            for dump in dumps[1:]:
+                stats.add(dump)
+            self.report_view(view, len(dumps), stats, options)
+
+    def report_view(self, view, count, stats, options):
+        per_request = stats.total_tt / count
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 {view}: {count} profile(s), {per_request * 1000:.1f} ms profiled per request'
+        ))
+
+        column = {'cumulative': 3, 'tottime': 2, 'calls': 1}[options['sort']]
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)
+        if options['app_only']:
+            rows = [row for row in rows if self.is_app_code(row[0][0])]
+
+        self.stdout.write(f'   {"calls/req":>10} {"own ms/req":>11} {"cum ms/req":>11}  function')
+        for (filename, lineno, function), (cc, calls, tottime, cumtime, callers) in rows[:options['top']]:
+            self.stdout.write(
+                f'   {calls / count:>10.1f} {tottime / count * 1000:>11.2f} {cumtime / count * 1000:>11.2f}  '
+                f'{self.location(filename, lineno)}({function})'
+            )
+
+    def is_app_code(self, filename):
+        # Built-ins are reported as '~' and frozen modules as '<frozen ...>'
+        if not os.path.isabs(filename):
+            return False
+        return filename.startswith(str(settings.BASE_DIR)) and 'site-packages' not in filename
+
+    def location(self, filename, lineno):
+        if filename == '~':
+            # Built-in functions have no source file
+            return ''
+        if self.is_app_code(filename):
+            filename = os.path.relpath(filename, settings.BASE_DIR)
+        return f'{filename}:{lineno}'
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from hostels.reconfigure import SPEC_FIELDS, read_spec, reconfigure_rooms, report_lines
+
+
+class Command(BaseCommand):
+    help = 'Add rooms and change room capacities or numbers in bulk from a CSV spec, validated as a whole'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'spec',
+            type=str,
+            help='CSV file with the columns ' + ','.join(SPEC_FIELDS)
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the spec and show the changes without applying them'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['spec'], 'r', encoding='utf-8') as spec:
+                text = spec.read()
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['spec']}")
+
+        changes, read_errors = read_spec(text)
+        plan = {'update': [], 'add': [], 'errors': []}
+        if not read_errors:
+            plan = reconfigure_rooms(changes, dry_run=options['dry_run'])
+        failed = bool(read_errors or plan['errors'])
+
+        heading = 'Room Reconfiguration (dry run)' if options['dry_run'] else 'Room Reconfiguration'
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(heading))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        for line in report_lines(plan, read_errors, applied=not options['dry_run']):
+            self.stdout.write(line)
+        self.stdout.write('')
+
+        if failed:
+            raise CommandError('The spec has invalid changes; no rooms were changed')
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from hostels.routers import REPORTING_ALIAS, refresh_sqlite_copy
+
+
+class Command(BaseCommand):
+    help = 'Refresh the SQLite reporting copy from the primary database using the online backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every',
+            type=int,
+            help='Keep running and refresh every N seconds (should be below REPORTING_MAX_STALENESS)'
+        )
+
+    def handle(self, *args, **options):
+        if REPORTING_ALIAS not in settings.DATABASES:
+            raise CommandError('No reporting database configured. Set REPORTING_DB_NAME first.')
+
+        for alias in ('default', REPORTING_ALIAS):
+            if settings.DATABASES[alias]['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f'The {alias} database is not SQLite; refresh it with your replication tooling.')
+
+        while True:
+            start = time.perf_counter()
+            refresh_sqlite_copy()
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Reporting copy refreshed in {(time.perf_counter() - start) * 1000:.0f} ms'
+            ))
+
+            if not options['every']:
+                break
+            time.sleep(options['every'])
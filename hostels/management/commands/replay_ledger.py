@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from hostels import ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild allocations and room occupancy from the allocation ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the changes without applying them'
+        )
+        parser.add_argument(
+            '--checkpoint-every',
+            type=int,
+            help='Write a checkpoint every N events (default: LEDGER_CHECKPOINT_EVERY)'
+        )
+
+    def handle(self, *args, **options):
+        summary = ledger.replay(
+            checkpoint_every=options['checkpoint_every'],
+            dry_run=options['dry_run'],
+        )
+
+        heading = 'Ledger Replay (dry run)' if options['dry_run'] else 'Ledger Replay Complete!'
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(heading))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(f'\n📊 Allocations in ledger: {summary["allocations"]}')
+        self.stdout.write(f'   Created: {summary["created"]}')
+        self.stdout.write(f'   Moved: {summary["moved"]}')
+        self.stdout.write(f'   Deleted: {summary["deleted"]}')
+        self.stdout.write(f'   Rooms with corrected occupancy: {summary["rooms_fixed"]}')
+        self.stdout.write(f'   New checkpoints: {summary["checkpoints"]}\n')
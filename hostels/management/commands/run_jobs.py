@@ -0,0 +1,88 @@
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from hostels import jobs, ledger
+from hostels.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.JOB_CONCURRENCY,
+            help=f'Maximum jobs run at once by this worker (default: {settings.JOB_CONCURRENCY})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no jobs are due instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        self.stdout.write(self.style.SUCCESS(
+            f'👷 Worker {worker_id} started (concurrency {concurrency}, jobs: {", ".join(jobs.registered_jobs())})'
+        ))
+
+        # Checkpoint now if no checkpoint run is waiting; each run schedules the next
+        ledger.schedule_checkpoint(delay=0)
+
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+            try:
+                while True:
+                    in_flight = {future for future in in_flight if not future.done()}
+
+                    requeued, failed = jobs.requeue_stale_jobs()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f'⚠️  Requeued {requeued} stale job(s)'))
+                    if failed:
+                        self.stdout.write(self.style.ERROR(f'❌ {failed} stale job(s) out of attempts, marked failed'))
+
+                    # Heartbeat so our running jobs are not mistaken for stale ones
+                    Job.objects.filter(status='RUNNING', locked_by=worker_id).update(updated_at=timezone.now())
+
+                    claimed = False
+                    while len(in_flight) < concurrency:
+                        job = jobs.claim_next_job(worker_id)
+                        if job is None:
+                            break
+                        claimed = True
+                        self.stdout.write(f'▶️  {job} (attempt {job.attempts}/{job.max_attempts})')
+                        in_flight.add(pool.submit(self.run_in_thread, job))
+
+                    if options['burst'] and not claimed and not in_flight:
+                        break
+                    if not claimed:
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('\n⏹️  Stopping; waiting for running jobs to finish...'))
+
+        self.stdout.write(self.style.SUCCESS('✨ Worker stopped'))
+
+    def run_in_thread(self, job):
+        try:
+            if jobs.run_job(job):
+                self.stdout.write(self.style.SUCCESS(f'✅ {job}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'❌ {job}: {job.message}'))
+        finally:
+            # Each worker thread has its own connection
+            connection.close()
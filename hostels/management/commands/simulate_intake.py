@@ -0,0 +1,165 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from hostels.capacity import CAPACITIES, load_topology, simulate
+from hostels.models import Hostel, StudentProfile
+
+GENDERS = {value for value, label in Hostel.GENDER_CHOICES}
+LEVELS = {value for value, label in StudentProfile.LEVEL_CHOICES}
+
+
+def parse_intake(values):
+    """['F:100=400', ...] -> {('F', '100'): 400}"""
+    intake = {}
+    for value in values:
+        match = re.fullmatch(r'([A-Za-z]):(\d+)=(\d+)', value.strip())
+        if not match:
+            raise CommandError(f'Bad --intake {value!r}, expected GENDER:LEVEL=COUNT, e.g. F:100=400')
+        gender, level, count = match.group(1).upper(), match.group(2), int(match.group(3))
+        if gender not in GENDERS:
+            raise CommandError(f'Unknown gender {gender!r} in --intake {value!r}')
+        if level not in LEVELS:
+            raise CommandError(f'Unknown level {level!r} in --intake {value!r}')
+        intake[(gender, level)] = intake.get((gender, level), 0) + count
+    return intake
+
+
+def parse_preferences(values):
+    """['2=0.4,4=0.35,6=0.25', '100:2=0.6,4=0.4'] -> {None: {2: 0.4, ...}, '100': {2: 0.6, 4: 0.4}}"""
+    preferences = {}
+    for value in values:
+        level, _, weights = value.strip().rpartition(':')
+        if level and level not in LEVELS:
+            raise CommandError(f'Unknown level {level!r} in --preferences {value!r}')
+        distribution = {}
+        for item in weights.split(','):
+            capacity, _, weight = item.partition('=')
+            try:
+                capacity, weight = int(capacity), float(weight)
+            except ValueError:
+                raise CommandError(f'Bad --preferences {value!r}, expected [LEVEL:]CAPACITY=WEIGHT,...')
+            if capacity not in CAPACITIES:
+                raise CommandError(f'Capacity {capacity} in --preferences is not a requestable capacity')
+            if weight < 0:
+                raise CommandError(f'Negative weight in --preferences {value!r}')
+            distribution[capacity] = weight
+        if not sum(distribution.values()):
+            raise CommandError(f'--preferences {value!r} has no positive weight')
+        preferences[level or None] = distribution
+    return preferences
+
+
+class Command(BaseCommand):
+    help = 'Simulate the next intake against the current rooms and report placement, unused beds and shortfall'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intake',
+            action='append',
+            default=[],
+            metavar='GENDER:LEVEL=COUNT',
+            help='Projected new students, e.g. --intake M:100=600 --intake F:100=450 (repeatable)'
+        )
+        parser.add_argument(
+            '--preferences',
+            action='append',
+            default=[],
+            metavar='[LEVEL:]CAPACITY=WEIGHT,...',
+            help='Room capacity preference distribution, e.g. 2=0.4,4=0.35,6=0.25; prefix with a level '
+                 'to override it for that level (default: all capacities equally likely)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=1000,
+            help='Number of randomized allocation rounds (default: 1000)'
+        )
+        parser.add_argument(
+            '--hostel-choice',
+            choices=['uniform', 'beds'],
+            default='uniform',
+            help='How students pick a hostel: equally often, or in proportion to its beds (default: uniform)'
+        )
+        parser.add_argument(
+            '--spread',
+            type=float,
+            default=0,
+            help='Relative uncertainty of the intake figures, e.g. 0.1 for ±10%% (default: 0)'
+        )
+        parser.add_argument(
+            '--from-current',
+            action='store_true',
+            help='Only use beds free today (returning students stay); by default all beds are free'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed, for repeatable runs'
+        )
+
+    def handle(self, *args, **options):
+        if not options['intake']:
+            raise CommandError('Give the projected intake with at least one --intake GENDER:LEVEL=COUNT')
+        if options['rounds'] < 1:
+            raise CommandError('--rounds must be positive')
+        if options['spread'] < 0:
+            raise CommandError('--spread cannot be negative')
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            raise CommandError('The capacity simulator needs NumPy: pip install numpy')
+
+        intake = parse_intake(options['intake'])
+        preferences = parse_preferences(options['preferences'])
+        topology = load_topology(from_current=options['from_current'])
+        if not topology:
+            raise CommandError('No rooms found. Run create_hostels_and_rooms first.')
+
+        started = time.perf_counter()
+        result = simulate(
+            topology,
+            intake,
+            preferences,
+            rounds=options['rounds'],
+            hostel_choice=options['hostel_choice'],
+            spread=options['spread'],
+            seed=options['seed'],
+        )
+        elapsed = time.perf_counter() - started
+
+        rate = result['placement_rate']
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(f'Intake Simulation: {result["rounds"]} rounds in {elapsed:.2f}s'))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(f'\n📊 Students: {result["students"]:.0f}   Placed: {result["placed"]:.1f}')
+        self.stdout.write(
+            f'   Placement rate: {rate["mean"]:.1%} (p5 {rate["p5"]:.1%}, p95 {rate["p95"]:.1%})'
+        )
+        for gender, students in result['unhoused'].items():
+            self.stdout.write(self.style.ERROR(f'❌ No {gender} hostel for {students:.0f} students'))
+
+        for hostel in result['hostels']:
+            self.stdout.write(
+                f'\n🏠 {hostel["name"]} ({hostel["gender"]}): {hostel["beds"]} beds, '
+                f'demand {hostel["demand"]:.1f}, placed {hostel["placed"]:.1f}'
+            )
+            self.stdout.write(
+                f'   {"Capacity":>8} {"Rooms":>6} {"Beds":>6} {"Wanted":>8} {"Got pref":>9} '
+                f'{"Overflow":>9} {"Unused":>8} {"Shortfall":>10}'
+            )
+            for row in hostel['classes']:
+                self.stdout.write(
+                    f'   {row["capacity"]:>8} {row["rooms"]:>6} {row["beds"]:>6} {row["demand"]:>8.1f} '
+                    f'{row["preferred"]:>9.1f} {row["absorbed"]:>9.1f} {row["unused"]:>8.1f} {row["shortfall"]:>10.1f}'
+                )
+            if hostel['unplaced']:
+                self.stdout.write(self.style.WARNING(
+                    f'   ⚠️  Unplaced: {hostel["unplaced"]:.1f} on average, '
+                    f'full in {hostel["unplaced_risk"]:.0%} of rounds'
+                ))
+
+        self.stdout.write(
+            '\nShortfall counts students who did not get their preferred capacity '
+            '(they are placed in another room of the hostel if one is free).\n'
+        )
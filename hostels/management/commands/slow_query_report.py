@@ -0,0 +1,94 @@
+import json
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Rank slow-query log fingerprints by total time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            type=str,
+            default=None,
+            help='Slow-query log file (default: SLOW_QUERY_LOG)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Fingerprints to show (default: 20)'
+        )
+        parser.add_argument(
+            '--hours',
+            type=float,
+            help='Only include entries from the last N hours'
+        )
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        if not os.path.exists(path):
+            raise CommandError(f'Slow-query log not found: {path}')
+
+        since = None
+        if options['hours']:
+            since = timezone.now() - timedelta(hours=options['hours'])
+
+        groups = {}
+        skipped = 0
+        with open(path, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if since is not None and parse_datetime(entry['at']) < since:
+                    continue
+
+                group = groups.setdefault(entry['fingerprint'], {
+                    'sql': entry['sql'],
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'params': 0,
+                    'callers': Counter(),
+                })
+                group['count'] += 1
+                group['total'] += entry['ms']
+                group['max'] = max(group['max'], entry['ms'])
+                group['params'] = max(group['params'], entry['params'])
+                group['callers'][entry['caller'] or entry['view'] or entry['path']] += 1
+
+        self.stdout.write(self.style.SUCCESS('=' * 90))
+        self.stdout.write(self.style.SUCCESS(f'Slow Queries ({path})'))
+        self.stdout.write(self.style.SUCCESS('=' * 90))
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'⚠️  Skipped {skipped} unreadable line(s)'))
+        if not groups:
+            self.stdout.write(self.style.WARNING('\n⚠️  No slow queries logged'))
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: item[1]['total'], reverse=True)
+        for rank, (key, group) in enumerate(ranked[:options['top']], 1):
+            mean = group['total'] / group['count']
+            self.stdout.write(self.style.SUCCESS(
+                f'\n{rank}. [{key}] {group["total"]:.1f} ms total, {group["count"]} call(s), '
+                f'mean {mean:.1f} ms, max {group["max"]:.1f} ms, up to {group["params"]} param(s)'
+            ))
+            self.stdout.write(f'   {group["sql"][:300]}')
+            for caller, count in group['callers'].most_common(3):
+                self.stdout.write(f'   ↳ {caller} ({count})')
+
+        total = sum(group['total'] for group in groups.values())
+        count = sum(group['count'] for group in groups.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 {count} slow queries, {len(groups)} fingerprints, {total / 1000:.1f} s total'
+        ))
@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from hostels.models import AcademicSession
+from hostels.services import activate_session
+
+
+class Command(BaseCommand):
+    help = 'Create an academic session (if needed) and make it the current one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name',
+            type=str,
+            help='Session name, e.g. 2025/2026'
+        )
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='First day of the session (YYYY-MM-DD), required for a new session'
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Last day of the session (YYYY-MM-DD), required for a new session'
+        )
+
+    def handle(self, *args, **options):
+        session = AcademicSession.objects.filter(name=options['name']).first()
+        if session is None:
+            if not (options['start'] and options['end']):
+                raise CommandError('--start and --end are required for a new session')
+            if options['end'] <= options['start']:
+                raise CommandError('--end must be after --start')
+            session = AcademicSession.objects.create(
+                name=options['name'],
+                start_date=options['start'],
+                end_date=options['end'],
+            )
+            self.stdout.write(f'✅ Created session {session.name}')
+
+        previous = AcademicSession.current()
+        activate_session(session)
+        allocated = session.allocations.count()
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(f'Current session: {session.name}'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        if previous and previous.pk != session.pk:
+            self.stdout.write(f'\n📊 Previous session: {previous.name}')
+        self.stdout.write(f'   Allocations in {session.name}: {allocated}')
+        self.stdout.write('   Room occupancy recomputed for the new session\n')
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_URLS = ['/', '/accounts/login/', '/admin/login/']
+
+
+class Command(BaseCommand):
+    help = 'Compare first-request latency in a fresh process with and without the boot-time warm-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help=f'URL to request, repeatable (default: {", ".join(DEFAULT_URLS)})'
+        )
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username to log in as before requesting (for pages behind login)'
+        )
+        parser.add_argument(
+            '--probe',
+            choices=['cold', 'warm'],
+            help='Internal: run one measurement in this process and print it as JSON'
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or DEFAULT_URLS
+        if options['probe']:
+            self.stdout.write(json.dumps(self.probe(options['probe'], urls, options['user'])))
+            return
+
+        results = {mode: self.run_probe(mode, urls, options['user']) for mode in ('cold', 'warm')}
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('Startup Report'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        self.stdout.write('\n🔥 Warm-up steps:')
+        for name, seconds, result in results['warm']['warmup']:
+            self.stdout.write(f'   {name:<12} {seconds * 1000:>8.1f} ms  ({result})')
+
+        self.stdout.write(f'\n{"URL":<28}{"cold first":>12}{"warm first":>12}{"steady":>10}')
+        for url in urls:
+            cold = results['cold']['requests'][url]
+            warm = results['warm']['requests'][url]
+            self.stdout.write(
+                f'{url:<28}{cold["first"]:>9.1f} ms{warm["first"]:>9.1f} ms{cold["second"]:>7.1f} ms'
+            )
+
+        cold_total = sum(r['first'] for r in results['cold']['requests'].values())
+        warm_total = sum(r['first'] for r in results['warm']['requests'].values())
+        warmup_total = sum(seconds for name, seconds, result in results['warm']['warmup']) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 First requests: {cold_total:.0f} ms cold, {warm_total:.0f} ms after a '
+            f'{warmup_total:.0f} ms warm-up ({cold_total - warm_total:.0f} ms moved to boot)'
+        ))
+        self.stdout.write(
+            f'   Process boot: {results["cold"]["boot"]:.2f} s cold, {results["warm"]["boot"]:.2f} s with warm-up\n'
+        )
+
+    def run_probe(self, mode, urls, user):
+        command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'startup_report', '--probe', mode]
+        for url in urls:
+            command += ['--url', url]
+        if user:
+            command += ['--user', user]
+
+        start = time.perf_counter()
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(f'{mode} probe failed:\n{completed.stderr}')
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['boot'] = time.perf_counter() - start
+        return result
+
+    def probe(self, mode, urls, username):
+        from django.contrib.auth.models import User
+        from django.test import Client
+        from hostels.warmup import warm_up
+
+        warmup = warm_up() if mode == 'warm' else []
+
+        client = Client()
+        if username:
+            try:
+                client.force_login(User.objects.get(username=username))
+            except User.DoesNotExist:
+                raise CommandError(f'User not found: {username}')
+
+        requests = {}
+        for url in urls:
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                client.get(url, secure=True)
+                timings.append((time.perf_counter() - start) * 1000)
+            requests[url] = {'first': timings[0], 'second': timings[1]}
+
+        return {'warmup': warmup, 'requests': requests}
@@ -0,0 +1,175 @@
+"""
+Opt-in diagnostics middleware for live requests
+"""
+import cProfile
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_log_lock = threading.Lock()
+
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST_RE = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def profile_dir_name(view_name):
+    """Filesystem-safe directory name for a view"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', view_name or 'unresolved')
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sample of requests with cProfile.
+
+    A random PROFILING_SAMPLE_RATE of requests is profiled, as is any request
+    from a staff user that sends the PROFILING_HEADER header. Each profile is
+    written to PROFILING_DIR/<view name>/ and only the newest PROFILING_KEEP
+    dumps per view are kept. Disabled unless PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = 'HTTP_' + settings.PROFILING_HEADER.upper().replace('-', '_')
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        self.save(profiler, match.view_name if match else None, elapsed)
+        return response
+
+    def should_profile(self, request):
+        if self.header in request.META:
+            user = getattr(request, 'user', None)
+            return bool(user and user.is_staff)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def save(self, profiler, view_name, elapsed):
+        directory = os.path.join(settings.PROFILING_DIR, profile_dir_name(view_name))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            filename = f"{time.time():.6f}-{os.getpid()}-{int(elapsed * 1000)}ms.prof"
+            profiler.dump_stats(os.path.join(directory, filename))
+
+            dumps = sorted(name for name in os.listdir(directory) if name.endswith('.prof'))
+            for name in dumps[:-settings.PROFILING_KEEP]:
+                os.remove(os.path.join(directory, name))
+        except OSError:
+            logger.exception("Could not write profile for %s", view_name)
+
+
+def fingerprint(sql):
+    """Normalize SQL so statements differing only in values group together"""
+    sql = sql.replace('%s', '?')
+    sql = STRING_LITERAL_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def app_call_site():
+    """The innermost stack frame in this project's code, outside this module"""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and 'site-packages' not in filename
+            and filename != __file__
+        ):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryMiddleware:
+    """
+    Log SQL statements slower than SLOW_QUERY_THRESHOLD_MS.
+
+    Every connection gets an execute wrapper for the duration of the
+    request. Each slow statement is appended to SLOW_QUERY_LOG as a JSON
+    line with its duration, fingerprint, parameter count and the project
+    code that issued it. Disabled unless SLOW_QUERY_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self.wrapper(request, alias)))
+            return self.get_response(request)
+
+    def wrapper(self, request, alias):
+        def timed(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = (time.perf_counter() - start) * 1000
+                if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+                    self.log(request, alias, sql, params, many, duration)
+        return timed
+
+    def log(self, request, alias, sql, params, many, duration):
+        normalized = fingerprint(sql)
+        if many:
+            # Count the parameters of one row of an executemany()
+            params = params[0] if isinstance(params, (list, tuple)) and params else ()
+        match = getattr(request, 'resolver_match', None)
+        entry = {
+            'at': timezone.now().isoformat(),
+            'ms': round(duration, 2),
+            'db': alias,
+            'fingerprint': hashlib.md5(normalized.encode()).hexdigest()[:12],
+            'sql': normalized[:2000],
+            'params': len(params or ()),
+            'many': many,
+            'caller': app_call_site(),
+            'view': match.view_name if match else None,
+            'path': request.path,
+        }
+
+        try:
+            os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG), exist_ok=True)
+            with _log_lock, open(settings.SLOW_QUERY_LOG, 'a', encoding='utf-8') as log:
+                log.write(json.dumps(entry) + '\n')
+        except OSError:
+            logger.exception("Could not write the slow-query log")
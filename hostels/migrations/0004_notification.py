@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 18:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0003_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('APPROVED', 'Request approved'), ('REJECTED', 'Request rejected')], max_length=10)),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('emailed_at', models.DateTimeField(blank=True, null=True)),
+                ('email_attempts', models.PositiveSmallIntegerField(default=0)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='hostels.studentprofile')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['student', '-created_at'], name='hostels_not_student_f9b837_idx'), models.Index(condition=models.Q(('emailed_at__isnull', True)), fields=['id'], name='notification_outbox_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_ledger(apps, schema_editor):
+    """Start the ledger with an ALLOCATE event for every existing allocation"""
+    Allocation = apps.get_model('hostels', 'Allocation')
+    AllocationEvent = apps.get_model('hostels', 'AllocationEvent')
+
+    AllocationEvent.objects.bulk_create(
+        [
+            AllocationEvent(
+                kind='ALLOCATE',
+                student_id=allocation.student_id,
+                room_id=allocation.room_id,
+                note='Seeded from existing allocation',
+                created_at=allocation.date_allocated,
+            )
+            for allocation in Allocation.objects.order_by('date_allocated', 'pk').iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0004_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_event_id', models.BigIntegerField(unique=True)),
+                ('taken_at', models.DateTimeField(db_index=True)),
+                ('allocations', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Ledger Checkpoint',
+                'verbose_name_plural': 'Ledger Checkpoints',
+                'ordering': ['-last_event_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AllocationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ALLOCATE', 'Allocate'), ('MOVE', 'Move'), ('RELEASE', 'Release'), ('APPROVE', 'Approve'), ('REJECT', 'Reject')], max_length=10)),
+                ('request_id', models.BigIntegerField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('from_room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.room')),
+                ('room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.room')),
+                ('student', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.studentprofile')),
+            ],
+            options={
+                'verbose_name': 'Allocation Event',
+                'verbose_name_plural': 'Allocation Events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(seed_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:15
+
+import datetime
+
+import django.db.models.deletion
+import hostels.models
+from django.db import migrations, models
+
+
+def academic_year(today):
+    """Sessions run from September to August"""
+    start_year = today.year if today.month >= 9 else today.year - 1
+    return (
+        f"{start_year}/{start_year + 1}",
+        datetime.date(start_year, 9, 1),
+        datetime.date(start_year + 1, 8, 31),
+    )
+
+
+def create_initial_session(apps, schema_editor):
+    """Create the current session that existing and new rows belong to"""
+    AcademicSession = apps.get_model('hostels', 'AcademicSession')
+    name, start_date, end_date = academic_year(datetime.date.today())
+    AcademicSession.objects.create(name=name, start_date=start_date, end_date=end_date, is_current=True)
+
+
+def assign_initial_session(apps, schema_editor):
+    """Put every existing request, allocation and ledger event in the initial session"""
+    session = apps.get_model('hostels', 'AcademicSession').objects.get(is_current=True)
+    for model_name in ('HostelRequest', 'Allocation', 'AllocationEvent', 'LedgerCheckpoint'):
+        apps.get_model('hostels', model_name).objects.update(session=session)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0005_allocation_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcademicSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='e.g. 2025/2026', max_length=20, unique=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('is_current', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Academic Session',
+                'verbose_name_plural': 'Academic Sessions',
+                'ordering': ['-start_date'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('is_current',), name='one_current_session')],
+            },
+        ),
+        migrations.RunPython(create_initial_session, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='allocation',
+            name='session',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='allocations', to='hostels.academicsession'),
+        ),
+        migrations.AddField(
+            model_name='allocationevent',
+            name='session',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.academicsession'),
+        ),
+        migrations.AddField(
+            model_name='hostelrequest',
+            name='session',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='hostel_requests', to='hostels.academicsession'),
+        ),
+        migrations.AddField(
+            model_name='ledgercheckpoint',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_checkpoints', to='hostels.academicsession'),
+        ),
+        migrations.RunPython(assign_initial_session, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='allocation',
+            name='session',
+            field=models.ForeignKey(default=hostels.models.current_session_id, on_delete=django.db.models.deletion.PROTECT, related_name='allocations', to='hostels.academicsession'),
+        ),
+        migrations.AlterField(
+            model_name='hostelrequest',
+            name='session',
+            field=models.ForeignKey(default=hostels.models.current_session_id, on_delete=django.db.models.deletion.PROTECT, related_name='hostel_requests', to='hostels.academicsession'),
+        ),
+        migrations.AlterField(
+            model_name='allocationevent',
+            name='session',
+            field=models.ForeignKey(blank=True, db_constraint=False, default=hostels.models.current_session_id, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.academicsession'),
+        ),
+        migrations.AlterField(
+            model_name='allocation',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='hostels.studentprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='allocation',
+            index=models.Index(fields=['session', 'room'], name='allocation_session_room_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='allocation',
+            index=models.Index(fields=['session', '-date_allocated'], name='allocation_session_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hostelrequest',
+            index=models.Index(fields=['session', 'status', '-created_at'], name='request_session_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hostelrequest',
+            index=models.Index(fields=['session', 'student', 'status'], name='request_session_student_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='allocation',
+            constraint=models.UniqueConstraint(fields=('student', 'session'), name='unique_allocation_per_session'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0006_academic_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedHostelRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('preferred_capacity', models.IntegerField(choices=[(2, '2 persons'), (4, '4 persons'), (6, '6 persons')])),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], max_length=10)),
+                ('note', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('hostel', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.hostel')),
+                ('preferred_room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.room')),
+                ('session', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hostels.academicsession')),
+                ('student', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_requests', to='hostels.studentprofile')),
+            ],
+            options={
+                'verbose_name': 'Archived Hostel Request',
+                'verbose_name_plural': 'Archived Hostel Requests',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['student', '-created_at'], name='archived_request_student_idx')],
+            },
+        ),
+    ]
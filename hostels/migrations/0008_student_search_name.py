@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:22
+
+from django.db import migrations, models
+
+
+def fill_search_name(apps, schema_editor):
+    """Build search_name for existing students in batches"""
+    StudentProfile = apps.get_model('hostels', 'StudentProfile')
+    batch = []
+    for student in StudentProfile.objects.select_related('user').iterator(chunk_size=500):
+        text = f"{student.matric_no} {student.user.first_name} {student.user.last_name}"
+        student.search_name = ' '.join(text.lower().split())[:200]
+        batch.append(student)
+        if len(batch) == 500:
+            StudentProfile.objects.bulk_update(batch, ['search_name'])
+            batch = []
+    StudentProfile.objects.bulk_update(batch, ['search_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0007_archived_hostel_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+    ]
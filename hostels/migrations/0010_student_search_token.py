@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-19 20:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_search_tokens(apps, schema_editor):
+    """Split the search_name of existing students into tokens in batches"""
+    StudentProfile = apps.get_model('hostels', 'StudentProfile')
+    StudentSearchToken = apps.get_model('hostels', 'StudentSearchToken')
+    batch = []
+    for pk, search_name in StudentProfile.objects.values_list('pk', 'search_name').iterator(chunk_size=500):
+        batch.extend(StudentSearchToken(student_id=pk, token=token) for token in sorted(set(search_name.split())))
+        if len(batch) >= 500:
+            StudentSearchToken.objects.bulk_create(batch)
+            batch = []
+    StudentSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0009_notification_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=200)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='hostels.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'student'], name='hostels_stu_token_7c5769_idx')],
+            },
+        ),
+        migrations.RunPython(fill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,55 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+class AcademicSession(models.Model):
+    """
+    Academic session that hostel requests and allocations belong to.
+
+    Exactly one session is current; hot-path queries filter on it, and
+    earlier sessions are kept for reporting.
+    """
+    name = models.CharField(max_length=20, unique=True, help_text="e.g. 2025/2026")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_current = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        verbose_name = "Academic Session"
+        verbose_name_plural = "Academic Sessions"
+        ordering = ['-start_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['is_current'],
+                condition=models.Q(is_current=True),
+                name='one_current_session',
+            ),
+        ]
+    
+    @classmethod
+    def current(cls):
+        """
+        Get the current session.
+        
+        Read from the database every time (an index lookup on the partial
+        unique index): start_session runs in its own process, so a cached
+        copy in a web worker would outlive a session change.
+        """
+        return cls.objects.filter(is_current=True).first()
+
+
+def current_session_id():
+    """Default session for new requests, allocations and ledger events"""
+    session = AcademicSession.current()
+    return session.pk if session else None
 
 
 class StudentProfile(models.Model):
@@ -21,6 +70,8 @@ class StudentProfile(models.Model):
     matric_no = models.CharField(max_length=20, unique=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
     level = models.CharField(max_length=3, choices=LEVEL_CHOICES)
+    # "<matric> <full name>" lowercased, kept in step with the user's name
+    search_name = models.CharField(max_length=200, db_index=True, editable=False, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -30,6 +81,69 @@ class StudentProfile(models.Model):
     class Meta:
         verbose_name = "Student Profile"
         verbose_name_plural = "Student Profiles"
+    
+    @staticmethod
+    def normalize(text):
+        """Lowercase and collapse whitespace, as stored in search_name"""
+        return ' '.join(text.lower().split())
+    
+    @classmethod
+    def build_search_name(cls, matric_no, first_name, last_name):
+        return cls.normalize(f"{matric_no} {first_name} {last_name}")[:200]
+    
+    @staticmethod
+    def prefix_range(field, prefix):
+        """
+        Q for `field` starting with `prefix` as a plain range comparison.
+
+        SQLite compiles __startswith to LIKE ... ESCAPE, which cannot use an
+        index; field >= prefix AND field < successor is an index range scan.
+        """
+        successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return models.Q(**{f'{field}__gte': prefix, f'{field}__lt': successor})
+    
+    @classmethod
+    def search_filter(cls, term, prefix=''):
+        """
+        Q matching students whose matric or names start with every word of term.
+
+        Each word is a range scan over the indexed StudentSearchToken table,
+        which holds every word of search_name. `prefix` is the path to the
+        student, e.g. 'student__'.
+        """
+        q = models.Q()
+        for word in cls.normalize(term).split():
+            students = StudentSearchToken.objects.filter(cls.prefix_range('token', word)).values('student_id')
+            q &= models.Q(**{f'{prefix}pk__in': students})
+        return q
+    
+    def save(self, *args, **kwargs):
+        self.search_name = self.build_search_name(self.matric_no, self.user.first_name, self.user.last_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'matric_no' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+        StudentSearchToken.index(StudentProfile.objects.filter(pk=self.pk))
+
+
+class StudentSearchToken(models.Model):
+    """One word of a student's search_name, so any word can be prefix-matched through an index"""
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=200)
+    
+    class Meta:
+        indexes = [models.Index(fields=['token', 'student'])]
+    
+    @classmethod
+    def index(cls, students):
+        """Replace the tokens of the students in a StudentProfile queryset"""
+        search_names = dict(students.values_list('pk', 'search_name'))
+        cls.objects.filter(student_id__in=search_names).delete()
+        cls.objects.bulk_create([
+            cls(student_id=pk, token=token)
+            for pk, search_name in search_names.items()
+            for token in sorted(set(search_name.split()))
+        ])
 
 
 class Hostel(models.Model):
@@ -139,6 +253,9 @@ class HostelRequest(models.Model):
     ]
     
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='hostel_requests')
+    session = models.ForeignKey(
+        AcademicSession, on_delete=models.PROTECT, default=current_session_id, related_name='hostel_requests'
+    )
     hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='requests')
     preferred_capacity = models.IntegerField(choices=CAPACITY_CHOICES)
     preferred_room = models.ForeignKey(Room, on_delete=models.SET_NULL, blank=True, null=True, related_name='room_requests')
@@ -154,6 +271,12 @@ class HostelRequest(models.Model):
         verbose_name = "Hostel Request"
         verbose_name_plural = "Hostel Requests"
         ordering = ['-created_at']
+        indexes = [
+            # admin_requests and the API list the current session by status and date
+            models.Index(fields=['session', 'status', '-created_at'], name='request_session_status_idx'),
+            # Active-request checks look up one student in the current session
+            models.Index(fields=['session', 'student', 'status'], name='request_session_student_idx'),
+        ]
     
     def clean(self):
         """Validate request"""
@@ -169,6 +292,7 @@ class HostelRequest(models.Model):
         
         # Check for active requests (PENDING or APPROVED)
         active_requests = HostelRequest.objects.filter(
+            session_id=self.session_id,
             student=self.student,
             status__in=['PENDING', 'APPROVED']
         ).exclude(pk=self.pk)
@@ -177,9 +301,49 @@ class HostelRequest(models.Model):
             raise ValidationError("Student already has an active hostel request")
 
 
+class ArchivedHostelRequest(models.Model):
+    """
+    Closed hostel request moved out of the live table by archive_requests.
+
+    Rows keep the original request id, and references are stored without
+    database constraints so the archive survives later deletions.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        StudentProfile, on_delete=models.DO_NOTHING, db_constraint=False, related_name='archived_requests'
+    )
+    session = models.ForeignKey(
+        AcademicSession, on_delete=models.DO_NOTHING, db_constraint=False, blank=True, null=True, related_name='+'
+    )
+    hostel = models.ForeignKey(Hostel, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    preferred_capacity = models.IntegerField(choices=HostelRequest.CAPACITY_CHOICES)
+    preferred_room = models.ForeignKey(
+        Room, on_delete=models.DO_NOTHING, db_constraint=False, blank=True, null=True, related_name='+'
+    )
+    status = models.CharField(max_length=10, choices=HostelRequest.STATUS_CHOICES)
+    note = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"#{self.pk} student {self.student_id} ({self.get_status_display()}, archived)"
+    
+    class Meta:
+        verbose_name = "Archived Hostel Request"
+        verbose_name_plural = "Archived Hostel Requests"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', '-created_at'], name='archived_request_student_idx'),
+        ]
+
+
 class Allocation(models.Model):
     """Room allocation for a student"""
-    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, related_name='allocation')
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='allocations')
+    session = models.ForeignKey(
+        AcademicSession, on_delete=models.PROTECT, default=current_session_id, related_name='allocations'
+    )
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='allocations')
     date_allocated = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True, null=True)
@@ -191,6 +355,13 @@ class Allocation(models.Model):
         verbose_name = "Allocation"
         verbose_name_plural = "Allocations"
         ordering = ['-date_allocated']
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'session'], name='unique_allocation_per_session'),
+        ]
+        indexes = [
+            models.Index(fields=['session', 'room'], name='allocation_session_room_idx'),
+            models.Index(fields=['session', '-date_allocated'], name='allocation_session_date_idx'),
+        ]
     
     def clean(self):
         """Validate allocation"""
@@ -200,3 +371,175 @@ class Allocation(models.Model):
         # Check gender match
         if self.room.floor.hostel.gender != self.student.gender:
             raise ValidationError("Student gender must match hostel gender")
+
+
+class Notification(models.Model):
+    """
+    Notification for a student.
+
+    Rows are written in the same transaction as the status change they
+    describe and double as the in-app feed; the dispatcher claims pending
+    rows and emails them in batches (transactional outbox).
+    """
+    KIND_CHOICES = [
+        ('APPROVED', 'Request approved'),
+        ('REJECTED', 'Request rejected'),
+    ]
+    
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    emailed_at = models.DateTimeField(blank=True, null=True)
+    email_attempts = models.PositiveSmallIntegerField(default=0)
+    # Set while a dispatcher sends the email, and after a failed send until the retry is due
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.student} - {self.subject}"
+    
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', '-created_at']),
+            # The dispatcher only scans rows that have not been emailed yet
+            models.Index(
+                fields=['id'],
+                condition=models.Q(emailed_at__isnull=True),
+                name='notification_outbox_idx',
+            ),
+        ]
+
+
+class AllocationEvent(models.Model):
+    """
+    Append-only ledger entry for allocation history.
+
+    Student and room are stored as plain references without database
+    constraints so history survives deletions.
+    """
+    KIND_CHOICES = [
+        ('ALLOCATE', 'Allocate'),
+        ('MOVE', 'Move'),
+        ('RELEASE', 'Release'),
+        ('APPROVE', 'Approve'),
+        ('REJECT', 'Reject'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    student = models.ForeignKey(
+        StudentProfile, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    room = models.ForeignKey(
+        Room, on_delete=models.DO_NOTHING, db_constraint=False, blank=True, null=True, related_name='+'
+    )
+    from_room = models.ForeignKey(
+        Room, on_delete=models.DO_NOTHING, db_constraint=False, blank=True, null=True, related_name='+'
+    )
+    session = models.ForeignKey(
+        AcademicSession, on_delete=models.DO_NOTHING, db_constraint=False,
+        default=current_session_id, blank=True, null=True, related_name='+'
+    )
+    request_id = models.BigIntegerField(blank=True, null=True)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} student {self.student_id} room {self.room_id}"
+    
+    class Meta:
+        verbose_name = "Allocation Event"
+        verbose_name_plural = "Allocation Events"
+        ordering = ['id']
+    
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValidationError("Allocation events are append-only")
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Allocation events are append-only")
+
+
+class LedgerCheckpoint(models.Model):
+    """Snapshot of allocations after a ledger event, used as a replay starting point"""
+    session = models.ForeignKey(
+        AcademicSession, on_delete=models.CASCADE, blank=True, null=True, related_name='ledger_checkpoints'
+    )
+    last_event_id = models.BigIntegerField(unique=True)
+    taken_at = models.DateTimeField(db_index=True)
+    # {student_id: room_id} as of last_event_id
+    allocations = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Checkpoint at event #{self.last_event_id} ({self.taken_at:%Y-%m-%d %H:%M})"
+    
+    class Meta:
+        verbose_name = "Ledger Checkpoint"
+        verbose_name_plural = "Ledger Checkpoints"
+        ordering = ['-last_event_id']
+
+
+class Job(models.Model):
+    """Background job run by the run_jobs worker"""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"#{self.pk} {self.name} ({self.get_status_display()})"
+    
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            # The worker polls for due jobs
+            models.Index(fields=['status', 'run_at']),
+        ]
+    
+    def progress_percentage(self):
+        """Get progress as a percentage"""
+        if not self.progress_total:
+            return 100 if self.status == 'SUCCEEDED' else 0
+        return int(self.progress_done / self.progress_total * 100)
+
+
+@receiver(post_save, sender=User)
+def refresh_student_search_name(sender, instance, update_fields=None, **kwargs):
+    """Keep StudentProfile.search_name and its tokens in step with name changes"""
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        # e.g. the last_login update on every sign-in
+        return
+    for pk, matric_no in StudentProfile.objects.filter(user=instance).values_list('pk', 'matric_no'):
+        StudentProfile.objects.filter(pk=pk).update(
+            search_name=StudentProfile.build_search_name(matric_no, instance.first_name, instance.last_name)
+        )
+        StudentSearchToken.index(StudentProfile.objects.filter(pk=pk))
@@ -0,0 +1,144 @@
+"""
+Student notifications: outbox writes and the batched email dispatcher
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Job, Notification
+
+logger = logging.getLogger(__name__)
+
+
+def approval_notification(hostel_request, room):
+    """Build (but do not save) the notification for an approved request"""
+    return Notification(
+        student_id=hostel_request.student_id,
+        kind='APPROVED',
+        subject="Your hostel request has been approved",
+        body=(
+            f"Your request for {hostel_request.hostel.name} has been approved.\n"
+            f"You have been allocated Room {room.room_number} "
+            f"({room.floor.get_floor_type_display()}, {room.capacity} persons)."
+        ),
+    )
+
+
+def rejection_notification(hostel_request):
+    """Build (but do not save) the notification for a rejected request"""
+    return Notification(
+        student_id=hostel_request.student_id,
+        kind='REJECTED',
+        subject="Your hostel request has been rejected",
+        body=(
+            f"Your request for {hostel_request.hostel.name} has been rejected.\n"
+            f"You may submit a new request from your dashboard."
+        ),
+    )
+
+
+def schedule_dispatch():
+    """Queue a dispatch_notifications job once the current transaction commits"""
+    transaction.on_commit(enqueue_dispatch)
+
+
+def enqueue_dispatch():
+    # One waiting job drains everything; a duplicate from a race only finds nothing to claim
+    if not Job.objects.filter(name='dispatch_notifications', status='QUEUED').exists():
+        enqueue('dispatch_notifications')
+
+
+def claim_batch(batch_size, dispatcher_id):
+    """
+    Claim up to batch_size pending notifications for one dispatcher.
+
+    The claim is a conditional UPDATE, so concurrent dispatchers never get
+    the same row. Claims expire after NOTIFICATION_CLAIM_TIMEOUT, so rows
+    held by a dispatcher that died are picked up again. Returns the claimed
+    rows, or None once nothing is pending.
+    """
+    now = timezone.now()
+    claimable = Notification.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)),
+        emailed_at__isnull=True,
+        email_attempts__lt=settings.NOTIFICATION_MAX_ATTEMPTS,
+    )
+    ids = list(claimable.order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return None
+
+    claimable.filter(pk__in=ids).update(claimed_at=now, claimed_by=dispatcher_id)
+    return list(
+        Notification.objects.filter(pk__in=ids, claimed_by=dispatcher_id)
+        .select_related('student__user').order_by('pk')
+    )
+
+
+def dispatch_outbox(batch_size=None, max_batches=None):
+    """
+    Email pending notifications in batches.
+
+    Each batch is claimed first and sent over a single email backend
+    connection, one message at a time: a message that fails is counted
+    against its own attempts, without holding back the rest of the batch,
+    and retried once NOTIFICATION_CLAIM_TIMEOUT has passed until
+    NOTIFICATION_MAX_ATTEMPTS is reached. Returns the number of
+    notifications marked as emailed.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    dispatcher_id = uuid.uuid4().hex
+    dispatched = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch(batch_size, dispatcher_id)
+        if batch is None:
+            break
+        batches += 1
+
+        sent = []
+        failed = []
+        try:
+            connection = get_connection()
+            connection.open()
+        except Exception:
+            logger.exception("Could not connect to the email backend")
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(claimed_at=None, claimed_by='')
+            break
+
+        try:
+            for notification in batch:
+                if not notification.student.user.email:
+                    # Students without an email address only get the in-app notification
+                    sent.append(notification.pk)
+                    continue
+                message = EmailMessage(
+                    subject=notification.subject,
+                    body=notification.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[notification.student.user.email],
+                )
+                try:
+                    delivered = connection.send_messages([message])
+                except Exception:
+                    logger.exception("Failed to email notification %s", notification.pk)
+                    delivered = 0
+                (sent if delivered else failed).append(notification.pk)
+        finally:
+            connection.close()
+
+        Notification.objects.filter(pk__in=sent).update(
+            emailed_at=timezone.now(), email_attempts=F('email_attempts') + 1, claimed_at=None, claimed_by=''
+        )
+        # Failed rows keep claimed_at, so they wait out the claim timeout before the next try
+        Notification.objects.filter(pk__in=failed).update(email_attempts=F('email_attempts') + 1, claimed_by='')
+        dispatched += len(sent)
+
+    return dispatched
@@ -0,0 +1,157 @@
+"""
+Per-client token-bucket rate limiting for hot routes.
+
+Each configured route has one bucket per client key (IP address, matric
+number being logged in as, or session cookie). A bucket holds up to `burst`
+tokens and refills at `rate` tokens per `per` seconds. A request takes one
+token from each of its buckets, or, when any of them is empty, takes none
+and is answered with 429 and a Retry-After header. The middleware sits
+near the top of the stack, so rejected requests never reach the session
+store, the database or password hashing.
+
+Buckets live in process memory by default. With RATE_LIMIT_BACKEND set to
+'cache' they are kept in the RATE_LIMIT_CACHE cache instead, which shares
+them between the processes using that cache.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+
+
+def refilled(bucket, burst, refill, now):
+    """(tokens, wait) for a stored (tokens, updated) bucket, or a new one, refilled up to now"""
+    tokens, updated = bucket or (burst, now)
+    # Wall-clock time can step back; never drain a bucket for it
+    tokens = min(burst, tokens + max(0, now - updated) * refill)
+    wait = 0 if tokens >= 1 else (1 - tokens) / refill
+    return tokens, wait
+
+
+class MemoryBuckets:
+    """Token buckets in a bounded in-process LRU dict"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def peek(self, key, burst, refill, now):
+        """Seconds until a token is available, without taking it"""
+        with self.lock:
+            return refilled(self.buckets.get(key), burst, refill, now)[1]
+
+    def take(self, key, burst, refill, now):
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        with self.lock:
+            tokens, wait = refilled(self.buckets.pop(key, None), burst, refill, now)
+            if not wait:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return wait
+
+
+class CacheBuckets:
+    """
+    Token buckets in a Django cache.
+
+    The read-modify-write is not atomic, so concurrent requests for the same
+    key may occasionally both get the last token; the limit is approximate.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def peek(self, key, burst, refill, now):
+        return refilled(self.cache.get(f'ratelimit:{key}'), burst, refill, now)[1]
+
+    def take(self, key, burst, refill, now):
+        cache_key = f'ratelimit:{key}'
+        tokens, wait = refilled(self.cache.get(cache_key), burst, refill, now)
+        if not wait:
+            tokens -= 1
+        # Expire once the bucket would have refilled anyway
+        self.cache.set(cache_key, (tokens, now), math.ceil(burst / refill) + 1)
+        return wait
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request, kind):
+    """The value a route's bucket is keyed by, or None if the request has none"""
+    if kind == 'ip':
+        return client_ip(request) or None
+    if kind == 'matric':
+        # MatricNumberBackend accepts a matric number or a username
+        return request.POST.get('username', '').strip().upper() or None
+    if kind == 'session':
+        return request.COOKIES.get(settings.SESSION_COOKIE_NAME) or None
+    raise ValueError(f"Unknown rate limit key: {kind}")
+
+
+class RateLimitMiddleware:
+    """Apply RATE_LIMITS to matching requests; disabled unless RATE_LIMIT_ENABLED is set"""
+
+    def __init__(self, get_response):
+        if not settings.RATE_LIMIT_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.routes = [
+            (name, route['path'], set(route.get('methods', ['GET', 'POST'])), route['limits'])
+            for name, route in settings.RATE_LIMITS.items()
+        ]
+        if settings.RATE_LIMIT_BACKEND == 'cache':
+            self.buckets = CacheBuckets(settings.RATE_LIMIT_CACHE)
+        else:
+            self.buckets = MemoryBuckets(settings.RATE_LIMIT_MAX_KEYS)
+
+    def __call__(self, request):
+        for name, path, methods, limits in self.routes:
+            if request.path == path and request.method in methods:
+                wait = self.check(request, name, limits)
+                if wait:
+                    return self.too_many_requests(request, wait)
+                break
+        return self.get_response(request)
+
+    def check(self, request, name, limits):
+        """
+        Take a token from every bucket the request falls in, if all of them
+        have one; returns 0, or the longest wait without taking any.
+        """
+        # Wall-clock time, so buckets in a shared cache compare across hosts
+        now = time.time()
+        buckets = []
+        for kind, (rate, per, burst) in limits.items():
+            key = client_key(request, kind)
+            if key is not None:
+                buckets.append((f'{name}:{kind}:{key}', burst, rate / per))
+
+        wait = max((self.buckets.peek(key, burst, refill, now) for key, burst, refill in buckets), default=0)
+        if wait:
+            return wait
+        for key, burst, refill in buckets:
+            self.buckets.take(key, burst, refill, now)
+        return 0
+
+    def too_many_requests(self, request, wait):
+        message = 'Too many requests, please wait and try again.'
+        if request.path.startswith('/api/'):
+            response = JsonResponse({'error': message}, status=429)
+        else:
+            response = HttpResponse(message, status=429, content_type='text/plain')
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
@@ -0,0 +1,236 @@
+"""
+Bulk room reconfiguration.
+
+A spec is CSV text with the columns
+
+    action,hostel,floor,room_number,capacity,to_hostel,to_floor,to_room_number
+
+where action is 'add' (a new room; capacity is required) or 'update' (an
+existing room; a blank capacity or to_* column keeps the current value, so
+to_* only matter when moving or renumbering a room). floor is a floor code
+such as GF.
+
+The whole spec is validated in one pass before anything is written: the
+floors, the rooms and the current session's allocations it touches are
+loaded with one query each, and every change is checked against them. A
+capacity below the beds taken, a move into a hostel of the other gender
+while students are allocated, or a room number that would clash with
+another room rejects the spec. A valid spec is applied with bulk_update and
+bulk_create in the same transaction, with the rooms involved locked.
+"""
+import csv
+import io
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import caching
+from .models import Allocation, Floor, Hostel, Room, current_session_id
+
+SPEC_FIELDS = ['action', 'hostel', 'floor', 'room_number', 'capacity', 'to_hostel', 'to_floor', 'to_room_number']
+ACTIONS = {'add', 'update'}
+CAPACITIES = {value for value, label in Room.CAPACITY_CHOICES}
+GENDERS = dict(Hostel.GENDER_CHOICES)
+
+
+def read_spec(text):
+    """
+    Parse spec CSV text.
+
+    Returns (changes, errors): changes are dicts with the spec fields plus
+    the line number, errors lists (line, reason) for rows that cannot be read.
+    """
+    changes = []
+    errors = []
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    missing = {'action', 'hostel', 'floor', 'room_number'} - set(reader.fieldnames or [])
+    if missing:
+        return [], [(1, f'missing columns: {", ".join(sorted(missing))}')]
+
+    for line, row in enumerate(reader, start=2):
+        change = {field: (row.get(field) or '').strip() for field in SPEC_FIELDS}
+        change['action'] = change['action'].lower()
+        change['floor'] = change['floor'].upper()
+        change['to_floor'] = change['to_floor'].upper()
+        change['line'] = line
+        if not any(change[field] for field in SPEC_FIELDS):
+            continue
+        if change['action'] not in ACTIONS:
+            errors.append((line, f'unknown action {change["action"]!r}'))
+            continue
+        if not (change['hostel'] and change['floor'] and change['room_number']):
+            errors.append((line, 'hostel, floor and room_number are required'))
+            continue
+        if change['capacity']:
+            try:
+                change['capacity'] = int(change['capacity'])
+            except ValueError:
+                errors.append((line, f'capacity {change["capacity"]!r} is not a number'))
+                continue
+        else:
+            change['capacity'] = None
+        changes.append(change)
+    return changes, errors
+
+
+def plan_changes(changes, lock=False):
+    """
+    Validate changes against the database and work out the rooms to write.
+
+    Returns {'update': [(change, room)], 'add': [(change, room)], 'errors':
+    [(line, reason)]}, where room is an unsaved Room carrying the new values.
+    With lock, the existing rooms involved are locked for update.
+    """
+    plan = {'update': [], 'add': [], 'errors': []}
+
+    def reject(change, reason):
+        plan['errors'].append((change['line'], reason))
+
+    floors = {
+        (hostel, floor_type): (floor_id, gender)
+        for floor_id, hostel, floor_type, gender in Floor.objects.values_list(
+            'id', 'hostel__name', 'floor_type', 'hostel__gender'
+        )
+    }
+    floor_ids = {floors[key][0] for change in changes for key in (
+        (change['hostel'], change['floor']),
+        (change['to_hostel'] or change['hostel'], change['to_floor'] or change['floor']),
+    ) if key in floors}
+
+    rooms = Room.objects.filter(floor_id__in=floor_ids)
+    if lock:
+        rooms = rooms.select_for_update()
+    rooms = {
+        (room['floor_id'], room['room_number']): room
+        for room in rooms.values('id', 'floor_id', 'room_number', 'capacity', 'current_occupancy')
+    }
+
+    # Beds taken and genders of this session's students, per room
+    allocated = Counter()
+    genders = defaultdict(set)
+    allocations = Allocation.objects.filter(
+        session_id=current_session_id(), room_id__in=[room['id'] for room in rooms.values()]
+    ).values('room_id', 'student__gender').annotate(students=Count('pk')).order_by()
+    for row in allocations:
+        allocated[row['room_id']] += row['students']
+        genders[row['room_id']].add(row['student__gender'])
+
+    touched = Counter()
+    targets = Counter()
+    for change in changes:
+        source = floors.get((change['hostel'], change['floor']))
+        if source is None:
+            reject(change, f'no floor {change["floor"]} in hostel {change["hostel"]!r}')
+            continue
+        target_key = (change['to_hostel'] or change['hostel'], change['to_floor'] or change['floor'])
+        target = floors.get(target_key)
+        if target is None:
+            reject(change, f'no floor {target_key[1]} in hostel {target_key[0]!r}')
+            continue
+        room_number = change['to_room_number'] or change['room_number']
+        capacity = change['capacity']
+        if capacity is not None and capacity not in CAPACITIES:
+            reject(change, f'capacity {capacity} is not one of {sorted(CAPACITIES)}')
+            continue
+
+        existing = rooms.get((source[0], change['room_number']))
+        if change['action'] == 'add':
+            if existing is not None:
+                reject(change, f'room {change["room_number"]} already exists')
+                continue
+            if capacity is None:
+                reject(change, 'capacity is required for a new room')
+                continue
+            if change['to_hostel'] or change['to_floor'] or change['to_room_number']:
+                reject(change, 'to_* columns only apply to updates')
+                continue
+            room = Room(floor_id=source[0], room_number=room_number, capacity=capacity)
+            plan['add'].append((change, room))
+        else:
+            if existing is None:
+                reject(change, f'room {change["room_number"]} does not exist')
+                continue
+            touched[existing['id']] += 1
+            capacity = existing['capacity'] if capacity is None else capacity
+            taken = max(existing['current_occupancy'], allocated[existing['id']])
+            if capacity < taken:
+                reject(change, f'capacity {capacity} is below the {taken} beds taken')
+                continue
+            if target[1] != source[1] and genders[existing['id']] - {target[1]}:
+                reject(change, f'{allocated[existing["id"]]} allocated students cannot move to a {GENDERS[target[1]].lower()} hostel')
+                continue
+            room = Room(
+                pk=existing['id'], floor_id=target[0], room_number=room_number, capacity=capacity,
+                current_occupancy=existing['current_occupancy'],
+            )
+            unchanged = (room.floor_id, room.room_number, capacity) == (
+                existing['floor_id'], existing['room_number'], existing['capacity']
+            )
+            if unchanged:
+                continue
+            plan['update'].append((change, room))
+        targets[(target[0], room_number)] += 1
+
+    for change, room in plan['update'] + plan['add']:
+        key = (room.floor_id, room.room_number)
+        existing = rooms.get(key)
+        if touched[room.pk] > 1:
+            reject(change, f'room {change["room_number"]} is changed more than once')
+        elif targets[key] > 1:
+            reject(change, f'more than one change ends at room {room.room_number}')
+        elif existing is not None and existing['id'] != room.pk:
+            # Even if that room moves away too, a swap would trip the unique constraint mid-update
+            reject(change, f'room {room.room_number} is already taken on that floor')
+
+    plan['errors'].sort()
+    return plan
+
+
+def reconfigure_rooms(changes, dry_run=False):
+    """
+    Validate and apply room changes in one transaction.
+
+    Nothing is written when any change is invalid or with dry_run. Returns
+    the plan from plan_changes.
+    """
+    with transaction.atomic():
+        plan = plan_changes(changes, lock=True)
+        if plan['errors'] or dry_run:
+            return plan
+
+        now = timezone.now()
+        updated = [room for change, room in plan['update']]
+        for room in updated:
+            room.updated_at = now
+        Room.objects.bulk_update(updated, ['floor', 'room_number', 'capacity', 'updated_at'])
+        Room.objects.bulk_create([room for change, room in plan['add']])
+        if updated or plan['add']:
+            # Bulk writes send no signals
+            caching.topology_changed(sender=Room)
+    return plan
+
+
+def report_lines(plan, read_errors=(), applied=False):
+    """Human-readable lines describing a plan, or why it was rejected"""
+    errors = sorted([*read_errors, *plan['errors']])
+    for line, reason in errors:
+        yield f'❌ Line {line}: {reason}'
+    if errors:
+        yield ''
+        yield f'📊 {len(errors)} invalid changes; nothing was applied'
+        return
+
+    for change, room in plan['add']:
+        yield f'➕ {change["hostel"]} {change["floor"]} {room.room_number}: new {room.capacity}-person room'
+    for change, room in plan['update']:
+        target = ' '.join(filter(None, [change['to_hostel'], change['to_floor'], change['to_room_number']]))
+        details = [f'capacity {room.capacity}']
+        if target:
+            details.append(f'→ {target}')
+        yield f'✏️  {change["hostel"]} {change["floor"]} {change["room_number"]}: ' + ', '.join(details)
+
+    verb = 'Applied' if applied else 'Would apply'
+    yield ''
+    yield f'📊 {verb}: {len(plan["add"])} rooms added, {len(plan["update"])} rooms updated'
@@ -0,0 +1,256 @@
+"""
+Differential sync of the student roster from a CSV file.
+
+The CSV (full_name, matric_no, gender, level) is read in one streaming
+pass and deduplicated by matric number, later rows winning. It is compared
+with the database in one query, and the difference is applied in batches:
+new students are bulk-created, and changed names, genders and levels are
+bulk-updated. Students missing from the roster are only deactivated when
+asked to (their accounts are kept, so allocation history stays intact), as
+a partial roster would otherwise lock everyone else out.
+"""
+import csv
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import StudentProfile, StudentSearchToken
+
+BATCH_SIZE = 500
+
+GENDERS = {value for value, label in StudentProfile.GENDER_CHOICES}
+LEVELS = {value for value, label in StudentProfile.LEVEL_CHOICES}
+
+
+def split_name(full_name):
+    """(first_name, last_name) the way the student loaders have always split names"""
+    parts = full_name.split()
+    first_name = ' '.join(parts[:-1]) if len(parts) > 1 else parts[0] if parts else ''
+    last_name = parts[-1] if parts else ''
+    return first_name, last_name
+
+
+def read_roster(path):
+    """
+    Stream the CSV into {matric_no: row}.
+
+    Returns (roster, duplicates, invalid): duplicates lists matric numbers
+    seen more than once, invalid lists (line, reason) for skipped rows.
+    """
+    roster = {}
+    duplicates = []
+    invalid = []
+    with open(path, 'r', encoding='utf-8', newline='') as csvfile:
+        for line, row in enumerate(csv.DictReader(csvfile), start=2):
+            full_name = ' '.join((row.get('full_name') or '').split())
+            matric_no = (row.get('matric_no') or '').strip()
+            gender = (row.get('gender') or 'M').strip().upper()
+            level = (row.get('level') or '100').strip()
+
+            if not full_name or not matric_no:
+                invalid.append((line, 'missing name or matric number'))
+                continue
+            if gender not in GENDERS:
+                invalid.append((line, f'unknown gender {gender!r}'))
+                continue
+            if level not in LEVELS:
+                invalid.append((line, f'unknown level {level!r}'))
+                continue
+
+            if matric_no in roster:
+                duplicates.append(matric_no)
+            first_name, last_name = split_name(full_name)
+            roster[matric_no] = {
+                'matric_no': matric_no,
+                'full_name': full_name,
+                'first_name': first_name,
+                'last_name': last_name,
+                'gender': gender,
+                'level': level,
+            }
+    return roster, duplicates, invalid
+
+
+def diff_roster(roster, deactivate_missing=False):
+    """
+    Compare the roster with the students in the database.
+
+    Returns {'insert': [row], 'update': [(row, student, changes)],
+    'deactivate': [student], 'reactivate': [student], 'missing': count},
+    where student is the database row as a dict and changes maps field
+    names to (old, new). Active students missing from the roster are
+    deactivated with deactivate_missing, and only counted otherwise.
+    """
+    diff = {'insert': [], 'update': [], 'deactivate': [], 'reactivate': [], 'missing': 0}
+    seen = set()
+
+    students = StudentProfile.objects.values(
+        'id', 'matric_no', 'gender', 'level', 'user_id',
+        'user__first_name', 'user__last_name', 'user__is_active',
+    )
+    for student in students.iterator(chunk_size=2000):
+        row = roster.get(student['matric_no'])
+        if row is None:
+            if student['user__is_active']:
+                if deactivate_missing:
+                    diff['deactivate'].append(student)
+                else:
+                    diff['missing'] += 1
+            continue
+
+        seen.add(row['matric_no'])
+        changes = {}
+        for field, current in (
+            ('first_name', student['user__first_name']),
+            ('last_name', student['user__last_name']),
+            ('gender', student['gender']),
+            ('level', student['level']),
+        ):
+            if current != row[field]:
+                changes[field] = (current, row[field])
+        if changes:
+            diff['update'].append((row, student, changes))
+        if not student['user__is_active']:
+            diff['reactivate'].append(student)
+
+    diff['insert'] = [row for matric_no, row in roster.items() if matric_no not in seen]
+    return diff
+
+
+def batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def apply_diff(diff, new_account):
+    """
+    Apply a roster diff in one transaction, in batches of BATCH_SIZE.
+
+    new_account(row) returns (username, email, password) for a new student.
+    Returns (created, conflicts): created lists (row, password) for new
+    accounts, conflicts lists rows whose username is already taken by an
+    account without a student profile.
+    """
+    created = []
+    conflicts = []
+    with transaction.atomic():
+        for rows in batches(diff['insert']):
+            accounts = {row['matric_no']: new_account(row) for row in rows}
+            taken = set(User.objects.filter(
+                username__in=[username for username, email, password in accounts.values()]
+            ).values_list('username', flat=True))
+
+            users = []
+            new_rows = []
+            for row in rows:
+                username, email, password = accounts[row['matric_no']]
+                if username in taken:
+                    conflicts.append(row)
+                    continue
+                users.append(User(
+                    username=username,
+                    email=email,
+                    password=make_password(password),
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                ))
+                new_rows.append(row)
+                created.append((row, password))
+
+            users = User.objects.bulk_create(users)
+            if users and users[0].pk is None:
+                # Backends that cannot return ids from bulk inserts
+                ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            StudentProfile.objects.bulk_create([
+                StudentProfile(
+                    user_id=user.pk,
+                    matric_no=row['matric_no'],
+                    gender=row['gender'],
+                    level=row['level'],
+                    search_name=StudentProfile.build_search_name(
+                        row['matric_no'], row['first_name'], row['last_name']
+                    ),
+                )
+                for user, row in zip(users, new_rows)
+            ])
+            StudentSearchToken.index(
+                StudentProfile.objects.filter(matric_no__in=[row['matric_no'] for row in new_rows])
+            )
+
+        for updates in batches(diff['update']):
+            users = []
+            profiles = []
+            for row, student, changes in updates:
+                users.append(User(pk=student['user_id'], first_name=row['first_name'], last_name=row['last_name']))
+                profiles.append(StudentProfile(
+                    pk=student['id'],
+                    gender=row['gender'],
+                    level=row['level'],
+                    search_name=StudentProfile.build_search_name(
+                        row['matric_no'], row['first_name'], row['last_name']
+                    ),
+                ))
+            User.objects.bulk_update(users, ['first_name', 'last_name'])
+            StudentProfile.objects.bulk_update(profiles, ['gender', 'level', 'search_name'])
+            StudentSearchToken.index(StudentProfile.objects.filter(pk__in=[profile.pk for profile in profiles]))
+
+        for students in batches(diff['deactivate']):
+            User.objects.filter(pk__in=[student['user_id'] for student in students]).update(is_active=False)
+        for students in batches(diff['reactivate']):
+            User.objects.filter(pk__in=[student['user_id'] for student in students]).update(is_active=True)
+
+    return created, conflicts
+
+
+def report_lines(diff, duplicates, invalid, created=None, conflicts=()):
+    """Human-readable lines describing a roster diff and, once applied, its outcome"""
+    for line, reason in invalid:
+        yield f'⚠️  Line {line} skipped: {reason}'
+    for matric_no in dict.fromkeys(duplicates):
+        yield f'⚠️  {matric_no} appears more than once; the last row wins'
+
+    if created is None:
+        for row in diff['insert']:
+            yield f'➕ {row["matric_no"]}: {row["full_name"]} ({row["gender"]}, {row["level"]} level)'
+    else:
+        for row, password in created:
+            yield f'➕ {row["matric_no"]}: {row["full_name"]} - Password: {password}'
+    for row in conflicts:
+        yield f'❌ {row["matric_no"]}: username already taken by an account without a student profile'
+    for row, student, changes in diff['update']:
+        details = ', '.join(f'{field} {old!r} → {new!r}' for field, (old, new) in changes.items())
+        yield f'✏️  {row["matric_no"]}: {details}'
+    for student in diff['reactivate']:
+        yield f'🔁 {student["matric_no"]}: back on the roster, ' + ('reactivated' if created is not None else 'to reactivate')
+    for student in diff['deactivate']:
+        yield f'⛔ {student["matric_no"]}: not on the roster, ' + ('deactivated' if created is not None else 'to deactivate')
+    if diff['missing']:
+        yield f'ℹ️  {diff["missing"]} active students are not on the roster and stay active (sync with --deactivate-missing to deactivate them)'
+
+    inserted = len(diff['insert']) if created is None else len(created)
+    yield ''
+    yield (
+        f'📊 Roster diff: {inserted} new, {len(diff["update"])} updated, '
+        f'{len(diff["reactivate"])} reactivated, {len(diff["deactivate"])} deactivated'
+        + (f', {len(conflicts)} conflicts' if conflicts else '')
+    )
+
+
+def sync_roster(path, new_account, deactivate_missing=False, dry_run=False):
+    """
+    Read, diff and (unless dry_run) apply a roster CSV.
+
+    Returns the report as a list of lines.
+    """
+    roster, duplicates, invalid = read_roster(path)
+    diff = diff_roster(roster, deactivate_missing=deactivate_missing)
+    if dry_run:
+        return list(report_lines(diff, duplicates, invalid))
+
+    created, conflicts = apply_diff(diff, new_account)
+    return list(report_lines(diff, duplicates, invalid, created, conflicts))
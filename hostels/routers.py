@@ -0,0 +1,161 @@
+"""
+Database router that sends opted-in reporting reads to a read replica
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+REPORTING_ALIAS = 'reporting'
+
+# Apps whose reads may be served from the replica; sessions, admin log
+# entries and content types always stay on the primary
+REPORTING_APPS = {'hostels', 'auth'}
+
+# Cookie that pins a client to the primary after it has written, so it
+# reads its own writes until the replica has caught up
+PIN_COOKIE = 'reporting_pin'
+
+_reporting_db = ContextVar('reporting_db', default=None)
+_wrote = ContextVar('reporting_wrote', default=False)
+
+
+def reporting_configured():
+    """Check if a reporting database alias is configured"""
+    return REPORTING_ALIAS in settings.DATABASES
+
+
+def reporting_lag():
+    """
+    Seconds since the reporting copy was refreshed.
+
+    SQLite copies are refreshed by refresh_reporting_db, so the file's
+    modification time is the refresh time. Other engines are assumed to be
+    streaming replicas whose lag is monitored elsewhere.
+    """
+    database = settings.DATABASES[REPORTING_ALIAS]
+    if database['ENGINE'] != 'django.db.backends.sqlite3':
+        return 0
+    try:
+        return time.time() - os.path.getmtime(database['NAME'])
+    except OSError:
+        return None
+
+
+def reporting_available(max_staleness=None):
+    """Check if the reporting database exists and is within the staleness bound"""
+    if not reporting_configured():
+        return False
+    if max_staleness is None:
+        max_staleness = settings.REPORTING_MAX_STALENESS
+    lag = reporting_lag()
+    return lag is not None and lag <= max_staleness
+
+
+@contextmanager
+def reporting_reads(max_staleness=None):
+    """Serve reads of reporting apps from the replica inside this block, if fresh enough"""
+    alias = REPORTING_ALIAS if reporting_available(max_staleness) else None
+    token = _reporting_db.set(alias)
+    try:
+        yield alias
+    finally:
+        _reporting_db.reset(token)
+
+
+def use_reporting_db(view=None, *, max_staleness=None):
+    """
+    Opt a view into reading from the reporting database.
+
+    Clients that wrote recently carry the pin cookie and keep reading from
+    the primary.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if PIN_COOKIE in request.COOKIES:
+                return view_func(request, *args, **kwargs)
+            with reporting_reads(max_staleness):
+                return view_func(request, *args, **kwargs)
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+class ReportingRouter:
+    """Route opted-in reads to the reporting alias and everything else to default"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPORTING_APPS:
+            return _reporting_db.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in REPORTING_APPS:
+            _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The reporting copy gets its schema from the primary
+        return db != REPORTING_ALIAS
+
+
+class ReportingPinMiddleware:
+    """Pin clients that wrote during a request to the primary for the staleness bound"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get() and reporting_configured():
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=settings.REPORTING_MAX_STALENESS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            _wrote.reset(token)
+        return response
+
+
+def refresh_sqlite_copy(pages=256):
+    """
+    Copy the primary SQLite database to the reporting file with the online backup API.
+
+    The copy is written to a temporary file and swapped in atomically, so
+    readers never see a half-written replica.
+    """
+    import sqlite3
+
+    source_name = str(settings.DATABASES['default']['NAME'])
+    target_name = str(settings.DATABASES[REPORTING_ALIAS]['NAME'])
+    temp_name = f'{target_name}.tmp'
+
+    # Ensure pending writes from this process are visible to the backup
+    connections['default'].close()
+
+    source = sqlite3.connect(source_name)
+    target = sqlite3.connect(temp_name)
+    try:
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+        source.close()
+
+    os.replace(temp_name, target_name)
+    connections[REPORTING_ALIAS].close()
@@ -0,0 +1,401 @@
+"""
+Hostel request workflows shared by the views, the admin and the API
+"""
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from .models import (
+    AcademicSession, StudentProfile, Hostel, Room, HostelRequest, Allocation, Notification, current_session_id
+)
+from .notifications import approval_notification, rejection_notification, schedule_dispatch
+from . import caching, ledger
+
+
+# Requests in these states block a student from submitting another one
+ACTIVE_STATUSES = ('PENDING', 'APPROVED')
+
+
+def current_session():
+    """Get the current academic session, or raise ValidationError if none is open"""
+    session = AcademicSession.current()
+    if session is None:
+        raise ValidationError("Hostel requests are closed: no academic session is open.", code='no_session')
+    return session
+
+
+def load_submission_context(user_id, hostel_id, room_id=None, session_id=None):
+    """
+    Load the student with everything needed to validate a submission.
+
+    The hostel, the preferred room and the active-request check (within the
+    session) are folded into the student row as subqueries, so validation
+    costs a single round trip.
+    """
+    hostel = Hostel.objects.filter(pk=hostel_id)
+    room = Room.objects.filter(pk=room_id)
+
+    return StudentProfile.objects.select_for_update().annotate(
+        has_active_request=Exists(
+            HostelRequest.objects.filter(
+                session_id=session_id, student=OuterRef('pk'), status__in=ACTIVE_STATUSES
+            )
+        ),
+        hostel_gender=Subquery(hostel.values('gender')),
+        room_hostel_id=Subquery(room.values('floor__hostel_id')),
+        room_number=Subquery(room.values('room_number')),
+        room_capacity=Subquery(room.values('capacity')),
+        room_occupancy=Subquery(room.values('current_occupancy')),
+    ).get(user_id=user_id)
+
+
+def validate_submission(student, hostel_id, preferred_capacity, room_id=None):
+    """Validate a submission against a context loaded by load_submission_context"""
+    if student.has_active_request:
+        raise ValidationError(
+            "You already have an active hostel request. Please wait for approval or rejection before submitting another.",
+            code='active_request',
+        )
+
+    if student.hostel_gender is None:
+        raise ValidationError("Select a valid hostel.", code='invalid_hostel')
+
+    # Check gender match
+    if student.hostel_gender != student.gender:
+        raise ValidationError(
+            f"Selected hostel is for {dict(Hostel.GENDER_CHOICES)[student.hostel_gender]}s only, but you are registered as {student.get_gender_display()}.",
+            code='gender_mismatch',
+        )
+
+    if preferred_capacity not in dict(HostelRequest.CAPACITY_CHOICES):
+        raise ValidationError("Select a valid room capacity.", code='invalid_capacity')
+
+    # If room is selected, validate it
+    if room_id:
+        if student.room_hostel_id is None:
+            raise ValidationError("Select a valid room.", code='invalid_room')
+
+        # Check room is in the selected hostel
+        if student.room_hostel_id != int(hostel_id):
+            raise ValidationError("Selected room must be in the selected hostel", code='room_hostel_mismatch')
+
+        # Check room capacity matches preference
+        if student.room_capacity != preferred_capacity:
+            raise ValidationError(
+                f"Selected room capacity ({student.room_capacity}) does not match preferred capacity ({preferred_capacity})",
+                code='room_capacity_mismatch',
+            )
+
+        # Check room has available space
+        if student.room_occupancy >= student.room_capacity:
+            raise ValidationError(f"Selected room {student.room_number} is full", code='room_full')
+
+
+def submit_hostel_request(user, hostel_id, preferred_capacity, preferred_room_id=None, note=''):
+    """
+    Validate and create a hostel request for the user's student profile in
+    the current session.
+
+    Raises StudentProfile.DoesNotExist if the user has no profile and
+    ValidationError if the submission is not allowed.
+    """
+    session = current_session()
+    with transaction.atomic():
+        student = load_submission_context(user.pk, hostel_id, preferred_room_id, session.pk)
+        validate_submission(student, hostel_id, preferred_capacity, preferred_room_id)
+
+        return HostelRequest.objects.create(
+            student=student,
+            session=session,
+            hostel_id=hostel_id,
+            preferred_capacity=preferred_capacity,
+            preferred_room_id=preferred_room_id or None,
+            note=note or '',
+        )
+
+
+def find_available_room(hostel_request):
+    """Find a room with a free bed, preferring the requested capacity"""
+    # Skip the room the student already has in the request's session
+    current_room = Allocation.objects.filter(
+        room=OuterRef('pk'), session_id=hostel_request.session_id, student_id=hostel_request.student_id
+    )
+    rooms = Room.objects.filter(
+        floor__hostel_id=hostel_request.hostel_id,
+        current_occupancy__lt=F('capacity'),
+    ).exclude(Exists(current_room)).select_related('floor__hostel')
+
+    return (
+        rooms.filter(capacity=hostel_request.preferred_capacity).first()
+        # Try to find any available room in the hostel
+        or rooms.first()
+    )
+
+
+def approve_hostel_request(hostel_request):
+    """
+    Approve a hostel request and allocate a room.
+
+    Returns the allocated room, or None if the hostel has no free bed.
+    """
+    with ledger.batch():
+        room = find_available_room(hostel_request)
+        if room is None:
+            return None
+
+        assign_room(
+            hostel_request.student_id, room, request_id=hostel_request.pk, session_id=hostel_request.session_id
+        )
+
+        hostel_request.status = 'APPROVED'
+        hostel_request.save(update_fields=['status', 'updated_at'])
+        ledger.record(
+            'APPROVE', hostel_request.student_id, room.pk,
+            request_id=hostel_request.pk, session_id=hostel_request.session_id
+        )
+        approval_notification(hostel_request, room).save()
+        schedule_dispatch()
+
+    return room
+
+
+def assign_room(student_id, room, request_id=None, session_id=None):
+    """
+    Allocate a student to a room for a session (default: the current one),
+    moving any existing allocation and recording it in the ledger
+    """
+    current_id = current_session().pk
+    session_id = session_id or current_id
+    with ledger.batch():
+        allocation, created = Allocation.objects.get_or_create(
+            student_id=student_id,
+            session_id=session_id,
+            defaults={'room': room}
+        )
+
+        from_room_id = None
+        if created:
+            ledger.record('ALLOCATE', student_id, room.pk, request_id=request_id, session_id=session_id)
+        elif allocation.room_id == room.pk:
+            return allocation
+        else:
+            # Move the existing allocation out of its old room
+            from_room_id = allocation.room_id
+            if session_id == current_id:
+                Room.objects.filter(pk=from_room_id, current_occupancy__gt=0).update(
+                    current_occupancy=F('current_occupancy') - 1
+                )
+            allocation.room = room
+            allocation.save(update_fields=['room'])
+            ledger.record(
+                'MOVE', student_id, room.pk,
+                from_room_id=from_room_id, request_id=request_id, session_id=session_id
+            )
+
+        # Room occupancy describes the current session only
+        if session_id == current_id:
+            Room.objects.filter(pk=room.pk).update(current_occupancy=F('current_occupancy') + 1)
+            room.current_occupancy += 1
+            caching.occupancy_changed([room.pk, from_room_id])
+
+    return allocation
+
+
+def release_allocation(allocation):
+    """Delete an allocation, freeing its bed and recording the release in the ledger"""
+    with ledger.batch():
+        if allocation.session_id == current_session_id():
+            Room.objects.filter(pk=allocation.room_id, current_occupancy__gt=0).update(
+                current_occupancy=F('current_occupancy') - 1
+            )
+        ledger.record(
+            'RELEASE', allocation.student_id, from_room_id=allocation.room_id, session_id=allocation.session_id
+        )
+        allocation.delete()
+        caching.occupancy_changed([allocation.room_id])
+
+
+def activate_session(session):
+    """
+    Make a session the current one.
+
+    Room.current_occupancy is recomputed from the session's allocations
+    with a single UPDATE, so a new session starts with empty rooms.
+    """
+    allocated = Allocation.objects.filter(session=session, room=OuterRef('pk')).values('room').annotate(
+        count=Count('pk')
+    ).values('count')
+
+    with transaction.atomic():
+        AcademicSession.objects.filter(is_current=True).exclude(pk=session.pk).update(is_current=False)
+        session.is_current = True
+        session.save(update_fields=['is_current'])
+        Room.objects.update(current_occupancy=Coalesce(Subquery(allocated), 0))
+        caching.occupancy_changed()
+
+
+def reject_hostel_request(hostel_request):
+    """Reject a hostel request"""
+    with ledger.batch():
+        hostel_request.status = 'REJECTED'
+        hostel_request.save(update_fields=['status', 'updated_at'])
+        ledger.record(
+            'REJECT', hostel_request.student_id, request_id=hostel_request.pk, session_id=hostel_request.session_id
+        )
+        rejection_notification(hostel_request).save()
+        schedule_dispatch()
+
+
+def reject_pending_requests(queryset):
+    """Reject the pending requests in a queryset with one UPDATE; returns the count"""
+    with ledger.batch():
+        pending = list(queryset.filter(status='PENDING').select_related('hostel'))
+        HostelRequest.objects.filter(pk__in=[r.pk for r in pending]).update(
+            status='REJECTED', updated_at=timezone.now()
+        )
+        for hostel_request in pending:
+            ledger.record(
+                'REJECT', hostel_request.student_id,
+                request_id=hostel_request.pk, session_id=hostel_request.session_id
+            )
+        Notification.objects.bulk_create(
+            [rejection_notification(hostel_request) for hostel_request in pending]
+        )
+        if pending:
+            schedule_dispatch()
+
+    return len(pending)
+
+
+def bulk_approve_requests(request_ids):
+    """
+    Approve many requests in one transaction with set-based writes.
+
+    Rooms are assigned in memory against a single snapshot of the candidate
+    rooms, then allocations, statuses, notifications and ledger events are
+    written in bulk. Occupancies are written as increments, one UPDATE per
+    distinct change, so approvals made elsewhere since the snapshot are not
+    overwritten. Returns {request_id: outcome}, where outcome
+    is 'approved', 'no_room', 'not_pending' or 'not_found'. Requests from
+    earlier sessions count as not pending.
+    """
+    outcomes = {request_id: 'not_found' for request_id in request_ids}
+    session_id = current_session().pk
+
+    with ledger.batch():
+        requests = list(
+            HostelRequest.objects.select_for_update()
+            .filter(pk__in=request_ids)
+            .select_related('hostel')
+            .order_by('created_at', 'pk')
+        )
+        pending = []
+        for hostel_request in requests:
+            if hostel_request.status == 'PENDING' and hostel_request.session_id == session_id:
+                pending.append(hostel_request)
+            else:
+                outcomes[hostel_request.pk] = 'not_pending'
+
+        allocations = {
+            allocation.student_id: allocation
+            for allocation in Allocation.objects.filter(
+                session_id=session_id, student_id__in={r.student_id for r in pending}
+            )
+        }
+        rooms = {
+            room.pk: room
+            for room in Room.objects.select_for_update().filter(
+                Q(floor__hostel_id__in={r.hostel_id for r in pending})
+                | Q(pk__in={allocation.room_id for allocation in allocations.values()})
+            ).select_related('floor__hostel')
+        }
+        rooms_by_hostel = {}
+        for room in rooms.values():
+            rooms_by_hostel.setdefault(room.floor.hostel_id, []).append(room)
+
+        new_allocations = []
+        moved_allocations = []
+        occupancy = Counter()
+        approved = []
+        notifications = []
+
+        for hostel_request in pending:
+            allocation = allocations.get(hostel_request.student_id)
+            current_room_id = allocation.room_id if allocation else None
+            candidates = [
+                room for room in rooms_by_hostel.get(hostel_request.hostel_id, [])
+                if room.current_occupancy < room.capacity and room.pk != current_room_id
+            ]
+            room = next(
+                (room for room in candidates if room.capacity == hostel_request.preferred_capacity),
+                candidates[0] if candidates else None
+            )
+            if room is None:
+                outcomes[hostel_request.pk] = 'no_room'
+                continue
+
+            if allocation is None:
+                allocation = Allocation(student_id=hostel_request.student_id, session_id=session_id, room=room)
+                allocations[hostel_request.student_id] = allocation
+                new_allocations.append(allocation)
+                ledger.record(
+                    'ALLOCATE', hostel_request.student_id, room.pk,
+                    request_id=hostel_request.pk, session_id=session_id
+                )
+            else:
+                # Move the existing allocation out of its old room
+                old_room = rooms[current_room_id]
+                old_room.current_occupancy = max(0, old_room.current_occupancy - 1)
+                occupancy[old_room.pk] -= 1
+                allocation.room = room
+                if allocation.pk:
+                    moved_allocations.append(allocation)
+                ledger.record(
+                    'MOVE', hostel_request.student_id, room.pk,
+                    from_room_id=current_room_id, request_id=hostel_request.pk, session_id=session_id
+                )
+
+            room.current_occupancy += 1
+            occupancy[room.pk] += 1
+            approved.append(hostel_request.pk)
+            outcomes[hostel_request.pk] = 'approved'
+            ledger.record(
+                'APPROVE', hostel_request.student_id, room.pk, request_id=hostel_request.pk, session_id=session_id
+            )
+            notifications.append(approval_notification(hostel_request, room))
+
+        Allocation.objects.bulk_create(new_allocations, batch_size=500)
+        Allocation.objects.bulk_update(set(moved_allocations), ['room'], batch_size=500)
+        rooms_by_change = defaultdict(list)
+        for room_id, change in occupancy.items():
+            if change:
+                rooms_by_change[change].append(room_id)
+        for change, room_ids in rooms_by_change.items():
+            Room.objects.filter(pk__in=room_ids).update(current_occupancy=Greatest(F('current_occupancy') + change, 0))
+        caching.occupancy_changed(list(occupancy))
+        HostelRequest.objects.filter(pk__in=approved).update(status='APPROVED', updated_at=timezone.now())
+        Notification.objects.bulk_create(notifications, batch_size=500)
+        if notifications:
+            schedule_dispatch()
+
+    return outcomes
+
+
+def bulk_reject_requests(request_ids):
+    """
+    Reject many requests in one transaction; returns {request_id: outcome}.
+
+    Like bulk_approve_requests, requests from earlier sessions count as not pending.
+    """
+    outcomes = {request_id: 'not_found' for request_id in request_ids}
+    session_id = current_session().pk
+    with ledger.batch():
+        requests = HostelRequest.objects.filter(pk__in=request_ids).values_list('pk', 'status', 'session_id')
+        for request_id, status, request_session_id in requests:
+            pending = status == 'PENDING' and request_session_id == session_id
+            outcomes[request_id] = 'rejected' if pending else 'not_pending'
+        reject_pending_requests(HostelRequest.objects.filter(pk__in=request_ids, session_id=session_id))
+    return outcomes
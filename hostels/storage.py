@@ -0,0 +1,34 @@
+"""
+Static files storage
+"""
+import logging
+
+from django.conf import settings
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Fingerprinted, precompressed static files (gzip, plus brotli when the
+    Brotli package is installed), served by WhiteNoise with immutable
+    caching.
+
+    Until collectstatic has written a manifest (tests, fresh checkouts) URLs
+    point at the unhashed source files instead of failing. Outside DEBUG
+    that means a deploy skipped collectstatic, so it is logged as an error,
+    once per process.
+    """
+    missing_manifest_logged = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            if not settings.DEBUG and not self.missing_manifest_logged:
+                self.missing_manifest_logged = True
+                logger.error(
+                    "No staticfiles manifest in %s; serving unhashed static URLs. Run collectstatic.",
+                    self.location,
+                )
+            return name
+        return super().stored_name(name)
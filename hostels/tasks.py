@@ -0,0 +1,147 @@
+"""
+Background jobs for heavy admin operations
+"""
+import csv
+import io
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .jobs import register
+from .models import Allocation, Room, current_session_id
+from . import caching, ledger
+from .notifications import dispatch_outbox
+from .routers import reporting_reads
+from .services import bulk_approve_requests
+
+
+@register('approve_requests')
+def approve_requests(context, request_ids, chunk_size=200):
+    """Approve requests in set-based chunks, allocating rooms"""
+    outcomes = {}
+    for start in range(0, len(request_ids), chunk_size):
+        outcomes.update(bulk_approve_requests(request_ids[start:start + chunk_size]))
+        approved = sum(1 for outcome in outcomes.values() if outcome == 'approved')
+        context.progress(len(outcomes), len(request_ids), f"Approved {approved} of {len(outcomes)}")
+
+    return {
+        'approved': [pk for pk, outcome in outcomes.items() if outcome == 'approved'],
+        'no_room': [pk for pk, outcome in outcomes.items() if outcome == 'no_room'],
+    }
+
+
+@register('import_students')
+def import_students(context, csv_path):
+    """Create students from a CSV file (full_name, matric_no, gender, level)"""
+    from .management.commands.create_students_custom import Command as CreateStudentsCommand
+
+    command = CreateStudentsCommand(stdout=io.StringIO())
+
+    with open(csv_path, 'r', encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    created = 0
+    for done, row in enumerate(rows, 1):
+        full_name = row.get('full_name', '').strip()
+        matric_no = row.get('matric_no', '').strip()
+        if full_name and matric_no:
+            student = command.create_student_from_data(
+                full_name,
+                matric_no,
+                row.get('gender', 'M').strip().upper(),
+                row.get('level', '100').strip(),
+            )
+            created += 1 if student else 0
+        context.progress(done, len(rows), f"Created {created} student(s)")
+
+    return {'created': created, 'rows': len(rows)}
+
+
+@register('export_allocations')
+def export_allocations(context):
+    """
+    Write the current session's allocations to a CSV file under MEDIA_ROOT/exports/.
+
+    The rows are read from the reporting database when it is fresh enough.
+    """
+    export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
+    os.makedirs(export_dir, exist_ok=True)
+    filename = f"allocations-{timezone.now():%Y%m%d-%H%M%S}.csv"
+    path = os.path.join(export_dir, filename)
+
+    with reporting_reads():
+        return write_allocations_csv(context, path)
+
+
+def write_allocations_csv(context, path):
+    allocations = Allocation.objects.filter(session_id=current_session_id()).select_related(
+        'student__user', 'room__floor__hostel'
+    ).order_by('room__floor__hostel__name', 'room__floor__floor_type', 'room__room_number')
+    total = allocations.count()
+
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['matric_no', 'full_name', 'gender', 'level', 'hostel', 'floor', 'room', 'date_allocated'])
+        for done, allocation in enumerate(allocations.iterator(chunk_size=1000), 1):
+            student = allocation.student
+            room = allocation.room
+            writer.writerow([
+                student.matric_no,
+                student.user.get_full_name(),
+                student.gender,
+                student.level,
+                room.floor.hostel.name,
+                room.floor.floor_type,
+                room.room_number,
+                allocation.date_allocated.isoformat(),
+            ])
+            context.progress(done, total)
+
+    return {'path': path, 'rows': total}
+
+
+@register('reconcile_occupancy')
+def reconcile_occupancy(context):
+    """
+    Recompute Room.current_occupancy from current-session allocations and fix drifted rooms.
+
+    The drifted rooms are locked and rewritten with a correlated-subquery
+    UPDATE, so the count is taken at write time and an allocation made
+    while the job runs is not overwritten by a stale value.
+    """
+    allocated = Allocation.objects.filter(session_id=current_session_id(), room=OuterRef('pk')).values('room').annotate(
+        count=Count('pk')
+    ).values('count')
+    allocated = Coalesce(Subquery(allocated), 0)
+
+    checked = Room.objects.count()
+    with transaction.atomic():
+        fixed = list(
+            Room.objects.annotate(allocated=allocated).exclude(current_occupancy=F('allocated'))
+            .select_for_update().values_list('pk', flat=True)
+        )
+        Room.objects.filter(pk__in=fixed).update(current_occupancy=allocated)
+        caching.occupancy_changed(fixed)
+
+    context.progress(checked, checked, f"Fixed {len(fixed)} room(s)", force=True)
+    return {'checked': checked, 'fixed': fixed}
+
+
+@register('dispatch_notifications')
+def dispatch_notifications(context):
+    """Email pending notifications from the outbox"""
+    dispatched = dispatch_outbox()
+    context.progress(dispatched, dispatched, f"Dispatched {dispatched} notification(s)", force=True)
+    return {'dispatched': dispatched}
+
+
+@register('ledger_checkpoint')
+def ledger_checkpoint(context):
+    """Snapshot the allocation ledger so point-in-time queries stay cheap, then schedule the next run"""
+    checkpoint = ledger.take_checkpoint()
+    ledger.schedule_checkpoint()
+    return {'last_event_id': checkpoint.last_event_id if checkpoint else None}
@@ -1,3 +1,1331 @@
-from django.test import TestCase
+import json
+import os
+import re
+import runpy
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import HttpResponse
+from django.test import LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .models import (
+    AcademicSession, StudentProfile, Hostel, Floor, Room, HostelRequest, ArchivedHostelRequest, Allocation,
+    Notification, Job, LedgerCheckpoint
+)
+from . import caching, capacity, jobs, ledger, notifications, roster, routers, views
+from .archive import ArchiveError, archive_closed_requests
+from .middleware import fingerprint
+from .ratelimit import MemoryBuckets
+from .reconfigure import read_spec, reconfigure_rooms
+from .notifications import dispatch_outbox
+from .services import (
+    submit_hostel_request, approve_hostel_request, reject_hostel_request, reject_pending_requests, assign_room,
+    activate_session, bulk_approve_requests
+)
+from .storage import StaticFilesStorage
+
+
+class HostelTestData:
+    """Shared fixtures: one hostel per gender with a floor of rooms"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.female_hostel = Hostel.objects.create(name='Mary', gender='F')
+        cls.male_hostel = Hostel.objects.create(name='Daniel', gender='M')
+        female_floor = Floor.objects.create(hostel=cls.female_hostel, floor_type='GF')
+        male_floor = Floor.objects.create(hostel=cls.male_hostel, floor_type='GF')
+        cls.room = Room.objects.create(floor=female_floor, room_number='GF-01', capacity=2)
+        cls.full_room = Room.objects.create(
+            floor=female_floor, room_number='GF-02', capacity=2, current_occupancy=2
+        )
+        cls.male_room = Room.objects.create(floor=male_floor, room_number='GF-01', capacity=2)
+
+        cls.user = User.objects.create_user(
+            username='stu001', email='stu001@trinity.edu', password='studentpass123'
+        )
+        cls.student = StudentProfile.objects.create(
+            user=cls.user, matric_no='STU001', gender='F', level='100'
+        )
+
+    def setUp(self):
+        # Cached topology and availability must not leak between tests
+        cache.clear()
+
+
+class SubmitHostelRequestTests(HostelTestData, TestCase):
+
+    def test_submission_uses_fixed_number_of_queries(self):
+        # Savepoint, current session, context lookup, insert, release savepoint
+        with self.assertNumQueries(5):
+            hostel_request = submit_hostel_request(
+                self.user, self.female_hostel.pk, 2, preferred_room_id=self.room.pk
+            )
+
+        self.assertEqual(hostel_request.status, 'PENDING')
+        self.assertEqual(hostel_request.preferred_room, self.room)
+
+    def test_rejects_second_active_request(self):
+        submit_hostel_request(self.user, self.female_hostel.pk, 2)
+
+        with self.assertRaises(ValidationError) as cm:
+            submit_hostel_request(self.user, self.female_hostel.pk, 4)
+        self.assertEqual(cm.exception.code, 'active_request')
+
+    def test_rejects_gender_mismatch(self):
+        with self.assertRaises(ValidationError) as cm:
+            submit_hostel_request(self.user, self.male_hostel.pk, 2)
+        self.assertEqual(cm.exception.code, 'gender_mismatch')
+
+    def test_rejects_room_outside_hostel(self):
+        with self.assertRaises(ValidationError) as cm:
+            submit_hostel_request(
+                self.user, self.female_hostel.pk, 2, preferred_room_id=self.male_room.pk
+            )
+        self.assertEqual(cm.exception.code, 'room_hostel_mismatch')
+
+    def test_rejects_full_room(self):
+        with self.assertRaises(ValidationError) as cm:
+            submit_hostel_request(
+                self.user, self.female_hostel.pk, 2, preferred_room_id=self.full_room.pk
+            )
+        self.assertEqual(cm.exception.code, 'room_full')
+        self.assertFalse(HostelRequest.objects.exists())
+
+    def test_request_view_submits_through_service(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post('/student/request-hostel/', {
+            'hostel': self.female_hostel.pk,
+            'preferred_capacity': 2,
+            'preferred_room': self.room.pk,
+        }, secure=True)
+
+        self.assertRedirects(response, '/student/dashboard/', fetch_redirect_response=False)
+        self.assertTrue(HostelRequest.objects.filter(student=self.student, status='PENDING').exists())
+
+    def test_request_page_renders_only_eligible_hostels_and_no_rooms(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get('/student/request-hostel/', secure=True)
+
+        content = response.content.decode()
+        hostels = re.search(r'<select[^>]*id="id_hostel"[^>]*>(.*?)</select>', content, re.S).group(1)
+        rooms = re.search(r'<select[^>]*id="id_preferred_room"[^>]*>(.*?)</select>', content, re.S).group(1)
+        self.assertEqual(re.findall(r'<option value="(\d*)"', hostels), ['', str(self.female_hostel.pk)])
+        self.assertEqual(re.findall(r'<option value="(\d*)"', rooms), [''])
+
+    def test_request_view_rejects_a_room_outside_the_selected_hostel(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post('/student/request-hostel/', {
+            'hostel': self.female_hostel.pk,
+            'preferred_capacity': 2,
+            'preferred_room': self.male_room.pk,
+        }, secure=True)
+
+        self.assertContains(response, 'Selected room must be in the selected hostel')
+        # The lazy-loaded picker reselects the submitted room
+        self.assertContains(response, f'data-selected="{self.male_room.pk}"')
+        self.assertFalse(HostelRequest.objects.exists())
+
+
+@jobs.register('tests.flaky')
+def flaky_job(context, fail=True):
+    if fail:
+        raise RuntimeError('boom')
+    return 'done'
+
+
+class JobQueueTests(TestCase):
+
+    def test_a_claimed_job_is_not_claimed_again(self):
+        first = jobs.enqueue('tests.flaky', fail=False)
+        second = jobs.enqueue('tests.flaky', fail=False)
+
+        self.assertEqual(jobs.claim_next_job('a').pk, first.pk)
+        self.assertEqual(jobs.claim_next_job('b').pk, second.pk)
+        self.assertIsNone(jobs.claim_next_job('c'))
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by, first.attempts), ('RUNNING', 'a', 1))
+
+    @override_settings(JOB_RETRY_BACKOFF=30, JOB_RETRY_MAX_DELAY=3600)
+    def test_failures_back_off_then_fail_for_good(self):
+        job = jobs.enqueue('tests.flaky', max_attempts=2)
+
+        job = jobs.claim_next_job('a')
+        before = timezone.now()
+        with self.assertLogs('hostels.jobs', 'ERROR'):
+            self.assertFalse(jobs.run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'QUEUED')
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=30))
+        # Not due until the backoff has passed
+        self.assertIsNone(jobs.claim_next_job('a'))
+        self.assertEqual(jobs.retry_delay(2), timedelta(seconds=60))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        job = jobs.claim_next_job('a')
+        with self.assertLogs('hostels.jobs', 'ERROR'):
+            self.assertFalse(jobs.run_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.message), ('FAILED', 2, 'boom'))
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_LOCK_TIMEOUT=600)
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        retry = jobs.enqueue('tests.flaky', max_attempts=3)
+        exhausted = jobs.enqueue('tests.flaky', max_attempts=1)
+        jobs.claim_next_job('dead')
+        jobs.claim_next_job('dead')
+        Job.objects.update(updated_at=timezone.now() - timedelta(seconds=601))
+
+        self.assertEqual(jobs.requeue_stale_jobs(), (1, 1))
+
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by, retry.attempts), ('QUEUED', '', 1))
+        self.assertEqual((exhausted.status, exhausted.attempts), ('FAILED', 1))
+        self.assertEqual(jobs.requeue_stale_jobs(), (0, 0))
+
+
+class ConcurrentJobWorkerTests(TransactionTestCase):
+
+    def test_concurrent_workers_claim_each_job_once(self):
+        for _ in range(20):
+            jobs.enqueue('tests.flaky', fail=False)
+        claims = []
+
+        def worker(worker_id):
+            try:
+                while True:
+                    try:
+                        job = jobs.claim_next_job(worker_id)
+                    except OperationalError:
+                        # The in-memory test database locks whole tables and ignores the busy timeout
+                        time.sleep(0.01)
+                        continue
+                    if job is None:
+                        break
+                    claims.append(job.pk)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(f'w{n}',)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claims), sorted(Job.objects.values_list('pk', flat=True)))
+        self.assertFalse(Job.objects.exclude(status='RUNNING', attempts=1).exists())
+
+
+class BouncingEmailBackend(locmem.EmailBackend):
+    """Rejects mail to bounce@ addresses"""
+
+    def send_messages(self, messages):
+        if any(address.startswith('bounce@') for message in messages for address in message.to):
+            raise ConnectionRefusedError('Recipient rejected')
+        return super().send_messages(messages)
+
+
+class NotificationOutboxTests(HostelTestData, TestCase):
+
+    def test_status_changes_write_outbox_rows(self):
+        hostel_request = submit_hostel_request(self.user, self.female_hostel.pk, 2)
+        room = approve_hostel_request(hostel_request)
+
+        notification = Notification.objects.get(student=self.student)
+        self.assertEqual(notification.kind, 'APPROVED')
+        self.assertIn(room.room_number, notification.body)
+        self.assertIsNone(notification.emailed_at)
+
+    def test_dispatcher_sends_pending_rows_in_batches(self):
+        for _ in range(3):
+            HostelRequest.objects.create(student=self.student, hostel=self.female_hostel, preferred_capacity=2)
+        reject_pending_requests(HostelRequest.objects.all())
+
+        self.assertEqual(dispatch_outbox(batch_size=2), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(Notification.objects.filter(emailed_at__isnull=True).exists())
+        self.assertEqual(dispatch_outbox(), 0)
+
+    @override_settings(EMAIL_BACKEND='hostels.tests.BouncingEmailBackend')
+    def test_one_bad_recipient_does_not_hold_back_the_batch(self):
+        other = User.objects.create_user(username='stu002', email='bounce@trinity.edu', password='studentpass123')
+        other_student = StudentProfile.objects.create(user=other, matric_no='STU002', gender='F', level='100')
+        for student in (self.student, other_student):
+            HostelRequest.objects.create(student=student, hostel=self.female_hostel, preferred_capacity=2)
+        reject_pending_requests(HostelRequest.objects.all())
+
+        with self.assertLogs('hostels.notifications', 'ERROR'):
+            self.assertEqual(dispatch_outbox(), 1)
+
+        self.assertEqual([message.to for message in mail.outbox], [['stu001@trinity.edu']])
+        bounced = Notification.objects.get(student=other_student)
+        self.assertEqual((bounced.emailed_at, bounced.email_attempts, bounced.claimed_by), (None, 1, ''))
+
+    @override_settings(NOTIFICATION_CLAIM_TIMEOUT=300)
+    def test_claimed_rows_are_skipped_until_the_claim_expires(self):
+        HostelRequest.objects.create(student=self.student, hostel=self.female_hostel, preferred_capacity=2)
+        reject_pending_requests(HostelRequest.objects.all())
+
+        self.assertEqual(len(notifications.claim_batch(10, 'other-dispatcher')), 1)
+        self.assertEqual(dispatch_outbox(), 0)
+        self.assertEqual(mail.outbox, [])
+
+        # The other dispatcher died mid-batch
+        Notification.objects.update(claimed_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(dispatch_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_status_changes_queue_one_dispatch_job(self):
+        for _ in range(2):
+            hostel_request = HostelRequest.objects.create(
+                student=self.student, hostel=self.female_hostel, preferred_capacity=2
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                reject_hostel_request(hostel_request)
+
+        job = Job.objects.get(name='dispatch_notifications')
+        self.assertEqual(job.status, 'QUEUED')
+        self.assertTrue(jobs.run_job(jobs.claim_next_job('worker')))
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class AllocationLedgerTests(HostelTestData, TestCase):
+
+    def test_replay_rebuilds_allocations_and_occupancy(self):
+        hostel_request = submit_hostel_request(self.user, self.female_hostel.pk, 2)
+        room = approve_hostel_request(hostel_request)
+        Allocation.objects.all().delete()
+        Room.objects.update(current_occupancy=0)
+
+        summary = ledger.replay()
+
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(Allocation.objects.get(student=self.student).room, room)
+        room.refresh_from_db()
+        self.assertEqual(room.current_occupancy, 1)
+
+    def test_point_in_time_occupancy_uses_checkpoint(self):
+        hostel_request = submit_hostel_request(self.user, self.female_hostel.pk, 2)
+        room = approve_hostel_request(hostel_request)
+        checkpoint = ledger.take_checkpoint()
+
+        # Current session, newest checkpoint, events since
+        with self.assertNumQueries(3):
+            occupancy = ledger.occupancy_at(checkpoint.taken_at)
+
+        self.assertEqual(occupancy[room.pk], 1)
+
+    def test_point_in_time_occupancy_starts_from_the_newest_checkpoint(self):
+        room = approve_hostel_request(submit_hostel_request(self.user, self.female_hostel.pk, 2))
+        first = ledger.take_checkpoint()
+        user = User.objects.create_user(username='stu002', password='studentpass123')
+        StudentProfile.objects.create(user=user, matric_no='STU002', gender='F', level='100')
+        approve_hostel_request(submit_hostel_request(user, self.female_hostel.pk, 2))
+        newest = ledger.take_checkpoint()
+
+        # Events before the newest checkpoint must not be replayed again
+        LedgerCheckpoint.objects.filter(pk=newest.pk).update(allocations={})
+
+        self.assertEqual(ledger.occupancy_at(), {})
+        self.assertEqual(ledger.occupancy_at(first.taken_at), {room.pk: 1})
+
+    @override_settings(LEDGER_CHECKPOINT_INTERVAL=3600)
+    def test_checkpoint_job_schedules_its_next_run(self):
+        approve_hostel_request(submit_hostel_request(self.user, self.female_hostel.pk, 2))
+        ledger.schedule_checkpoint(delay=0)
+        ledger.schedule_checkpoint(delay=0)
+        self.assertEqual(Job.objects.filter(name='ledger_checkpoint').count(), 1)
+
+        self.assertTrue(jobs.run_job(jobs.claim_next_job('worker')))
+
+        self.assertEqual(LedgerCheckpoint.objects.count(), 1)
+        following = Job.objects.get(name='ledger_checkpoint', status='QUEUED')
+        self.assertGreater(following.run_at, timezone.now() + timedelta(minutes=59))
+
+
+    def test_reconcile_job_rewrites_only_drifted_rooms(self):
+        room = approve_hostel_request(submit_hostel_request(self.user, self.female_hostel.pk, 2))
+        job = jobs.enqueue('reconcile_occupancy')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(jobs.run_job(jobs.claim_next_job('worker')))
+
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'checked': 3, 'fixed': [self.full_room.pk]})
+        self.assertEqual(
+            dict(Room.objects.values_list('pk', 'current_occupancy')),
+            {room.pk: 1, self.full_room.pk: 0, self.male_room.pk: 0},
+        )
+
+class JsonApiTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_rooms_are_paged_with_a_cursor_and_sparse_fields(self):
+        response = self.client.get('/api/v1/rooms/', {'limit': 2, 'fields': 'room_number'}, secure=True)
+        page = response.json()
+
+        self.assertEqual(page['results'], [
+            {'id': self.room.pk, 'room_number': 'GF-01'},
+            {'id': self.full_room.pk, 'room_number': 'GF-02'},
+        ])
+
+        response = self.client.get(
+            '/api/v1/rooms/', {'limit': 2, 'fields': 'room_number', 'cursor': page['next_cursor']}, secure=True
+        )
+        self.assertEqual(response.json()['results'], [{'id': self.male_room.pk, 'room_number': 'GF-01'}])
+        self.assertIsNone(response.json()['next_cursor'])
+
+    def test_page_is_a_single_query(self):
+        for status in ('PENDING', 'REJECTED', 'REJECTED'):
+            HostelRequest.objects.create(
+                student=self.student, hostel=self.female_hostel, preferred_capacity=2, status=status
+            )
+
+        # Session user lookup plus the page itself
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/requests/', {'fields': 'matric_no,hostel'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_impossible_dates_are_a_bad_request(self):
+        for value in ('2026-02-30', '2026-02-28T25:00'):
+            response = self.client.get('/api/v1/requests/', {'created_after': value}, secure=True)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(value, response.json()['error'])
+
+    def test_no_current_session_lists_nothing(self):
+        HostelRequest.objects.create(student=self.student, hostel=self.female_hostel, preferred_capacity=2)
+        AcademicSession.objects.update(is_current=False)
+
+        response = self.client.get('/api/v1/requests/', secure=True)
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.get('/api/v1/requests/', {'session': 'all'}, secure=True)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_students_are_refused(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/v1/allocations/', secure=True)
+        self.assertEqual(response.status_code, 403)
+
+
+class BulkRequestActionTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(self.admin)
+
+        self.requests = []
+        for i in range(2, 5):
+            user = User.objects.create_user(username=f'stu{i:03d}', password='studentpass123')
+            student = StudentProfile.objects.create(user=user, matric_no=f'STU{i:03d}', gender='F', level='100')
+            self.requests.append(HostelRequest.objects.create(
+                student=student, hostel=self.female_hostel, preferred_capacity=2
+            ))
+
+    def post(self, action, ids):
+        return self.client.post(
+            '/admin/requests/bulk/', {'action': action, 'ids': ids},
+            content_type='application/json', secure=True
+        )
+
+    def test_bulk_approve_fills_free_beds_and_reports_outcomes(self):
+        ids = [r.pk for r in self.requests] + [999999]
+
+        response = self.post('approve', ids)
+
+        # One free bed in the female hostel's non-full room
+        self.assertEqual(response.json()['results'], {
+            str(self.requests[0].pk): 'approved',
+            str(self.requests[1].pk): 'approved',
+            str(self.requests[2].pk): 'no_room',
+            '999999': 'not_found',
+        })
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 2)
+        self.assertEqual(Allocation.objects.filter(room=self.room).count(), 2)
+        self.assertEqual(Notification.objects.filter(kind='APPROVED').count(), 2)
+
+    def test_bulk_reject_skips_requests_that_are_not_pending(self):
+        self.post('approve', [self.requests[0].pk])
+
+        response = self.post('reject', [r.pk for r in self.requests])
+
+        self.assertEqual(response.json()['summary'], {'not_pending': 1, 'rejected': 2})
+
+    def test_bulk_reject_skips_requests_from_earlier_sessions(self):
+        earlier = AcademicSession.objects.create(name='Earlier', start_date='2000-09-01', end_date='2001-08-31')
+        HostelRequest.objects.filter(pk=self.requests[0].pk).update(session=earlier)
+
+        response = self.post('reject', [r.pk for r in self.requests])
+
+        self.assertEqual(response.json()['summary'], {'not_pending': 1, 'rejected': 2})
+        self.requests[0].refresh_from_db()
+        self.assertEqual(self.requests[0].status, 'PENDING')
+
+    def test_bulk_approve_keeps_occupancy_changes_made_since_its_snapshot(self):
+        room = Room.objects.create(floor=self.room.floor, room_number='GF-03', capacity=4)
+        HostelRequest.objects.update(preferred_capacity=4)
+
+        def approved_elsewhere_meanwhile(hostel_request, room):
+            Room.objects.filter(pk=room.pk).update(current_occupancy=F('current_occupancy') + 1)
+            return notifications.approval_notification(hostel_request, room)
+
+        with mock.patch('hostels.services.approval_notification', side_effect=approved_elsewhere_meanwhile):
+            outcomes = bulk_approve_requests([self.requests[0].pk])
+
+        self.assertEqual(outcomes, {self.requests[0].pk: 'approved'})
+        room.refresh_from_db()
+        self.assertEqual(room.current_occupancy, 2)
+
+
+class ProfilingMiddlewareTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+        self.enterContext(override_settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0, PROFILING_DIR=self.profile_dir.name
+        ))
+
+    def test_staff_header_writes_a_profile_per_view(self):
+        admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(admin)
+
+        self.client.get('/api/v1/hostels/', HTTP_X_PROFILE='1', secure=True)
+
+        self.assertEqual(len(os.listdir(os.path.join(self.profile_dir.name, 'api_hostels'))), 1)
+
+    def test_header_is_ignored_for_students(self):
+        self.client.force_login(self.user)
+
+        self.client.get('/student/dashboard/', HTTP_X_PROFILE='1', secure=True)
+
+        self.assertEqual(os.listdir(self.profile_dir.name), [])
+
+
+class SlowQueryLogTests(HostelTestData, TestCase):
+
+    def test_fingerprint_normalizes_values(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM room WHERE id IN (%s, %s, %s) AND name = 'GF-01' LIMIT 21"),
+            "SELECT * FROM room WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+
+    def test_statements_over_threshold_are_logged_with_call_site(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_path = os.path.join(log_dir, 'slow.jsonl')
+            with override_settings(SLOW_QUERY_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG=log_path):
+                self.client.force_login(self.user)
+                self.client.get('/student/request-hostel/', secure=True)
+
+            with open(log_path) as log:
+                entries = [json.loads(line) for line in log]
+
+        self.assertTrue(any(entry['view'] == 'request_hostel' for entry in entries))
+        self.assertTrue(any((entry['caller'] or '').startswith('hostels/views.py') for entry in entries))
+
+
+class UrlConfTests(TestCase):
+
+    def test_custom_admin_pages_are_not_taken_by_the_admin_site(self):
+        self.assertEqual(resolve('/admin/requests/').func, views.admin_requests)
+        self.assertEqual(resolve('/admin/allocations/').func, views.allocation_overview)
+        self.assertEqual(resolve('/admin/rooms/reconfigure/').func, views.room_reconfiguration)
+        self.assertEqual(resolve('/admin/hostels/room/').url_name, 'hostels_room_changelist')
+
+
+@override_settings(REPORTING_MAX_STALENESS=300)
+class ReportingRouterTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        replica_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(replica_dir.cleanup)
+        self.replica = os.path.join(replica_dir.name, 'reporting.sqlite3')
+        open(self.replica, 'w').close()
+        # Only the routing decision is under test; no connection to the copy is opened
+        self.enterContext(mock.patch.dict(settings.DATABASES, {
+            routers.REPORTING_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.replica},
+        }))
+        self.router = routers.ReportingRouter()
+        self.factory = RequestFactory()
+
+    def age_replica(self, seconds):
+        refreshed = time.time() - seconds
+        os.utime(self.replica, (refreshed, refreshed))
+
+    def test_opted_in_reads_go_to_a_fresh_replica(self):
+        self.assertIsNone(self.router.db_for_read(Room))
+
+        with routers.reporting_reads() as alias:
+            self.assertEqual(alias, 'reporting')
+            self.assertEqual(self.router.db_for_read(Room), 'reporting')
+            self.assertEqual(self.router.db_for_read(User), 'reporting')
+            self.assertEqual(self.router.db_for_write(Room), 'default')
+
+        self.assertIsNone(self.router.db_for_read(Room))
+
+    def test_stale_or_missing_replica_falls_back_to_the_primary(self):
+        self.age_replica(301)
+        with routers.reporting_reads():
+            self.assertIsNone(self.router.db_for_read(Room))
+        with routers.reporting_reads(max_staleness=600):
+            self.assertEqual(self.router.db_for_read(Room), 'reporting')
+
+        os.remove(self.replica)
+        with routers.reporting_reads(max_staleness=600):
+            self.assertIsNone(self.router.db_for_read(Room))
+
+    def test_clients_that_wrote_read_from_the_primary(self):
+        def write(request):
+            Room.objects.filter(pk=self.room.pk).update(updated_at=timezone.now())
+            return HttpResponse()
+
+        def read(request):
+            return HttpResponse()
+
+        middleware = routers.ReportingPinMiddleware(write)
+        self.assertIn(routers.PIN_COOKIE, middleware(self.factory.post('/')).cookies)
+        middleware = routers.ReportingPinMiddleware(read)
+        self.assertNotIn(routers.PIN_COOKIE, middleware(self.factory.get('/')).cookies)
+
+        seen = []
+
+        @routers.use_reporting_db
+        def report(request):
+            seen.append(self.router.db_for_read(Room))
+            return HttpResponse()
+
+        report(self.factory.get('/'))
+        pinned = self.factory.get('/')
+        pinned.COOKIES[routers.PIN_COOKIE] = '1'
+        report(pinned)
+        self.assertEqual(seen, ['reporting', None])
+
+    def test_allocation_export_opts_into_the_replica(self):
+        # Without a copy on disk the export reads the primary
+        os.remove(self.replica)
+        jobs.enqueue('export_allocations')
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch('hostels.tasks.reporting_reads', wraps=routers.reporting_reads) as reporting_reads:
+            self.assertTrue(jobs.run_job(jobs.claim_next_job('worker')))
+
+        reporting_reads.assert_called_once_with()
+
+
+class StaticFilesStorageTests(unittest.TestCase):
+
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.storage = StaticFilesStorage(location=static_root.name)
+
+    def test_missing_manifest_is_logged_once_outside_debug(self):
+        with self.assertLogs('hostels.storage', 'ERROR') as logs:
+            self.assertEqual(self.storage.stored_name('css/site.css'), 'css/site.css')
+        self.assertIn('Run collectstatic', logs.output[0])
+
+        with self.assertNoLogs('hostels.storage'):
+            self.storage.stored_name('css/site.css')
+
+    @override_settings(DEBUG=True)
+    def test_missing_manifest_is_expected_in_debug(self):
+        with self.assertNoLogs('hostels.storage'):
+            self.assertEqual(self.storage.stored_name('css/site.css'), 'css/site.css')
+
+
+class AvailabilityCacheTests(HostelTestData, TestCase):
+
+    def test_available_rooms_are_cached_until_occupancy_changes(self):
+        self.client.force_login(self.user)
+        url = f'/api/rooms/?hostel_id={self.female_hostel.pk}&capacity=2'
+
+        self.assertEqual([r['id'] for r in self.client.get(url, secure=True).json()['rooms']], [self.room.pk])
+        with self.assertNumQueries(1):
+            # The user lookup only; the session is served from the cache
+            self.client.get(url, secure=True)
+
+        hostel_request = HostelRequest.objects.create(
+            student=self.student, hostel=self.female_hostel, preferred_capacity=2
+        )
+        Room.objects.filter(pk=self.room.pk).update(current_occupancy=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_hostel_request(hostel_request)
+
+        self.assertEqual(self.client.get(url, secure=True).json()['rooms'], [])
+
+    def test_prime_fills_topology_and_stats(self):
+        caching.prime()
+
+        with self.assertNumQueries(0):
+            topology = caching.hostel_topology()
+            stats = caching.hostel_stats()
+        self.assertEqual([h['name'] for h in topology], ['Daniel', 'Mary'])
+        self.assertEqual(stats[1]['occupied'], 2)
+
+    def test_several_processes_need_a_shared_cache(self):
+        # LocMemCache is the test default
+        caching.check_shared_cache(1)
+        with self.assertRaisesMessage(ImproperlyConfigured, '3 processes cannot share the LocMemCache cache'):
+            caching.check_shared_cache(3)
+
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'hostel_cache'}}
+        with override_settings(CACHES=shared):
+            caching.check_shared_cache(3)
+
+
+class OccupancyHeatmapTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_grid_is_packed_per_floor_and_updated_in_place(self):
+        response = self.client.get('/admin/heatmap/data/', secure=True)
+        mary = response.json()['hostels'][1]
+        self.assertEqual(mary['floors'], [
+            {'floor': 'GF', 'rooms': ['GF-01', 'GF-02'], 'capacity': [2, 2], 'occupancy': [0, 2]},
+        ])
+
+        hostel_request = HostelRequest.objects.create(
+            student=self.student, hostel=self.female_hostel, preferred_capacity=2
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_hostel_request(hostel_request)
+
+        # Only the changed room is re-read
+        with self.assertNumQueries(0):
+            heatmap = caching.occupancy_heatmap()
+        self.assertEqual(heatmap['hostels'][1]['floors'][0]['occupancy'], [1, 2])
+
+    def test_patch_racing_another_worker_drops_the_grid(self):
+        caching.occupancy_heatmap()
+        Room.objects.filter(pk=self.room.pk).update(current_occupancy=1)
+
+        # Another worker is patching the grid right now
+        cache.add(caching.HEATMAP_LOCK_KEY, True)
+        caching.update_heatmap({self.room.pk})
+        self.assertIsNone(cache.get(caching.HEATMAP_KEY))
+
+        # ...and drops its own result once it is done, since the grid is dirty
+        cache.set(caching.HEATMAP_KEY, caching.build_heatmap())
+        cache.delete(caching.HEATMAP_LOCK_KEY)
+        caching.update_heatmap({self.full_room.pk})
+        self.assertIsNone(cache.get(caching.HEATMAP_KEY))
+        self.assertEqual(caching.occupancy_heatmap()['hostels'][1]['floors'][0]['occupancy'], [1, 2])
+
+    def test_unchanged_grid_answers_not_modified(self):
+        etag = self.client.get('/admin/heatmap/data/', secure=True)['ETag']
+
+        response = self.client.get('/admin/heatmap/data/', HTTP_IF_NONE_MATCH=etag, secure=True)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class AllocationOverviewTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(self.admin)
+        Allocation.objects.create(student=self.student, room=self.room)
+
+    def test_stream_mode_streams_every_row(self):
+        response = self.client.get('/admin/allocations/', {'stream': 1}, secure=True)
+
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('STU001', content)
+        self.assertNotIn('allocation rows', content)
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+    def test_default_mode_is_paginated(self):
+        response = self.client.get('/admin/allocations/', secure=True)
+
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertContains(response, 'STU001')
+
+
+class AcademicSessionTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first_session = AcademicSession.current()
+        self.next_session = AcademicSession.objects.create(
+            name='Next', start_date='2099-09-01', end_date='2100-08-31'
+        )
+
+    def test_new_session_starts_with_empty_rooms(self):
+        assign_room(self.student.pk, self.room)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            activate_session(self.next_session)
+
+        self.room.refresh_from_db()
+        self.full_room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 0)
+        self.assertEqual(self.full_room.current_occupancy, 0)
+        self.assertEqual(AcademicSession.current(), self.next_session)
+
+        # Earlier sessions keep their allocations, and the student can be housed again
+        allocation = assign_room(self.student.pk, self.room)
+        self.assertEqual(allocation.session, self.next_session)
+        self.assertEqual(self.student.allocations.count(), 2)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 1)
+
+    def test_session_activated_by_another_process_is_seen_at_once(self):
+        self.assertEqual(AcademicSession.current(), self.first_session)
+
+        # What start_session does in its own process: no signal, no cache delete here
+        AcademicSession.objects.filter(pk=self.first_session.pk).update(is_current=False)
+        AcademicSession.objects.filter(pk=self.next_session.pk).update(is_current=True)
+
+        self.assertEqual(AcademicSession.current(), self.next_session)
+        hostel_request = submit_hostel_request(self.user, self.female_hostel.pk, 2)
+        self.assertEqual(hostel_request.session, self.next_session)
+
+    def test_earlier_sessions_are_hidden_by_default(self):
+        submit_hostel_request(self.user, self.female_hostel.pk, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            activate_session(self.next_session)
+
+        staff = User.objects.create_user(username='warden', password='wardenpass123', is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get('/api/v1/requests/', secure=True)
+        self.assertEqual(response.json()['results'], [])
+
+        response = self.client.get(f'/api/v1/requests/?session={self.first_session.pk}', secure=True)
+        self.assertEqual(len(response.json()['results']), 1)
+
+        # A new session allows a fresh request
+        submit_hostel_request(self.user, self.female_hostel.pk, 2)
+
+
+class RequestArchivalTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.old = timezone.now() - timedelta(days=365)
+        self.requests = [
+            HostelRequest.objects.create(
+                student=self.student, hostel=self.female_hostel, preferred_capacity=2, status=status
+            )
+            for status in ('REJECTED', 'REJECTED', 'REJECTED', 'APPROVED', 'PENDING')
+        ]
+        HostelRequest.objects.update(updated_at=self.old)
+
+    def test_moves_closed_requests_in_batches(self):
+        recent = HostelRequest.objects.create(
+            student=self.student, hostel=self.female_hostel, preferred_capacity=2, status='REJECTED'
+        )
+
+        summary = archive_closed_requests(batch_size=2)
+
+        self.assertEqual(summary, {'candidates': 3, 'archived': 3, 'batches': 2, 'remaining': 0})
+        self.assertEqual(
+            sorted(ArchivedHostelRequest.objects.values_list('pk', flat=True)),
+            [hostel_request.pk for hostel_request in self.requests[:3]],
+        )
+        # Open requests of the current session and recent rejections stay live
+        self.assertEqual(
+            sorted(HostelRequest.objects.values_list('status', flat=True)), ['APPROVED', 'PENDING', 'REJECTED']
+        )
+        self.assertTrue(HostelRequest.objects.filter(pk=recent.pk).exists())
+
+    def test_resumes_after_an_interrupted_run(self):
+        summary = archive_closed_requests(batch_size=2, max_batches=1)
+        self.assertEqual(summary['remaining'], 1)
+
+        # A copy left behind by a crash between insert and delete is not duplicated
+        leftover = HostelRequest.objects.get(status='REJECTED')
+        ArchivedHostelRequest.objects.create(
+            id=leftover.pk, student_id=leftover.student_id, hostel_id=leftover.hostel_id,
+            preferred_capacity=2, status='REJECTED', created_at=leftover.created_at, updated_at=self.old,
+        )
+
+        summary = archive_closed_requests(batch_size=2)
+        self.assertEqual(summary['archived'], 1)
+        self.assertEqual(ArchivedHostelRequest.objects.count(), 3)
+        self.assertFalse(HostelRequest.objects.filter(status='REJECTED').exists())
+
+    def test_pending_requests_of_earlier_sessions_are_archived(self):
+        next_session = AcademicSession.objects.create(name='Next', start_date='2099-09-01', end_date='2100-08-31')
+        with self.captureOnCommitCallbacks(execute=True):
+            activate_session(next_session)
+
+        archive_closed_requests()
+
+        self.assertEqual(list(HostelRequest.objects.values_list('status', flat=True)), ['APPROVED'])
+        self.assertEqual(
+            sorted(ArchivedHostelRequest.objects.values_list('status', flat=True)),
+            ['PENDING', 'REJECTED', 'REJECTED', 'REJECTED'],
+        )
+
+    def test_batch_is_kept_when_a_copy_is_skipped(self):
+        # Another request already archived under a reused id
+        taken = self.requests[1]
+        ArchivedHostelRequest.objects.create(
+            id=taken.pk, student_id=taken.student_id, hostel_id=taken.hostel_id, preferred_capacity=2,
+            status='REJECTED', created_at=taken.created_at - timedelta(days=400), updated_at=self.old,
+        )
+
+        with self.assertRaisesMessage(ArchiveError, '1 of 2 requests have no archive copy'):
+            archive_closed_requests(batch_size=2)
+
+        self.assertEqual(HostelRequest.objects.filter(status='REJECTED').count(), 3)
+        self.assertEqual(ArchivedHostelRequest.objects.count(), 1)
+
+
+class StudentSearchTests(HostelTestData, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user.first_name = 'Ada'
+        self.user.last_name = 'Okafor'
+        self.user.save()
+        self.admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def test_search_name_follows_user_and_matric(self):
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.search_name, 'stu001 ada okafor')
+
+        self.student.matric_no = 'STU009'
+        self.student.save(update_fields=['matric_no'])
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.search_name, 'stu009 ada okafor')
+
+    def test_matches_matric_and_name_prefixes(self):
+        def matches(term):
+            return list(StudentProfile.objects.filter(StudentProfile.search_filter(term)))
+
+        self.assertEqual(matches('STU0'), [self.student])
+        self.assertEqual(matches('oka'), [self.student])
+        self.assertEqual(matches('  Ada   OK '), [self.student])
+        self.assertEqual(matches('kafor'), [])
+
+        self.user.last_name = 'Bello'
+        self.user.save(update_fields=['last_name'])
+        self.assertEqual(matches('oka'), [])
+        self.assertEqual(matches('ada bel'), [self.student])
+
+    def test_search_is_an_index_range_not_like(self):
+        sql = str(StudentProfile.objects.filter(StudentProfile.search_filter('stu0 ada')).query)
+        self.assertNotIn('LIKE', sql.upper())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/students/autocomplete/', {'q': 'stu'}, secure=True)
+        self.assertFalse([query for query in queries if 'LIKE' in query['sql'].upper()])
+
+    def test_autocomplete_by_matric_prefix(self):
+        response = self.client.get('/api/students/autocomplete/', {'q': 'stu'}, secure=True)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.student.pk, 'matric_no': 'STU001', 'name': 'Ada Okafor'},
+        ])
+
+    def test_admin_search_uses_search_name(self):
+        HostelRequest.objects.create(student=self.student, hostel=self.female_hostel, preferred_capacity=2)
+
+        response = self.client.get('/admin/hostels/hostelrequest/', {'q': 'okafor'}, secure=True)
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+        response = self.client.get('/admin/hostels/hostelrequest/', {'q': 'nobody'}, secure=True)
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+
+class RateLimitTests(HostelTestData, TestCase):
+
+    def test_bucket_refills_over_time(self):
+        buckets = MemoryBuckets(max_keys=10)
+        self.assertEqual(buckets.take('k', 2, 1.0, now=0), 0)
+        self.assertEqual(buckets.take('k', 2, 1.0, now=0), 0)
+        self.assertAlmostEqual(buckets.take('k', 2, 1.0, now=0.5), 0.5)
+        self.assertEqual(buckets.take('k', 2, 1.0, now=1.5), 0)
+
+    @override_settings(RATE_LIMITS={
+        'login': {'path': '/accounts/login/', 'methods': ['POST'], 'limits': {'ip': (10, 60, 10), 'matric': (2, 60, 2)}},
+    })
+    def test_login_retries_are_rejected_before_the_database(self):
+        for _ in range(2):
+            response = self.client.post('/accounts/login/', {'username': 'stu001', 'password': 'wrong'}, secure=True)
+            self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.post('/accounts/login/', {'username': 'STU001', 'password': 'wrong'}, secure=True)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response['Retry-After']), range(1, 31))
+
+        # Other students behind the same address can still log in
+        response = self.client.post('/accounts/login/', {'username': 'STU002', 'password': 'wrong'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+
+        # Viewing the form is not limited
+        response = self.client.get('/accounts/login/', secure=True)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMITS={
+        'login': {'path': '/accounts/login/', 'methods': ['POST'], 'limits': {'ip': (3, 60, 3), 'matric': (1, 60, 1)}},
+    })
+    def test_a_rejected_request_takes_no_token_from_other_buckets(self):
+        self.client.post('/accounts/login/', {'username': 'STU001', 'password': 'wrong'}, secure=True)
+        for _ in range(3):
+            response = self.client.post('/accounts/login/', {'username': 'STU001', 'password': 'wrong'}, secure=True)
+            self.assertEqual(response.status_code, 429)
+
+        # Only the first attempt used the address's bucket
+        for username in ('STU002', 'STU003'):
+            response = self.client.post('/accounts/login/', {'username': username, 'password': 'wrong'}, secure=True)
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMIT_BACKEND='cache', RATE_LIMITS={
+        'login': {'path': '/accounts/login/', 'methods': ['POST'], 'limits': {'ip': (1, 60, 1)}},
+    })
+    def test_cache_buckets_store_wall_clock_time(self):
+        self.client.post('/accounts/login/', {'username': 'STU001', 'password': 'wrong'}, secure=True)
+
+        updated = cache.get('ratelimit:login:ip:127.0.0.1')[1]
+        self.assertAlmostEqual(updated, time.time(), delta=60)
+
+    @override_settings(RATE_LIMITS={
+        'rooms': {'path': '/api/rooms/', 'methods': ['GET'], 'limits': {'ip': (1, 60, 1)}},
+    })
+    def test_rooms_api_answers_with_json(self):
+        self.client.force_login(self.user)
+        params = {'hostel_id': self.female_hostel.pk, 'capacity': 2}
+        self.assertEqual(self.client.get('/api/rooms/', params, secure=True).status_code, 200)
+
+        response = self.client.get('/api/rooms/', params, secure=True)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('error', response.json())
+
+
+class SingleFlightTests(TestCase):
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = caching.SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ['room']
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('rooms', compute)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do('rooms', compute))) for _ in range(5)
+        ]
+        for thread in followers:
+            thread.start()
+        # Let the followers reach the wait before the leader lands
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['room']] * 6)
+
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        flight = caching.SingleFlight()
+
+        def fail():
+            raise ValueError('database unavailable')
+
+        with self.assertRaises(ValueError):
+            flight.do('stats', fail)
+        self.assertEqual(flight.do('stats', lambda: 'ok'), 'ok')
+
+
+class SessionBenchmarkTests(HostelTestData, TestCase):
+
+    def test_reports_session_queries_per_mode(self):
+        out = StringIO()
+        call_command('benchmark_sessions', requests=3, modes=['db', 'signed_cookies'], stdout=out)
+
+        session_queries = {}
+        for line in out.getvalue().splitlines():
+            fields = line.split()
+            if fields and fields[0] in ('db', 'signed_cookies'):
+                session_queries[fields[0]] = float(fields[-1])
+        self.assertGreaterEqual(session_queries['db'], 1)
+        self.assertEqual(session_queries['signed_cookies'], 0)
+
+    def test_unknown_matric_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, 'No student found'):
+            call_command('benchmark_sessions', matric='NOPE', stdout=StringIO())
+
+    def test_unknown_session_mode_is_refused_at_startup(self):
+        with mock.patch.dict(os.environ, {'SESSION_MODE': 'redis'}):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'SESSION_MODE must be one of db, cached_db'):
+                runpy.run_path(os.path.join(settings.BASE_DIR, 'hostel_management', 'settings.py'))
+
+
+class HomePageCachingTests(HostelTestData, TestCase):
+
+    def test_anonymous_home_page_is_cacheable(self):
+        response = self.client.get('/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertContains(response, '/static/css/base.css')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag'], secure=True)
+        self.assertEqual(response.status_code, 304)
+
+    def test_signed_in_home_page_is_not_shared(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+
+class RosterSyncTests(HostelTestData, TestCase):
+
+    def write_roster(self, text):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as roster:
+            roster.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def sync(self, text, **kwargs):
+        return roster.sync_roster(
+            self.write_roster(text), lambda row: (row['matric_no'], '', 'roster-pass'), **kwargs
+        )
+
+    def test_applies_inserts_updates_and_deactivations(self):
+        other = User.objects.create_user(username='stu002', password='studentpass123')
+        StudentProfile.objects.create(user=other, matric_no='STU002', gender='M', level='100')
+
+        report = self.sync(
+            'full_name,matric_no,gender,level\n'
+            'Ada Okafor,STU001,F,100\n'
+            'Ada Nneka Okafor,STU001,F,200\n'
+            'Bola Ade,STU003,M,100\n',
+            deactivate_missing=True,
+        )
+
+        self.assertIn('⚠️  STU001 appears more than once; the last row wins', report)
+        self.assertEqual(report[-1], '📊 Roster diff: 1 new, 1 updated, 0 reactivated, 1 deactivated')
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.level, '200')
+        self.assertEqual(self.student.search_name, 'stu001 ada nneka okafor')
+        other.refresh_from_db()
+        self.assertFalse(other.is_active)
+        new = StudentProfile.objects.select_related('user').get(matric_no='STU003')
+        self.assertEqual((new.user.first_name, new.user.last_name), ('Bola', 'Ade'))
+        self.assertTrue(new.user.check_password('roster-pass'))
+
+    def test_dry_run_changes_nothing(self):
+        report = self.sync(
+            'full_name,matric_no,gender,level\nBola Ade,STU003,M,100\n', deactivate_missing=True, dry_run=True
+        )
+
+        self.assertIn('⛔ STU001: not on the roster, to deactivate', report)
+        self.assertFalse(StudentProfile.objects.filter(matric_no='STU003').exists())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+
+    def test_students_missing_from_the_roster_stay_active_by_default(self):
+        report = self.sync('full_name,matric_no,gender,level\nBola Ade,STU003,M,100\n')
+
+        self.assertIn('ℹ️  1 active students are not on the roster and stay active '
+                      '(sync with --deactivate-missing to deactivate them)', report)
+        self.assertEqual(report[-1], '📊 Roster diff: 1 new, 0 updated, 0 reactivated, 0 deactivated')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+
+
+class CreateTestUsersFastTests(HostelTestData, TestCase):
+
+    def test_bulk_creates_accounts_and_seeds_allocations(self):
+        call_command(
+            'create_test_users', count=6, fast=True, batch_size=4, seed_allocations=50, stdout=StringIO()
+        )
+
+        # STU001 already exists
+        self.assertEqual(StudentProfile.objects.count(), 6)
+        hashes = set(User.objects.filter(username__in=['stu002', 'stu003', 'stu006']).values_list('password', flat=True))
+        self.assertEqual(len(hashes), 2)
+        self.assertTrue(User.objects.get(username='stu006').check_password('studentpass123'))
+
+        # Students 2-6 fall in the 50% band; beds are filtered by gender
+        allocations = Allocation.objects.select_related('student', 'room__floor__hostel')
+        self.assertTrue(allocations.exists())
+        for allocation in allocations:
+            self.assertEqual(allocation.student.gender, allocation.room.floor.hostel.gender)
+        self.assertEqual(ledger.state_at(), dict(Allocation.objects.values_list('student_id', 'room_id')))
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False, SESSION_COOKIE_SECURE=False, CSRF_COOKIE_SECURE=False,
+    # Look static files up per request instead of scanning a collectstatic directory that tests never build
+    WHITENOISE_AUTOREFRESH=True,
+    RATE_LIMIT_TRUST_FORWARDED=True,
+    RATE_LIMITS={'login': {'path': '/accounts/login/', 'methods': ['POST'], 'limits': {'ip': (1, 60, 1)}}},
+)
+class LoadTestRushTests(LiveServerTestCase):
+
+    def setUp(self):
+        # Earlier transactional tests flush the session created by the migrations
+        if AcademicSession.current() is None:
+            AcademicSession.objects.create(name='2025/2026', start_date='2025-09-01', end_date='2026-08-31', is_current=True)
+        for gender in ('F', 'M'):
+            hostel = Hostel.objects.create(name=f'Hostel {gender}', gender=gender)
+            floor = Floor.objects.create(hostel=hostel, floor_type='GF')
+            for beds in (2, 4, 6):
+                Room.objects.create(floor=floor, room_number=f'GF-0{beds}', capacity=beds)
+
+    def rush(self, **options):
+        out = StringIO()
+        call_command(
+            'loadtest_rush', base_url=self.live_server_url, students=3, concurrency=1, polls=2,
+            create_accounts=True, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_every_step_is_counted(self):
+        output = self.rush(forwarded_for=True)
+
+        # Five steps per student, with two room polls
+        self.assertIn('📊 18 requests', output)
+        self.assertIn(', 0 errors', output)
+        self.assertNotIn('rate limited', output)
+        self.assertEqual(HostelRequest.objects.count(), 3)
+
+    def test_students_sharing_an_address_are_rate_limited(self):
+        output = self.rush()
+
+        self.assertIn('2 request(s) were rate limited', output)
+        self.assertEqual(HostelRequest.objects.count(), 1)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class CapacitySimulationTests(HostelTestData, TestCase):
+
+    def test_placement_is_capped_by_free_beds(self):
+        intake = {('F', '100'): 3}
+        preferences = {None: {2: 1}}
+
+        result = capacity.simulate(capacity.load_topology(), intake, preferences, rounds=50, seed=1)
+        mary = next(hostel for hostel in result['hostels'] if hostel['name'] == 'Mary')
+        self.assertEqual(result['placement_rate']['mean'], 1)
+        self.assertEqual(mary['classes'], [{
+            'capacity': 2, 'rooms': 2, 'beds': 4, 'demand': 3, 'preferred': 3,
+            'absorbed': 0, 'unused': 1, 'shortfall': 0,
+        }])
+
+        # Returning students keep their beds: full_room has none free
+        result = capacity.simulate(capacity.load_topology(from_current=True), intake, preferences, rounds=50, seed=1)
+        mary = next(hostel for hostel in result['hostels'] if hostel['name'] == 'Mary')
+        self.assertEqual((mary['placed'], mary['unplaced'], mary['unplaced_risk']), (2, 1, 1))
+        self.assertAlmostEqual(result['placement_rate']['mean'], 2 / 3)
+
+    def test_command_reports_shortfall(self):
+        out = StringIO()
+        call_command('simulate_intake', intake=['M:100=5'], preferences=['4=1'], rounds=20, seed=1, stdout=out)
+
+        report = out.getvalue()
+        self.assertIn('Placement rate: 40.0%', report)
+        self.assertIn('Unplaced: 3.0 on average, full in 100% of rounds', report)
+
+
+class RoomReconfigurationTests(HostelTestData, TestCase):
+    header = 'action,hostel,floor,room_number,capacity,to_hostel,to_floor,to_room_number\n'
+
+    def reconfigure(self, spec, dry_run=False):
+        changes, errors = read_spec(self.header + spec)
+        self.assertEqual(errors, [])
+        return reconfigure_rooms(changes, dry_run=dry_run)
+
+    def test_any_invalid_change_rejects_the_whole_spec(self):
+        Room.objects.create(floor=self.room.floor, room_number='GF-03', capacity=4, current_occupancy=3)
+        assign_room(self.student.pk, self.room)
+
+        plan = self.reconfigure(
+            'add,Mary,GF,GF-04,6,,,\n'
+            'update,Mary,GF,GF-03,2,,,\n'
+            'update,Mary,GF,GF-01,,Daniel,GF,GF-09\n'
+            'update,Mary,GF,GF-02,,,,GF-03\n'
+        )
+
+        self.assertEqual(plan['errors'], [
+            (3, 'capacity 2 is below the 3 beds taken'),
+            (4, '1 allocated students cannot move to a male hostel'),
+            (5, 'room GF-03 is already taken on that floor'),
+        ])
+        self.assertFalse(Room.objects.filter(room_number='GF-04').exists())
+        self.assertEqual(Room.objects.get(room_number='GF-03').capacity, 4)
+
+    def test_valid_spec_is_applied_in_bulk(self):
+        caching.hostel_topology()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plan = self.reconfigure('update,Mary,GF,GF-01,4,,,GF-01A\nadd,Mary,GF,GF-05,6,,,\n')
+
+        self.assertEqual((len(plan['update']), len(plan['add']), plan['errors']), (1, 1, []))
+        self.room.refresh_from_db()
+        self.assertEqual((self.room.room_number, self.room.capacity), ('GF-01A', 4))
+        mary = next(hostel for hostel in caching.hostel_topology() if hostel['name'] == 'Mary')
+        self.assertEqual(
+            [room['room_number'] for room in mary['floors'][0]['rooms']], ['GF-01A', 'GF-02', 'GF-05']
+        )
+
+    def test_admin_page_validates_before_applying(self):
+        admin = User.objects.create_user(username='admin', password='admin123456', is_staff=True)
+        self.client.force_login(admin)
+        spec = self.header + 'add,Mary,GF,GF-05,6,,,\n'
+
+        response = self.client.post('/admin/rooms/reconfigure/', {'spec': spec, 'action': 'validate'}, secure=True)
+        self.assertEqual(len(response.context['plan']['add']), 1)
+        self.assertFalse(Room.objects.filter(room_number='GF-05').exists())
+
+        response = self.client.post('/admin/rooms/reconfigure/', {'spec': spec, 'action': 'apply'}, secure=True)
+        self.assertRedirects(response, '/admin/rooms/reconfigure/', fetch_redirect_response=False)
+        self.assertEqual(Room.objects.get(room_number='GF-05').capacity, 6)
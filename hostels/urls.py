@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api
 
 urlpatterns = [
     # Profile/redirect
@@ -11,10 +11,22 @@ urlpatterns = [
     
     # AJAX endpoints
     path('api/rooms/', views.get_available_rooms, name='get_available_rooms'),
+    path('api/students/autocomplete/', views.student_autocomplete, name='student_autocomplete'),
+    
+    # Read-only JSON API for integrations (staff only)
+    path('api/v1/hostels/', api.hostels_list, name='api_hostels'),
+    path('api/v1/rooms/', api.rooms_list, name='api_rooms'),
+    path('api/v1/requests/', api.requests_list, name='api_requests'),
+    path('api/v1/requests/archived/', api.archived_requests_list, name='api_archived_requests'),
+    path('api/v1/allocations/', api.allocations_list, name='api_allocations'),
     
     # Admin URLs
     path('admin/requests/', views.admin_requests, name='admin_requests'),
+    path('admin/requests/bulk/', views.bulk_request_action, name='bulk_request_action'),
     path('admin/approve/<int:request_id>/', views.approve_request, name='approve_request'),
     path('admin/reject/<int:request_id>/', views.reject_request, name='reject_request'),
     path('admin/allocations/', views.allocation_overview, name='allocation_overview'),
+    path('admin/heatmap/', views.occupancy_heatmap, name='occupancy_heatmap'),
+    path('admin/heatmap/data/', views.occupancy_heatmap_data, name='occupancy_heatmap_data'),
+    path('admin/rooms/reconfigure/', views.room_reconfiguration, name='room_reconfiguration'),
 ]
@@ -1,13 +1,33 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.views.decorators.gzip import gzip_page
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition, require_GET, require_POST, require_safe
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db import models
-from django.db.models import Q
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from .models import (
-    StudentProfile, Hostel, HostelRequest, Allocation, Room
+    AcademicSession, StudentProfile, Hostel, HostelRequest, Allocation, current_session_id
 )
 from .forms import HostelRequestForm
+from .services import (
+    ACTIVE_STATUSES, submit_hostel_request, approve_hostel_request, reject_hostel_request,
+    bulk_approve_requests, bulk_reject_requests
+)
+from .api import api_staff_required
+from .reconfigure import SPEC_FIELDS, read_spec, reconfigure_rooms
+from .routers import use_reporting_db
+from . import caching
 
 
 def is_student(user):
@@ -20,6 +40,42 @@ def is_admin(user):
     return user.is_staff
 
 
+# The anonymous home page as (etag, content), rendered once per process
+_anonymous_home = None
+
+
+def is_anonymous_visit(request):
+    """No session and no pending messages, so the home page is the same for every such visitor"""
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES and CookieStorage.cookie_name not in request.COOKIES
+
+
+def anonymous_home(request):
+    global _anonymous_home
+    if _anonymous_home is None or settings.DEBUG:
+        content = render_to_string('home.html', request=request).encode()
+        _anonymous_home = (hashlib.md5(content).hexdigest(), content)
+    return _anonymous_home
+
+
+def home_etag(request):
+    if not is_anonymous_visit(request):
+        return None
+    return anonymous_home(request)[0]
+
+
+@require_safe
+@condition(etag_func=home_etag)
+def home(request):
+    """Landing page; anonymous visitors get a shared copy that browsers may cache and revalidate"""
+    if not is_anonymous_visit(request):
+        return render(request, 'home.html')
+    
+    response = HttpResponse(anonymous_home(request)[1])
+    patch_cache_control(response, public=True, max_age=settings.HOME_PAGE_MAX_AGE)
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
 @login_required
 def profile(request):
     """Redirect to appropriate dashboard based on user role"""
@@ -43,19 +99,30 @@ def student_dashboard(request):
         messages.error(request, "Student profile not found. Please contact administration.")
         return redirect('admin:index')
     
+    session_id = current_session_id()
+    
     # Get current request
     current_request = HostelRequest.objects.filter(
+        session_id=session_id,
         student=student,
         status__in=['PENDING', 'APPROVED']
     ).first()
     
     # Get allocation if exists
-    allocation = Allocation.objects.filter(student=student).first()
+    allocation = Allocation.objects.filter(session_id=session_id, student=student).first()
+    
+    # In-app notification feed; viewing the dashboard marks it as read
+    notifications = list(student.notifications.all()[:5])
+    unread_count = sum(1 for notification in notifications if notification.read_at is None)
+    if unread_count:
+        student.notifications.filter(read_at__isnull=True).update(read_at=timezone.now())
     
     context = {
         'student': student,
         'current_request': current_request,
         'allocation': allocation,
+        'notifications': notifications,
+        'unread_count': unread_count,
         'status_color': {
             'PENDING': 'warning',
             'APPROVED': 'success',
@@ -69,6 +136,34 @@ def student_dashboard(request):
 @login_required
 def request_hostel(request):
     """Submit a hostel request"""
+    if request.method == 'POST':
+        form = HostelRequestForm(request.POST)
+        if form.is_valid():
+            try:
+                submit_hostel_request(
+                    request.user,
+                    hostel_id=form.cleaned_data['hostel'],
+                    preferred_capacity=form.cleaned_data['preferred_capacity'],
+                    preferred_room_id=form.cleaned_data.get('preferred_room'),
+                    note=form.cleaned_data.get('note', '')
+                )
+                messages.success(
+                    request,
+                    "Hostel request submitted successfully! Status: Pending approval"
+                )
+                return redirect('student_dashboard')
+            except StudentProfile.DoesNotExist:
+                pass  # Reported below
+            except ValidationError as e:
+                # An active request is reported by the redirect below
+                if e.code != 'active_request':
+                    for error in e.messages:
+                        messages.error(request, error)
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f"{field}: {error}")
+    
     try:
         student = request.user.student_profile
     except StudentProfile.DoesNotExist:
@@ -77,9 +172,10 @@ def request_hostel(request):
     
     # Check if student already has an active request
     active_request = HostelRequest.objects.filter(
+        session_id=current_session_id(),
         student=student,
-        status__in=['PENDING', 'APPROVED']
-    ).first()
+        status__in=ACTIVE_STATUSES
+    ).select_related('hostel').first()
     
     if active_request:
         messages.warning(
@@ -88,39 +184,15 @@ def request_hostel(request):
         )
         return redirect('student_dashboard')
     
-    if request.method == 'POST':
-        form = HostelRequestForm(request.POST, student=student)
-        if form.is_valid():
-            # Manually create the hostel request to avoid RelatedObjectDoesNotExist
-            hostel_request = HostelRequest(
-                student=student,
-                hostel=form.cleaned_data['hostel'],
-                preferred_capacity=form.cleaned_data['preferred_capacity'],
-                preferred_room=form.cleaned_data.get('preferred_room'),
-                note=form.cleaned_data.get('note', '')
-            )
-            
-            try:
-                hostel_request.full_clean()
-                hostel_request.save()
-                messages.success(
-                    request,
-                    "Hostel request submitted successfully! Status: Pending approval"
-                )
-                return redirect('student_dashboard')
-            except ValidationError as e:
-                messages.error(request, str(e))
-                # Create a fresh form to avoid errors
-                form = HostelRequestForm(student=student)
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f"{field}: {error}")
-    else:
-        form = HostelRequestForm(student=student)
+    # Re-render a failed submission with the student's choices
+    form = HostelRequestForm(request.POST or None, student=student)
     
-    # Get available hostels for student
-    available_hostels = Hostel.objects.filter(gender=student.gender)
+    # Get available hostels for student, with free beds summed in the same query
+    available_hostels = Hostel.objects.filter(gender=student.gender).annotate(
+        available_beds=Coalesce(
+            Sum(F('floors__rooms__capacity') - F('floors__rooms__current_occupancy')), 0
+        )
+    )
     
     context = {
         'form': form,
@@ -131,15 +203,28 @@ def request_hostel(request):
     return render(request, 'hostels/request_hostel.html', context)
 
 
+def selected_session(request):
+    """The session chosen with ?session=<id>, defaulting to the current one"""
+    session_id = request.GET.get('session')
+    if session_id and session_id.isdigit():
+        session = AcademicSession.objects.filter(pk=session_id).first()
+        if session is not None:
+            return session
+    return AcademicSession.current()
+
+
 @user_passes_test(is_admin)
+@use_reporting_db
 def admin_requests(request):
     """Admin view for managing hostel requests"""
     # Get filters
+    session = selected_session(request)
     hostel_filter = request.GET.get('hostel', '')
     status_filter = request.GET.get('status', '')
+    student_search = request.GET.get('q', '').strip()
     
     # Base queryset
-    requests_qs = HostelRequest.objects.select_related(
+    requests_qs = HostelRequest.objects.filter(session=session).select_related(
         'student', 'student__user', 'hostel'
     ).order_by('-created_at')
     
@@ -150,15 +235,21 @@ def admin_requests(request):
     if status_filter:
         requests_qs = requests_qs.filter(status=status_filter)
     
+    if student_search:
+        requests_qs = requests_qs.filter(StudentProfile.search_filter(student_search, 'student__'))
+    
     # Get all hostels for filter dropdown
     hostels = Hostel.objects.all()
     
     context = {
         'requests': requests_qs,
+        'session': session,
+        'sessions': AcademicSession.objects.all(),
         'hostels': hostels,
         'status_choices': HostelRequest.STATUS_CHOICES,
         'selected_hostel': hostel_filter,
         'selected_status': status_filter,
+        'student_search': student_search,
         'total_requests': requests_qs.count(),
         'pending_count': requests_qs.filter(status='PENDING').count(),
         'approved_count': requests_qs.filter(status='APPROVED').count(),
@@ -171,58 +262,18 @@ def admin_requests(request):
 @user_passes_test(is_admin)
 def approve_request(request, request_id):
     """Approve a hostel request and allocate a room"""
-    hostel_request = get_object_or_404(HostelRequest, id=request_id)
+    hostel_request = get_object_or_404(
+        HostelRequest.objects.select_related('student__user', 'hostel'),
+        id=request_id, session_id=current_session_id()
+    )
     
     if request.method == 'POST':
-        student = hostel_request.student
-        
-        # Find available room matching capacity
-        available_room = Room.objects.filter(
-            floor__hostel=hostel_request.hostel,
-            capacity=hostel_request.preferred_capacity,
-        ).exclude(allocations__student=student).filter(
-            current_occupancy__lt=models.F('capacity')
-        ).first()
-        
-        if not available_room:
-            # Try to find any available room in the hostel
-            available_room = Room.objects.filter(
-                floor__hostel=hostel_request.hostel,
-            ).exclude(allocations__student=student).filter(
-                current_occupancy__lt=models.F('capacity')
-            ).first()
+        available_room = approve_hostel_request(hostel_request)
         
         if available_room:
-            # Create allocation
-            allocation, created = Allocation.objects.get_or_create(
-                student=student,
-                defaults={'room': available_room}
-            )
-            
-            if created:
-                # Update room occupancy
-                available_room.current_occupancy += 1
-                available_room.save()
-            else:
-                # Update existing allocation
-                old_room = allocation.room
-                if old_room != available_room:
-                    old_room.current_occupancy = max(0, old_room.current_occupancy - 1)
-                    old_room.save()
-                    
-                    allocation.room = available_room
-                    allocation.save()
-                    
-                    available_room.current_occupancy += 1
-                    available_room.save()
-            
-            # Update request status
-            hostel_request.status = 'APPROVED'
-            hostel_request.save()
-            
             messages.success(
                 request,
-                f"Request approved! {student.user.get_full_name()} allocated to {available_room}"
+                f"Request approved! {hostel_request.student.user.get_full_name()} allocated to {available_room}"
             )
         else:
             messages.error(
@@ -238,11 +289,13 @@ def approve_request(request, request_id):
 @user_passes_test(is_admin)
 def reject_request(request, request_id):
     """Reject a hostel request"""
-    hostel_request = get_object_or_404(HostelRequest, id=request_id)
+    hostel_request = get_object_or_404(
+        HostelRequest.objects.select_related('student__user', 'hostel'),
+        id=request_id, session_id=current_session_id()
+    )
     
     if request.method == 'POST':
-        hostel_request.status = 'REJECTED'
-        hostel_request.save()
+        reject_hostel_request(hostel_request)
         
         messages.success(
             request,
@@ -252,50 +305,182 @@ def reject_request(request, request_id):
     return redirect('admin_requests')
 
 
+# Upper bound on request IDs per bulk call, so one POST cannot hold the write lock for long
+BULK_ACTION_LIMIT = 1000
+
+
+@require_POST
+@api_staff_required
+def bulk_request_action(request):
+    """
+    Approve or reject many requests at once.
+    
+    Accepts JSON {"action": "approve"|"reject", "ids": [...]} (or the same
+    fields form-encoded) and answers with the outcome for every ID.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body)
+            action = payload.get('action')
+            ids = payload.get('ids', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        if not isinstance(ids, list):
+            return JsonResponse({'error': 'ids must be a list of integers'}, status=400)
+    else:
+        action = request.POST.get('action')
+        ids = request.POST.getlist('ids')
+    
+    handlers = {'approve': bulk_approve_requests, 'reject': bulk_reject_requests}
+    if action not in handlers:
+        return JsonResponse({'error': 'action must be "approve" or "reject"'}, status=400)
+    
+    try:
+        request_ids = list(dict.fromkeys(int(request_id) for request_id in ids))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'ids must be a list of integers'}, status=400)
+    if not request_ids:
+        return JsonResponse({'error': 'No request IDs given'}, status=400)
+    if len(request_ids) > BULK_ACTION_LIMIT:
+        return JsonResponse({'error': f'At most {BULK_ACTION_LIMIT} IDs per call'}, status=400)
+    
+    outcomes = handlers[action](request_ids)
+    
+    summary = {}
+    for outcome in outcomes.values():
+        summary[outcome] = summary.get(outcome, 0) + 1
+    
+    return JsonResponse({
+        'action': action,
+        'results': {str(request_id): outcome for request_id, outcome in outcomes.items()},
+        'summary': summary,
+    })
+
+
+# Stands in for the table rows when allocation_overview streams
+STREAM_ROWS_MARKER = '<!-- allocation rows -->'
+STREAM_CHUNK_SIZE = 500
+ALLOCATIONS_PER_PAGE = 100
+
+
 @user_passes_test(is_admin)
+@use_reporting_db
 def allocation_overview(request):
     """Admin view for allocation overview"""
-    # Get all allocations
-    allocations = Allocation.objects.select_related(
+    session = selected_session(request)
+    
+    # Get all allocations in the session
+    allocations = Allocation.objects.filter(session=session).select_related(
         'student', 'student__user', 'room', 'room__floor', 'room__floor__hostel'
     ).order_by('-date_allocated')
     
-    # Get hostel statistics
-    hostels = Hostel.objects.all()
+    # Bed totals per hostel, cached between allocation changes; room
+    # occupancy only describes the current session
     hostel_stats = []
-    
-    for hostel in hostels:
-        total_capacity = sum(
-            room.capacity for room in Room.objects.filter(floor__hostel=hostel)
-        )
-        occupied = sum(
-            room.current_occupancy for room in Room.objects.filter(floor__hostel=hostel)
-        )
-        available = total_capacity - occupied
-        
-        hostel_stats.append({
-            'hostel': hostel,
-            'total_capacity': total_capacity,
-            'occupied': occupied,
-            'available': available,
-            'percentage': int((occupied / total_capacity * 100) if total_capacity > 0 else 0),
-        })
+    if session is not None and session.is_current:
+        hostel_stats = caching.hostel_stats()
     
     context = {
-        'allocations': allocations,
+        'session': session,
+        'sessions': AcademicSession.objects.all(),
         'hostel_stats': hostel_stats,
         'total_allocations': allocations.count(),
     }
     
+    if request.GET.get('stream'):
+        # Full roster for printing: send the page shell straight away and
+        # stream the rows in chunks, so memory stays flat however many there are
+        context['streaming'] = True
+        page = render_to_string('hostels/allocation_overview.html', context, request)
+        head, tail = page.split(STREAM_ROWS_MARKER)
+        # Rows are read after the view returns; keep them on this view's database
+        allocations = allocations.using(allocations.db)
+        return StreamingHttpResponse(stream_allocation_rows(head, allocations, tail))
+    
+    page_obj = Paginator(allocations, ALLOCATIONS_PER_PAGE).get_page(request.GET.get('page'))
+    context['page_obj'] = page_obj
+    context['allocations'] = page_obj.object_list
+    
     return render(request, 'hostels/allocation_overview.html', context)
 
 
+def stream_allocation_rows(head, allocations, tail):
+    """Yield the page head, the allocation rows in chunks, then the tail"""
+    yield head
+    chunk = []
+    for allocation in allocations.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        chunk.append(allocation)
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield render_to_string('hostels/allocation_rows.html', {'allocations': chunk})
+            chunk = []
+    if chunk:
+        yield render_to_string('hostels/allocation_rows.html', {'allocations': chunk})
+    yield tail
+
+
+@user_passes_test(is_admin)
+def occupancy_heatmap(request):
+    """Admin view for the floor and room occupancy heatmap"""
+    return render(request, 'hostels/occupancy_heatmap.html')
+
+
+def heatmap_etag(request):
+    return f"heatmap-{caching.occupancy_heatmap()['version']}"
+
+
+@require_GET
+@api_staff_required
+@gzip_page
+@condition(etag_func=heatmap_etag)
+def occupancy_heatmap_data(request):
+    """JSON occupancy grid per hostel for the heatmap page"""
+    heatmap = caching.occupancy_heatmap()
+    hostels = heatmap['hostels']
+    
+    hostel_id = request.GET.get('hostel_id')
+    if hostel_id:
+        hostels = [hostel for hostel in hostels if str(hostel['id']) == hostel_id]
+    
+    return JsonResponse({'version': heatmap['version'], 'hostels': hostels})
+
+
+@user_passes_test(is_admin)
+def room_reconfiguration(request):
+    """Admin view for validating and applying a bulk room reconfiguration spec"""
+    spec = ''
+    plan = None
+    errors = []
+    
+    if request.method == 'POST':
+        upload = request.FILES.get('spec_file')
+        spec = upload.read().decode('utf-8-sig') if upload else request.POST.get('spec', '')
+        apply = request.POST.get('action') == 'apply'
+        
+        changes, errors = read_spec(spec)
+        if not errors:
+            plan = reconfigure_rooms(changes, dry_run=not apply)
+            errors = plan['errors']
+        
+        if apply and not errors:
+            messages.success(
+                request,
+                f"Rooms reconfigured: {len(plan['add'])} added, {len(plan['update'])} updated"
+            )
+            return redirect('room_reconfiguration')
+    
+    context = {
+        'spec': spec,
+        'spec_fields': ','.join(SPEC_FIELDS),
+        'plan': plan,
+        'errors': errors,
+    }
+    
+    return render(request, 'hostels/room_reconfiguration.html', context)
+
+
 @login_required
 def get_available_rooms(request):
     """AJAX endpoint to get available rooms for a hostel and capacity"""
-    import json
-    from django.http import JsonResponse
-    
     hostel_id = request.GET.get('hostel_id')
     capacity = request.GET.get('capacity')
     
@@ -304,22 +489,21 @@ def get_available_rooms(request):
     
     try:
         capacity = int(capacity)
-        hostel = Hostel.objects.get(id=hostel_id)
-    except (Hostel.DoesNotExist, ValueError):
+        hostel_id = int(hostel_id)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid hostel or capacity'}, status=400)
+    
+    hostel = next((h for h in caching.hostel_topology() if h['id'] == hostel_id), None)
+    if hostel is None:
         return JsonResponse({'error': 'Invalid hostel or capacity'}, status=400)
     
     # Get available rooms with the specified capacity
-    rooms = Room.objects.filter(
-        floor__hostel=hostel,
-        capacity=capacity
-    ).exclude(
-        current_occupancy__gte=models.F('capacity')
-    ).select_related('floor').values('id', 'room_number', 'floor__floor_type', 'capacity', 'current_occupancy')
+    rooms = caching.available_rooms(hostel_id, capacity)
     
     rooms_list = [
         {
             'id': room['id'],
-            'label': f"{hostel.name} {room['floor__floor_type']} {room['room_number']} ({room['current_occupancy']}/{room['capacity']})",
+            'label': f"{hostel['name']} {room['floor__floor_type']} {room['room_number']} ({room['current_occupancy']}/{room['capacity']})",
             'room_number': room['room_number'],
             'floor': room['floor__floor_type'],
             'occupancy': room['current_occupancy'],
@@ -330,3 +514,35 @@ def get_available_rooms(request):
     
     return JsonResponse({'rooms': rooms_list})
 
+
+# Suggestions returned per autocomplete call
+AUTOCOMPLETE_LIMIT = 10
+
+
+@require_GET
+@api_staff_required
+def student_autocomplete(request):
+    """
+    AJAX endpoint suggesting students by matric number prefix.
+    
+    search_name starts with the lowercased matric, so the lookup is an
+    index range scan read in index order.
+    """
+    prefix = StudentProfile.normalize(request.GET.get('q', ''))
+    if not prefix:
+        return JsonResponse({'results': []})
+    
+    students = StudentProfile.objects.filter(StudentProfile.prefix_range('search_name', prefix)).order_by('search_name').values(
+        'id', 'matric_no', 'user__first_name', 'user__last_name'
+    )[:AUTOCOMPLETE_LIMIT]
+    
+    results = [
+        {
+            'id': student['id'],
+            'matric_no': student['matric_no'],
+            'name': f"{student['user__first_name']} {student['user__last_name']}".strip(),
+        }
+        for student in students
+    ]
+    
+    return JsonResponse({'results': results})
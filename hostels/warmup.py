@@ -0,0 +1,81 @@
+"""
+Boot-time warm-up so the first requests after a deploy are not slow.
+
+Run from gunicorn.conf.py: imports, templates and caches are warmed once in
+the master before workers fork, and each worker opens its own database
+connections after the fork.
+"""
+import logging
+import os
+import time
+
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver, reverse
+
+from . import caching
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def import_app():
+    """Import the URLconf, every view module and the admin; returns the number of URL patterns"""
+    resolver = get_resolver()
+    reverse('home')  # builds the reverse lookup tables
+    return len(resolver.url_patterns)
+
+
+def compile_templates():
+    """Compile every template so the cached loader holds them; returns the number compiled"""
+    compiled = 0
+    for engine in engines.all():
+        for template_dir in engine.template_dirs:
+            for root, dirs, files in os.walk(template_dir):
+                for filename in files:
+                    if not filename.endswith(TEMPLATE_EXTENSIONS):
+                        continue
+                    name = os.path.relpath(os.path.join(root, filename), template_dir).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                        compiled += 1
+                    except (TemplateDoesNotExist, TemplateSyntaxError):
+                        # Fragments of third-party apps that need a context library
+                        logger.debug("Skipped template %s", name)
+    return compiled
+
+
+def prime_caches():
+    """Fill the hostel topology and availability caches; returns the number of entries"""
+    return caching.prime()
+
+
+def open_connections():
+    """Connect to every configured database; returns the number of connections"""
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return len(connections.all())
+
+
+STEPS = {
+    'imports': import_app,
+    'templates': compile_templates,
+    'caches': prime_caches,
+    'connections': open_connections,
+}
+
+
+def warm_up(steps=None):
+    """Run warm-up steps in order; returns [(step, seconds, result)]"""
+    timings = []
+    for name in steps or STEPS:
+        start = time.perf_counter()
+        try:
+            result = STEPS[name]()
+        except Exception:
+            # A failed warm-up must never stop the server from booting
+            logger.exception("Warm-up step %s failed", name)
+            result = None
+        timings.append((name, time.perf_counter() - start, result))
+    return timings
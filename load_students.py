@@ -5,9 +5,12 @@ This script runs during the build/release phase on Render.
 
 Usage:
     python load_students.py
+    python load_students.py --sync    # also update students to match the CSV
+    python load_students.py --sync --deactivate-missing    # and deactivate students missing from it
 """
 
 import os
+import sys
 import django
 import csv
 from pathlib import Path
@@ -18,6 +21,7 @@ django.setup()
 
 from django.contrib.auth.models import User
 from hostels.models import StudentProfile, Hostel, Floor, Room
+from hostels.roster import sync_roster
 
 def create_superuser():
     """Create admin superuser if it doesn't exist"""
@@ -198,6 +202,35 @@ def load_students_from_csv(csv_file='students.csv'):
         print(f"❌ Error reading CSV: {str(e)}")
         return False
 
+
+def new_account(row):
+    """Username, email and password for a new student, as load_students_from_csv creates them"""
+    first_name_part = row['full_name'].split()[0]
+    last_name = row['last_name']
+    return row['matric_no'], f'{first_name_part.lower()}.{last_name.lower()}@trinity.edu', first_name_part.capitalize()
+
+
+def sync_students_from_csv(csv_file='students.csv', deactivate_missing=False):
+    """Create and update students so the database matches the CSV, optionally deactivating the rest"""
+    if not Path(csv_file).exists():
+        print(f"❌ CSV file not found: {csv_file}")
+        return False
+
+    print(f"\n📂 Syncing students with: {csv_file}")
+    try:
+        for line in sync_roster(csv_file, new_account, deactivate_missing=deactivate_missing):
+            print(line)
+    except Exception as e:
+        print(f"❌ Error syncing roster: {str(e)}")
+        return False
+
+    print()
+    print("=" * 70)
+    print("✅ Roster Sync Complete!")
+    print("=" * 70)
+    return True
+
+
 if __name__ == '__main__':
     print("=" * 70)
     print("Trinity Hostel Management - Auto Setup")
@@ -212,5 +245,8 @@ if __name__ == '__main__':
     create_hostels_and_rooms()
     
     # Load students
-    success = load_students_from_csv('students.csv')
+    if '--sync' in sys.argv[1:]:
+        success = sync_students_from_csv('students.csv', deactivate_missing='--deactivate-missing' in sys.argv[1:])
+    else:
+        success = load_students_from_csv('students.csv')
     exit(0 if success else 1)